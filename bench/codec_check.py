@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Check that src/codec.py produces the same output with either JSON backend.
+
+Runs the same round trip (codec.loads of raw JSON text, then codec.dumps)
+once with MONITOR_JSON=json and once with the default backend (orjson when
+installed) and compares the results byte for byte, and both against the
+stdlib reference. The payloads are cost-shaped: per-token prices and
+usage totals small enough to hit exponent notation, plus NaN/Infinity and
+wide ints.
+
+Usage:
+    python3 bench/codec_check.py          # exits 1 on any difference
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+PAYLOADS = [
+    '{"cost":{"input":3e-06,"output":1.5e-05,"cacheRead":3e-07,"cacheWrite":3.75e-06}}',
+    '{"usage":{"input":1234,"output":56,"cost":{"total":0.000123456789,"input":1e-07}}}',
+    '{"models":[{"id":"m","cost":{"input":2.5e-06,"output":1e-05}}],"total":1e+16}',
+    '{"costs":[0.1,0.2,0.30000000000000004,1e-300,5e-324,1.7976931348623157e+308]}',
+    '{"nan":NaN,"inf":Infinity,"ninf":-Infinity}',
+    '{"wide":123456789012345678901234567890,"neg":-0.0,"text":"成本 €"}',
+]
+
+
+def _round_trip() -> list:
+    sys.path.insert(0, SRC_DIR)
+    import codec
+    return [codec.BACKEND] + [codec.dumps(codec.loads(p)) for p in PAYLOADS]
+
+
+def _run(env_json: bool) -> list:
+    env = dict(os.environ)
+    if env_json:
+        env['MONITOR_JSON'] = 'json'
+    else:
+        env.pop('MONITOR_JSON', None)
+    out = subprocess.run([sys.executable, __file__, '--child'], env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out)
+
+
+def main():
+    if '--child' in sys.argv:
+        print(json.dumps(_round_trip()))
+        return 0
+
+    reference = [json.dumps(json.loads(p), ensure_ascii=False, separators=(',', ':'))
+                 for p in PAYLOADS]
+    std = _run(True)
+    default = _run(False)
+    failed = 0
+    for i, payload in enumerate(PAYLOADS):
+        a, b = std[i + 1], default[i + 1]
+        ok = a == b == reference[i]
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {payload}")
+        if not ok:
+            print(f'     json:   {a}\n     {default[0]}: {b}\n     stdlib: {reference[i]}')
+    print(f'backends: {std[0]} vs {default[0]}, {len(PAYLOADS) - failed}/{len(PAYLOADS)} identical')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the `openclaw` CLI used by the load test. Answers the
+subcommands the monitor calls from the fixture under $HOME/.openclaw,
+after sleeping FAKE_OPENCLAW_DELAY seconds (default 0.3) to mimic the
+real CLI's Node.js start-up cost.
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def _main_sessions():
+    d = os.path.expanduser('~/.openclaw/agents/main/sessions')
+    try:
+        names = [n for n in os.listdir(d) if n.endswith('.jsonl')]
+    except OSError:
+        return []
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(d, n)), reverse=True)
+    return [n[:-len('.jsonl')] for n in names]
+
+
+def main(argv):
+    time.sleep(float(os.environ.get('FAKE_OPENCLAW_DELAY', '0.3')))
+    cmd = [a for a in argv if not a.startswith('-')]
+
+    if '--version' in argv and not cmd:
+        print('2026.10.1 (fake)')
+    elif cmd[:1] == ['sessions']:
+        print('┌──────────────────────────────────────┬──────────┬─────────┐')
+        print('│ Session                              │ Age      │ Model   │')
+        print('├──────────────────────────────────────┼──────────┼─────────┤')
+        for sid in _main_sessions():
+            print(f'  {sid}   1m ago     gpt-4.1')
+        print('└──────────────────────────────────────┴──────────┴─────────┘')
+    elif cmd[:1] == ['status']:
+        print(json.dumps({'gateway': {'reachable': True}, 'channels': {'feishu': {'ok': True}},
+                          'sessions': {'count': len(_main_sessions())}}))
+    elif cmd[:2] == ['system', 'presence']:
+        print('gateway  online  pid=4242')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Synthetic ~/.openclaw generator for benchmarks and load tests.
+
+Writes a fake state tree (agents/*/sessions transcripts + sessions.json,
+cron, devices, openclaw.json, update-check.json) and daily openclaw-*.log
+files under one root directory. Output is deterministic for a given seed.
+
+Usage:
+    python3 bench/fixture.py /tmp/oc-fixture
+    python3 bench/fixture.py /tmp/oc-fixture --agents 3 --sessions 200 --turns 80
+"""
+
+import argparse
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+MODELS = [('anthropic', 'claude-sonnet'), ('openai', 'gpt-4.1'), ('deepseek', 'deepseek-chat')]
+TOOLS  = ['read', 'write', 'exec', 'web_search', 'browser', 'memory_search']
+WORDS  = ('the agent reads a file then runs a command and reports back with results '
+          'error warning retry queue session tool model context token cost 日志 会话 工具').split()
+CHANNELS = ['feishu', 'ddingtalk', 'qqbot', 'wecom', 'heartbeat']
+
+
+def _text(rng, size):
+    out, n = [], 0
+    while n < size:
+        w = rng.choice(WORDS)
+        out.append(w)
+        n += len(w) + 1
+    return ' '.join(out)
+
+
+def _iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f'{dt.microsecond // 1000:03d}Z'
+
+
+def _transcript(rng, sid, start, opts):
+    """Yield JSONL lines for one session: header, then user/assistant/tool turns."""
+    t = start
+    provider, model = rng.choice(MODELS)
+    yield {'type': 'session', 'id': sid, 'timestamp': _iso(t), 'cwd': '/root'}
+    yield {'type': 'model_change', 'provider': provider, 'modelId': model, 'timestamp': _iso(t)}
+    call = 0
+    for turn in range(opts.turns):
+        t += timedelta(seconds=rng.randint(5, 120))
+        yield {'type': 'message', 'timestamp': _iso(t), 'message': {
+            'role': 'user', 'content': [{'type': 'text', 'text': _text(rng, opts.text_size // 4)}]}}
+
+        content = []
+        if opts.thinking:
+            content.append({'type': 'thinking', 'thinking': _text(rng, opts.text_size)})
+        tool_calls = []
+        if rng.random() < opts.tool_density:
+            for _ in range(rng.randint(1, 3)):
+                call += 1
+                tc = {'type': 'toolCall', 'toolCallId': f'call_{call}', 'name': rng.choice(TOOLS),
+                      'arguments': {'path': f'/srv/data/{rng.randint(0, 999)}.txt',
+                                    'command': _text(rng, 40)}}
+                content.append(tc)
+                tool_calls.append(tc)
+        else:
+            content.append({'type': 'text', 'text': _text(rng, opts.text_size)})
+
+        msg = {'role': 'assistant', 'provider': provider, 'model': model, 'content': content}
+        if rng.random() < opts.usage_rate:
+            inp, outp = rng.randint(500, 20000), rng.randint(50, 2000)
+            msg['usage'] = {'input': inp, 'output': outp, 'cacheRead': rng.randint(0, inp),
+                            'totalTokens': inp + outp,
+                            'cost': {'total': round(inp * 3e-6 + outp * 15e-6, 6)}}
+        t += timedelta(seconds=rng.randint(1, 30))
+        yield {'type': 'message', 'timestamp': _iso(t), 'message': msg}
+
+        for tc in tool_calls:
+            t += timedelta(milliseconds=rng.randint(50, 8000))
+            yield {'type': 'message', 'timestamp': _iso(t), 'message': {
+                'role': 'toolResult', 'toolCallId': tc['toolCallId'], 'toolName': tc['name'],
+                'isError': rng.random() < 0.05,
+                'content': [{'type': 'text', 'text': _text(rng, opts.result_size)}]}}
+        if tool_calls:
+            t += timedelta(seconds=rng.randint(1, 20))
+            yield {'type': 'message', 'timestamp': _iso(t), 'message': {
+                'role': 'assistant', 'provider': provider, 'model': model,
+                'content': [{'type': 'text', 'text': _text(rng, opts.text_size // 2)}]}}
+
+
+def _write_agent(rng, oc_root, agent, opts, now):
+    d = os.path.join(oc_root, 'agents', agent, 'sessions')
+    os.makedirs(d, exist_ok=True)
+    meta = {}
+    for i in range(opts.sessions):
+        sid = str(uuid.UUID(int=rng.getrandbits(128)))
+        start = now - timedelta(hours=rng.uniform(0, 72))
+        path = os.path.join(d, f'{sid}.jsonl')
+        with open(path, 'w') as fh:
+            for obj in _transcript(rng, sid, start, opts):
+                fh.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        mtime = (start + timedelta(minutes=opts.turns)).timestamp()
+        os.utime(path, (mtime, mtime))
+
+        channel = rng.choice(CHANNELS)
+        key = 'agent:main:main' if (agent == 'main' and i == 0) else f'agent:{agent}:{channel}:{sid[:8]}'
+        ctx = rng.choice([128000, 200000, 1000000])
+        meta[key] = {
+            'sessionId': sid, 'updatedAt': int(mtime * 1000), 'chatType': rng.choice(['dm', 'group']),
+            'origin': {'provider': channel, 'label': channel}, 'lastChannel': channel,
+            'contextTokens': ctx, 'totalTokens': rng.randint(1000, ctx),
+            'compactionCount': rng.randint(0, 5),
+            'systemPromptReport': {'chars': rng.randint(5000, 40000),
+                                   'sections': [{'name': f's{j}', 'chars': rng.randint(100, 4000)}
+                                                for j in range(opts.meta_padding)]},
+            'skillsSnapshot': {'skills': [{'name': f'skill-{j}', 'description': _text(rng, 80)}
+                                          for j in range(opts.meta_padding)]},
+        }
+    with open(os.path.join(d, 'sessions.json'), 'w') as fh:
+        json.dump(meta, fh, ensure_ascii=False, indent=2)
+
+
+def _log_line(rng, t):
+    kind = rng.random()
+    sid = str(uuid.UUID(int=rng.getrandbits(128)))
+    if kind < 0.15:
+        msg = f'lane enqueue: lane=session:{sid} queueSize=1'
+    elif kind < 0.30:
+        msg = f'lane dequeue: lane=session:{sid} waitedMs={rng.randint(0, 900)}'
+    elif kind < 0.40:
+        msg = f'embedded run start: runId={sid[:8]} sessionId={sid} provider=openai model=gpt-4.1'
+    elif kind < 0.50:
+        msg = f'embedded run done: runId={sid[:8]} sessionId={sid} durationMs={rng.randint(200, 90000)}'
+    elif kind < 0.62:
+        msg = f'embedded run tool start: runId={sid[:8]} tool={rng.choice(TOOLS)} toolCallId=call_{rng.randint(1, 99)}'
+    elif kind < 0.74:
+        msg = f'embedded run tool end: runId={sid[:8]} tool={rng.choice(TOOLS)} toolCallId=call_{rng.randint(1, 99)}'
+    elif kind < 0.80:
+        msg = f'session state: sessionId={sid} prev=idle new=processing reason=run_started'
+    elif kind < 0.84:
+        msg = f'error: provider request failed status=529 retrying sessionId={sid}'
+    elif kind < 0.90:
+        msg = f'warn: slow listener detected durationMs={rng.randint(500, 5000)}'
+    else:
+        msg = f'gateway heartbeat ok clients={rng.randint(0, 8)}'
+    if rng.random() < 0.1:
+        # plain-text lines with a time-only prefix also occur in the wild
+        return t.strftime('%H:%M:%S') + ' ' + msg
+    level = 'ERROR' if msg.startswith('error') else 'WARN' if msg.startswith('warn') else 'INFO'
+    return json.dumps({'0': '{"subsystem":"agent/embedded"}', '1': msg,
+                       '_meta': {'logLevelName': level, 'date': _iso(t)}, 'time': _iso(t)})
+
+
+def _write_logs(rng, log_dir, opts, now):
+    os.makedirs(log_dir, exist_ok=True)
+    per_day = int(opts.log_rate * 60 * 24)
+    for back in range(opts.log_days):
+        day = (now - timedelta(days=back)).replace(hour=0, minute=0, second=0, microsecond=0)
+        step = 86400.0 / max(per_day, 1)
+        path = os.path.join(log_dir, f"openclaw-{day.strftime('%Y-%m-%d')}.log")
+        with open(path, 'w') as fh:
+            for i in range(per_day):
+                fh.write(_log_line(rng, day + timedelta(seconds=i * step)) + '\n')
+
+
+def _write_misc(rng, oc_root, opts):
+    def dump(rel, obj):
+        path = os.path.join(oc_root, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as fh:
+            json.dump(obj, fh, indent=2)
+
+    dump('openclaw.json', {
+        'agents': {'defaults': {'model': {'primary': 'openai/gpt-4.1'}}},
+        'models': {'providers': {p: {'models': [{'id': m}]} for p, m in MODELS}},
+    })
+    dump('cron/jobs.json', {'jobs': [
+        {'id': f'job-{i}', 'name': f'job {i}', 'enabled': rng.random() < 0.8,
+         'schedule': {'kind': 'cron', 'expr': f'*/{rng.randint(5, 60)} * * * *'},
+         'state': {'lastRunAtMs': 0, 'lastStatus': rng.choice(['ok', 'error'])}}
+        for i in range(opts.cron_jobs)]})
+    dump('devices/paired.json', {f'dev-{i}': {'name': f'device {i}', 'platform': 'linux'} for i in range(3)})
+    dump('devices/pending.json', {})
+    dump('update-check.json', {'lastCheckedAt': 0, 'latest': '2026.10.1'})
+    dump('exec-approvals.json', {'allow': ['ls', 'cat']})
+    os.makedirs(os.path.join(oc_root, 'credentials'), exist_ok=True)
+
+
+def generate(root, **overrides):
+    """Build a fixture under `root`. Returns the options actually used."""
+    opts = _parser().parse_args([root])
+    for k, v in overrides.items():
+        setattr(opts, k, v)
+    rng = random.Random(opts.seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    oc_root = os.path.join(root, '.openclaw')
+    for i in range(opts.agents):
+        _write_agent(rng, oc_root, 'main' if i == 0 else f'agent{i}', opts, now)
+    _write_misc(rng, oc_root, opts)
+    _write_logs(rng, os.path.join(root, 'logs'), opts, datetime.now())
+    return opts
+
+
+def _parser():
+    p = argparse.ArgumentParser(description='Generate a synthetic ~/.openclaw tree')
+    p.add_argument('root', help='directory to create; it becomes $HOME for the monitor')
+    p.add_argument('--agents', type=int, default=2, help='number of agents (first is main)')
+    p.add_argument('--sessions', type=int, default=50, help='sessions per agent')
+    p.add_argument('--turns', type=int, default=40, help='user/assistant turns per session')
+    p.add_argument('--text-size', type=int, default=600, help='chars per assistant text block')
+    p.add_argument('--result-size', type=int, default=1500, help='chars per tool result')
+    p.add_argument('--tool-density', type=float, default=0.5, help='fraction of turns with tool calls')
+    p.add_argument('--usage-rate', type=float, default=0.9, help='fraction of assistant turns with usage')
+    p.add_argument('--thinking', action=argparse.BooleanOptionalAction, default=True,
+                   help='include thinking blocks')
+    p.add_argument('--meta-padding', type=int, default=20,
+                   help='report sections / skills per sessions.json entry (controls its size)')
+    p.add_argument('--cron-jobs', type=int, default=12)
+    p.add_argument('--log-days', type=int, default=2, help='daily log files to write')
+    p.add_argument('--log-rate', type=float, default=20, help='log lines per minute')
+    p.add_argument('--seed', type=int, default=1)
+    return p
+
+
+if __name__ == '__main__':
+    args = _parser().parse_args()
+    generate(args.root, **{k: v for k, v in vars(args).items() if k != 'root'})
+    print(json.dumps({'root': os.path.abspath(args.root), 'home': os.path.abspath(args.root),
+                      'logDir': os.path.abspath(os.path.join(args.root, 'logs'))}))
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Load test: N virtual dashboard tabs against a local monitor process that
+runs on a synthetic ~/.openclaw tree with a fake `openclaw` binary.
+
+Each virtual tab replays the browser's traffic:
+  dashboard  (default) one /api/dashboard/stream EventSource, the live log
+             EventSource, and /api/system every 30s as sessions.js does
+  legacy     the pre-stream polling pattern: /api/health every 3s,
+             /api/sessions every 5s, /api/system every 30s, plus the live
+             log EventSource
+Streams that end are reopened after 3s, like sse.js does.
+
+Reports request latency p50/p99 per endpoint and the server's thread
+count, RSS and child-process count (sampled from /proc, Linux only).
+
+Usage:
+    python3 bench/loadtest.py --clients 20 --duration 60
+    python3 bench/loadtest.py --pattern legacy --clients 10 --password secret
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR  = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import fixture  # noqa: E402
+
+_PATTERNS = {
+    'dashboard': {'polls': [('/api/system', 30)],
+                  'streams': ['/api/dashboard/stream', '/api/logs/stream']},
+    'legacy':    {'polls': [('/api/health', 3), ('/api/sessions', 5), ('/api/system', 30)],
+                  'streams': ['/api/logs/stream']},
+}
+_STREAM_RETRY = 3     # seconds, matches sse.js / EventSource default
+
+
+def _free_port():
+    s = socket.socket()
+    s.bind(('127.0.0.1', 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 2)
+
+
+# ── Server process probes (/proc) ────────────────────────
+def _proc_status(pid):
+    out = {}
+    try:
+        with open(f'/proc/{pid}/status') as fh:
+            for line in fh:
+                k, _, v = line.partition(':')
+                if k in ('Threads', 'VmRSS'):
+                    out[k] = int(v.split()[0])
+    except OSError:
+        pass
+    return out
+
+
+def _children(pid):
+    n = 0
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as fh:
+                stat = fh.read()
+        except OSError:
+            continue
+        # field 4 (ppid) follows the parenthesised command name
+        if int(stat.rpartition(')')[2].split()[1]) == pid:
+            n += 1
+    return n
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, pid, stop):
+        super().__init__(daemon=True)
+        self.pid, self.stop = pid, stop
+        self.samples = []
+
+    def run(self):
+        while not self.stop.is_set():
+            st = _proc_status(self.pid)
+            self.samples.append({'threads': st.get('Threads', 0), 'rssKb': st.get('VmRSS', 0),
+                                 'children': _children(self.pid)})
+            self.stop.wait(1)
+
+    def summary(self):
+        def agg(key):
+            vals = [s[key] for s in self.samples]
+            return {'max': max(vals), 'mean': round(sum(vals) / len(vals), 1), 'last': vals[-1]} if vals else None
+        return {'samples': len(self.samples), 'threads': agg('threads'),
+                'rssKb': agg('rssKb'), 'children': agg('children')}
+
+
+# ── Virtual client ───────────────────────────────────────
+class _Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}     # path → [ms]
+        self.errors = {}      # path → count
+        self.first_event = {} # stream path → [ms]
+        self.refused = {}     # stream path → status:warn count
+
+    def sample(self, table, key, ms):
+        with self.lock:
+            table.setdefault(key, []).append(ms)
+
+    def count(self, table, key):
+        with self.lock:
+            table[key] = table.get(key, 0) + 1
+
+
+def _poller(port, cookie, path, interval, stop, stats):
+    conn = None
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            conn.request('GET', path, headers={'Cookie': cookie})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                stats.count(stats.errors, path)
+            else:
+                stats.sample(stats.latency, path, (time.perf_counter() - t0) * 1000)
+            if resp.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            stats.count(stats.errors, path)
+            if conn:
+                conn.close()
+            conn = None
+        stop.wait(interval)
+    if conn:
+        conn.close()
+
+
+def _streamer(port, cookie, path, stop, stats):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        first = True
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=20)
+            conn.request('GET', path, headers={'Cookie': cookie, 'Accept': 'text/event-stream'})
+            resp = conn.getresponse()
+            event = None
+            while not stop.is_set():
+                line = resp.fp.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8', errors='replace').rstrip('\n')
+                if line.startswith('event: '):
+                    event = line[7:]
+                elif line.startswith('data: '):
+                    if first:
+                        first = False
+                        stats.sample(stats.first_event, path, (time.perf_counter() - t0) * 1000)
+                    if event == 'status' and '"warn"' in line:
+                        stats.count(stats.refused, path)
+            conn.close()
+        except (OSError, http.client.HTTPException):
+            stats.count(stats.errors, path)
+        stop.wait(_STREAM_RETRY)
+
+
+# ── Harness ──────────────────────────────────────────────
+def _login(port, password):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    conn.request('GET', '/api/health')
+    resp = conn.getresponse()
+    resp.read()
+    if resp.status != 401:
+        return ''
+    if password is None:
+        sys.exit('monitor has auth enabled (.auth present); pass --password')
+    conn.request('POST', '/api/login', body=json.dumps({'password': password}),
+                 headers={'Content-Type': 'application/json'})
+    resp = conn.getresponse()
+    resp.read()
+    cookie = (resp.getheader('Set-Cookie') or '').split(';')[0]
+    if resp.status != 200 or not cookie:
+        sys.exit('login failed')
+    return cookie
+
+
+def _wait_ready(port, proc, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            sys.exit('monitor exited during start-up')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit('monitor did not start listening')
+
+
+def main():
+    p = argparse.ArgumentParser(description='openclaw-monitor load test')
+    p.add_argument('--clients', type=int, default=10, help='virtual dashboard tabs')
+    p.add_argument('--duration', type=float, default=30, help='seconds of steady load')
+    p.add_argument('--ramp', type=float, default=5, help='seconds over which clients connect')
+    p.add_argument('--pattern', choices=sorted(_PATTERNS), default='dashboard')
+    p.add_argument('--fixture', help='existing fixture root; default: generate a temp one')
+    p.add_argument('--cli-delay', type=float, default=0.3, help='fake openclaw start-up delay (s)')
+    p.add_argument('--gateway', action=argparse.BooleanOptionalAction, default=True,
+                   help='listen on a fake gateway port so health reports online')
+    p.add_argument('--password', help='monitor password when .auth is present')
+    p.add_argument('--out', help='write JSON here instead of stdout')
+    args = p.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='oc-load-')
+    root = args.fixture or os.path.join(tmp, 'home')
+    if not args.fixture:
+        fixture.generate(root, sessions=20, turns=20, log_days=1, log_rate=2)
+
+    bin_dir = os.path.join(tmp, 'bin')
+    os.makedirs(bin_dir)
+    wrapper = os.path.join(bin_dir, 'openclaw')
+    with open(wrapper, 'w') as fh:
+        fh.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(BENCH_DIR, "fake_openclaw.py")}" "$@"\n')
+    os.chmod(wrapper, 0o755)
+
+    gw = None
+    env = dict(os.environ, HOME=os.path.abspath(root), XDG_CACHE_HOME=os.path.join(tmp, 'cache'),
+               PATH=bin_dir + os.pathsep + os.environ.get('PATH', ''),
+               FAKE_OPENCLAW_DELAY=str(args.cli_delay))
+    if args.gateway:
+        gw = socket.socket()
+        gw.bind(('127.0.0.1', 0))
+        gw.listen(128)
+        env['OPENCLAW_GATEWAY_PORT'] = str(gw.getsockname()[1])
+
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, 'src', 'server.py'), '--port', str(port)],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    stop = threading.Event()
+    sampler = _Sampler(proc.pid, stop)
+    try:
+        _wait_ready(port, proc)
+        cookie = _login(port, args.password)
+        sampler.start()
+
+        pattern = _PATTERNS[args.pattern]
+        stats = _Stats()
+        threads = []
+        for i in range(args.clients):
+            for path, interval in pattern['polls']:
+                threads.append(threading.Thread(target=_poller, daemon=True,
+                                                args=(port, cookie, path, interval, stop, stats)))
+            for path in pattern['streams']:
+                threads.append(threading.Thread(target=_streamer, daemon=True,
+                                                args=(port, cookie, path, stop, stats)))
+        per_client = len(pattern['polls']) + len(pattern['streams'])
+        for n, t in enumerate(threads):
+            t.start()
+            if (n + 1) % per_client == 0 and args.clients > 1:
+                time.sleep(args.ramp / args.clients)
+        time.sleep(args.duration)
+    finally:
+        stop.set()
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        if gw:
+            gw.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    with stats.lock:
+        endpoints = {
+            path: {'requests': len(v), 'p50Ms': _pct(v, 0.5), 'p99Ms': _pct(v, 0.99),
+                   'maxMs': _pct(v, 1.0), 'errors': stats.errors.get(path, 0)}
+            for path, v in sorted(stats.latency.items())
+        }
+        streams = {
+            path: {'opened': len(stats.first_event.get(path, [])),
+                   'firstEventP50Ms': _pct(stats.first_event.get(path, []), 0.5),
+                   'firstEventP99Ms': _pct(stats.first_event.get(path, []), 0.99),
+                   'refused': stats.refused.get(path, 0), 'errors': stats.errors.get(path, 0)}
+            for path in pattern['streams']
+        }
+    doc = {
+        'pattern':   args.pattern,
+        'clients':   args.clients,
+        'duration':  args.duration,
+        'cliDelay':  args.cli_delay,
+        'endpoints': endpoints,
+        'streams':   streams,
+        'server':    sampler.summary(),
+    }
+    out = json.dumps(doc, indent=2)
+    if args.out:
+        with open(args.out, 'w') as fh:
+            fh.write(out + '\n')
+    else:
+        print(out)
+
+
+if __name__ == '__main__':
+    main()
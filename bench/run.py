@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the monitor's hot paths, run against a synthetic
+~/.openclaw tree (see fixture.py). Prints one JSON document so results
+can be diffed across commits.
+
+Usage:
+    python3 bench/run.py                         # temp fixture, default sizes
+    python3 bench/run.py --fixture /tmp/oc-fixture --out before.json
+    python3 bench/run.py --only parse_log_line,parse_log_lines,classify
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR   = os.path.join(os.path.dirname(BENCH_DIR), 'src')
+sys.path.insert(0, BENCH_DIR)
+
+import fixture  # noqa: E402
+
+
+def _timeit(fn, repeat):
+    """Run fn `repeat` times; return wall-clock stats in ms."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        'repeat': repeat,
+        'minMs':  round(min(samples), 3),
+        'medMs':  round(statistics.median(samples), 3),
+        'meanMs': round(statistics.fmean(samples), 3),
+        'maxMs':  round(max(samples), 3),
+    }
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+
+def _transcripts():
+    import sessions
+    paths = []
+    for d in sessions._agent_session_dirs():
+        paths.extend(os.path.join(d, n) for n in sorted(os.listdir(d)) if n.endswith('.jsonl'))
+    return paths
+
+
+def _log_lines(log_dir):
+    lines = []
+    for name in sorted(os.listdir(log_dir)):
+        with open(os.path.join(log_dir, name), encoding='utf-8') as fh:
+            lines.extend(line.strip() for line in fh if line.strip())
+    return lines
+
+
+# ── Benchmarks ───────────────────────────────────────────
+def bench_read_session_info(ctx):
+    # transcript summaries are cached per agent shard; this is the uncached
+    # parse a shard runs for every new or changed transcript
+    import sessions
+    paths = [(p, os.path.getmtime(p)) for p in _transcripts()]
+    size = sum(os.path.getsize(p) for p, _ in paths)
+
+    def cold():
+        for p, mtime in paths:
+            sessions._read_session_info(p, mtime)
+
+    c = _timeit(cold, ctx.repeat)
+    return {'files': len(paths), 'bytes': size, 'cold': c,
+            'coldMBps': round(size / 1e6 / (c['medMs'] / 1000), 1) if c['medMs'] else None}
+
+
+def bench_session_listing(ctx):
+    # _scan_session_files was replaced by per-agent shards; this measures
+    # the equivalent listing path: a cold shard rebuild and a warm re-list.
+    import agents
+
+    def cold():
+        agents._shards.clear()
+        agents._discover()
+        agents.list_sessions()
+
+    def warm():
+        for shard in agents.get_shards():
+            shard.refresh()
+        agents.list_sessions()
+
+    c = _timeit(cold, ctx.repeat)
+    warm()
+    return {'sessions': len(agents.list_sessions()), 'cold': c, 'warm': _timeit(warm, ctx.repeat)}
+
+
+def bench_api_system(ctx):
+    import system
+    return {'payloadBytes': len(json.dumps(system._system_payload(), ensure_ascii=False)),
+            'payload': _timeit(system._system_payload, ctx.repeat)}
+
+
+def bench_parse_log_line(ctx):
+    import logs
+    lines = ctx.log_lines
+
+    def run():
+        for line in lines:
+            logs._parse_log_line(line)
+
+    r = _timeit(run, ctx.repeat)
+    return {'lines': len(lines), 'run': r,
+            'linesPerSec': round(len(lines) / (r['medMs'] / 1000)) if r['medMs'] else None}
+
+
+def bench_parse_log_lines(ctx):
+    # the batch API exists to take one perf sample per read, not to parse
+    # faster: it should track parse_log_line within noise
+    import logs
+    lines = ctx.log_lines
+    if not hasattr(logs, '_parse_log_lines'):
+        return {'skipped': 'logs._parse_log_lines not available at this revision'}
+    batches = [lines[i:i + 256] for i in range(0, len(lines), 256)]
+
+    def run():
+        for batch in batches:
+            logs._parse_log_lines(batch)
+
+    r = _timeit(run, ctx.repeat)
+    return {'lines': len(lines), 'batch': 256, 'run': r,
+            'linesPerSec': round(len(lines) / (r['medMs'] / 1000)) if r['medMs'] else None}
+
+
+def bench_classify(ctx):
+    import logs
+    lines = ctx.log_lines
+
+    def run():
+        for line in lines:
+            logs._classify(line)
+
+    r = _timeit(run, ctx.repeat)
+    return {'lines': len(lines), 'run': r,
+            'linesPerSec': round(len(lines) / (r['medMs'] / 1000)) if r['medMs'] else None}
+
+
+def bench_parse_jsonl_line(ctx):
+    import jsonl
+    lines = []
+    for p in _transcripts()[:50]:
+        with open(p, encoding='utf-8') as fh:
+            lines.extend(fh)
+
+    def run():
+        for line in lines:
+            jsonl._parse_jsonl_line(line)
+
+    r = _timeit(run, ctx.repeat)
+    return {'lines': len(lines), 'run': r,
+            'linesPerSec': round(len(lines) / (r['medMs'] / 1000)) if r['medMs'] else None}
+
+
+def bench_session_replay(ctx):
+    """Replay of the largest transcript as _api_session_stream does it:
+    parse every line and encode it into SSE frames (socket write stubbed)."""
+    import jsonl
+    from sse import _SSEWriter
+
+    class _Sink:
+        bytes = 0
+
+        def write(self, b):
+            _Sink.bytes += len(b)
+
+        def flush(self):
+            pass
+
+    class _Handler:
+        wfile = _Sink()
+
+    path = max(_transcripts(), key=os.path.getsize)
+
+    def run():
+        writer = _SSEWriter(_Handler)
+        with open(path) as fh:
+            for line in fh:
+                parsed = jsonl._parse_jsonl_line(line)
+                if parsed:
+                    writer.send('session_event', parsed)
+        writer.flush()
+
+    _Sink.bytes = 0
+    r = _timeit(run, ctx.repeat)
+    return {'bytesIn': os.path.getsize(path), 'bytesOut': _Sink.bytes // ctx.repeat, 'run': r,
+            'MBps': round(os.path.getsize(path) / 1e6 / (r['medMs'] / 1000), 1) if r['medMs'] else None}
+
+
+def bench_sse_fanout(ctx):
+    """N dashboard subscribers on an in-process server: time to first snapshot,
+    and delay from a transcript append until every client saw the delta."""
+    import http.client
+    import auth
+    import agents
+    from handler import Handler
+    from server import _Server
+
+    agents.start()
+    srv = _Server(('127.0.0.1', 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    port = srv.server_address[1]
+    cookie = f'monitor_sid={auth._create_session()}'
+
+    n = ctx.clients
+    connect_ms, deliver_ms = [], []
+    seen = [threading.Event() for _ in range(n)]
+    ready = threading.Barrier(n + 1)
+    marker = {'t': None, 'sid': None}
+
+    def client(i):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        t0 = time.perf_counter()
+        conn.request('GET', '/api/dashboard/stream', headers={'Cookie': cookie})
+        resp = conn.getresponse()
+        event, got_snapshot = None, False
+        try:
+            while True:
+                line = resp.fp.readline()
+                if not line:
+                    break
+                line = line.decode('utf-8').rstrip('\n')
+                if line.startswith('event: '):
+                    event = line[7:]
+                elif line.startswith('data: ') and event == 'sessions':
+                    if not got_snapshot:
+                        got_snapshot = True
+                        connect_ms.append((time.perf_counter() - t0) * 1000)
+                        ready.wait()
+                    elif marker['sid'] and marker['sid'] in line:
+                        deliver_ms.append((time.perf_counter() - marker['t']) * 1000)
+                        seen[i].set()
+                        break
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(n)]
+    for t in threads:
+        t.start()
+    ready.wait(timeout=60)
+
+    path = _transcripts()[0]
+    marker['sid'] = os.path.basename(path)[:-len('.jsonl')]
+    marker['t'] = time.perf_counter()
+    with open(path, 'a') as fh:
+        fh.write(json.dumps({'type': 'message', 'message': {'role': 'user', 'content': 'bench'}}) + '\n')
+    for ev in seen:
+        ev.wait(timeout=30)
+    srv.shutdown()
+    return {
+        'clients':        n,
+        'snapshotP50Ms':  _pct(connect_ms, 0.5),
+        'snapshotP99Ms':  _pct(connect_ms, 0.99),
+        'deliveredTo':    len(deliver_ms),
+        'deliverP50Ms':   _pct(deliver_ms, 0.5),
+        'deliverMaxMs':   _pct(deliver_ms, 1.0),
+    }
+
+
+BENCHES = {
+    'read_session_info':    bench_read_session_info,
+    'session_listing':      bench_session_listing,
+    'api_system':           bench_api_system,
+    'parse_log_line':       bench_parse_log_line,
+    'parse_log_lines':      bench_parse_log_lines,
+    'classify':             bench_classify,
+    'parse_jsonl_line':     bench_parse_jsonl_line,
+    'session_replay':       bench_session_replay,
+    'sse_fanout':           bench_sse_fanout,
+}
+
+
+def _git_rev():
+    try:
+        r = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                           text=True, timeout=5, cwd=BENCH_DIR)
+        return r.stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+def main():
+    p = argparse.ArgumentParser(description='openclaw-monitor benchmarks')
+    p.add_argument('--fixture', help='existing fixture root (from fixture.py); default: generate a temp one')
+    p.add_argument('--sessions', type=int, default=50, help='sessions per agent for a generated fixture')
+    p.add_argument('--turns', type=int, default=40, help='turns per session for a generated fixture')
+    p.add_argument('--repeat', type=int, default=5)
+    p.add_argument('--clients', type=int, default=20, help='subscribers for sse_fanout')
+    p.add_argument('--only', default='', help='comma-separated benchmark names')
+    p.add_argument('--out', help='write JSON here instead of stdout')
+    args = p.parse_args()
+
+    tmp = None
+    root = args.fixture
+    if not root:
+        tmp = root = tempfile.mkdtemp(prefix='oc-bench-')
+        fixture.generate(root, sessions=args.sessions, turns=args.turns)
+
+    # config resolves ~/.openclaw at import time and parses sys.argv
+    os.environ['HOME'] = os.path.abspath(root)
+    os.environ['XDG_CACHE_HOME'] = os.path.join(os.path.abspath(root), '.cache')
+    sys.argv = [sys.argv[0]]
+    sys.path.insert(0, SRC_DIR)
+
+    args.log_lines = _log_lines(os.path.join(root, 'logs'))
+    names = [n for n in args.only.split(',') if n] or list(BENCHES)
+    results = {}
+    try:
+        for name in names:
+            results[name] = BENCHES[name](args)
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    try:
+        import codec
+        backend = codec.BACKEND
+    except ImportError:
+        backend = 'json'
+    doc = {
+        'rev':       _git_rev(),
+        'python':    platform.python_version(),
+        'json':      backend,
+        'platform':  platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'fixture':   {'sessionsPerAgent': args.sessions, 'turns': args.turns} if tmp else {'root': root},
+        'results':   results,
+    }
+    out = json.dumps(doc, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w') as fh:
+            fh.write(out + '\n')
+    else:
+        print(out)
+
+
+if __name__ == '__main__':
+    main()
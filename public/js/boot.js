@@ -1,6 +1,6 @@
 import { S } from './state.js';
-import { renderSessions, switchView, loadSessions } from './sessions.js';
-import { pollHealth } from './connection.js';
+import { renderSessions, switchView } from './sessions.js';
+import { startDashboard, stopDashboard } from './dashboard.js';
 
 export function sleep(ms) { return new Promise(r => setTimeout(r, ms)); }
 
@@ -43,6 +43,7 @@ function updateBootAlertText(health) {
 export async function bootCheck() {
   if (S.sessionsTimer) { clearInterval(S.sessionsTimer); S.sessionsTimer = null; }
   if (S.healthTimer)   { clearInterval(S.healthTimer);   S.healthTimer = null; }
+  stopDashboard();
 
   const screen   = document.getElementById('boot-screen');
   const spinner  = document.getElementById('boot-spinner');
@@ -72,9 +73,7 @@ export async function bootCheck() {
       S.sessions = [];
     }
     switchView('system');
-    S.sessionsTimer = setInterval(loadSessions, 5000);
-    pollHealth();
-    S.healthTimer = setInterval(pollHealth, 3000);
+    startDashboard();
     return;
   }
 
@@ -164,7 +163,5 @@ export async function bootCheck() {
 
   screen.classList.add('hidden');
   switchView('live');
-  S.sessionsTimer = setInterval(loadSessions, 5000);
-  pollHealth();
-  S.healthTimer = setInterval(pollHealth, 3000);
+  startDashboard();
 }
@@ -68,20 +68,23 @@ export function initGwOverlay() {
 }
 
 /* ── Health polling ────────────────────────────────────── */
+export function applyHealth(h) {
+  const online = !!h.openclaw_available;
+  const prev = S.gatewayOnline;
+  if (prev !== null && online !== prev) {
+    _showGwOverlay(online);
+  }
+  S.gatewayOnline = online;
+  updateLiveTag(online);
+}
+
 let _healthPolling = false;
 export async function pollHealth() {
   if (_healthPolling) return;
   _healthPolling = true;
   try {
     const res = await fetch('/api/health');
-    const h = await res.json();
-    const online = !!h.openclaw_available;
-    const prev = S.gatewayOnline;
-    if (prev !== null && online !== prev) {
-      _showGwOverlay(online);
-    }
-    S.gatewayOnline = online;
-    updateLiveTag(online);
+    applyHealth(await res.json());
   } catch(e) { /* monitor server itself unreachable */ }
   _healthPolling = false;
 }
@@ -0,0 +1,95 @@
+import { S } from './state.js';
+import { applyHealth, pollHealth } from './connection.js';
+import { renderSessions, loadSessions, updateSessionSummary } from './sessions.js';
+import { renderSystem } from './render-system.js';
+
+/* ── Multiplexed dashboard stream ─────────────────────── */
+// One EventSource carries health, session deltas, CLI cache and system
+// changes; the old polling timers are only used when the stream is refused.
+// A refused or closed stream is retried with a growing delay while polling.
+
+let _retries    = 0;          // refused/closed attempts since the last health event
+let _retryTimer = null;
+
+function _startPolling() {
+  if (!S.sessionsTimer) S.sessionsTimer = setInterval(loadSessions, 5000);
+  if (!S.healthTimer) {
+    pollHealth();
+    S.healthTimer = setInterval(pollHealth, 3000);
+  }
+}
+
+function _stopPolling() {
+  if (S.sessionsTimer) { clearInterval(S.sessionsTimer); S.sessionsTimer = null; }
+  if (S.healthTimer)   { clearInterval(S.healthTimer);   S.healthTimer = null; }
+}
+
+function _applySessions(d) {
+  const byId = new Map(d.reset ? [] : S.sessions.map(s => [s.id, s]));
+  (d.remove || []).forEach(id => byId.delete(id));
+  (d.upsert || []).forEach(s => byId.set(s.id, s));
+  S.sessions = [...byId.values()];
+  renderSessions();
+  updateSessionSummary();
+}
+
+/* a status transition pushed ahead of the next sessions delta */
+function _applySessionState(d) {
+  const s = S.sessions.find(x => x.id === d.id);
+  if (!s || (s.status === d.status && s.state === d.state)) return;
+  s.status = d.status;
+  s.state = d.state;
+  if (d.status === 'idle') s.idle_since = d.since;
+  else delete s.idle_since;
+  renderSessions();
+  updateSessionSummary();
+}
+
+function _applySystem(part) {
+  S.systemData = Object.assign({}, S.systemData, part);
+  if (S.view === 'system') renderSystem(S.systemData);
+}
+
+function _retryLater() {
+  const delay = Math.min(5000 * 2 ** _retries, 120000);
+  _retries++;
+  _retryTimer = setTimeout(() => { _retryTimer = null; startDashboard(); }, delay);
+}
+
+export function stopDashboard() {
+  if (_retryTimer) { clearTimeout(_retryTimer); _retryTimer = null; }
+  if (S.dashES) { S.dashES.close(); S.dashES = null; }
+  S.dashLive = false;
+}
+
+export function startDashboard() {
+  stopDashboard();
+  const es = new EventSource('/api/dashboard/stream');
+  S.dashES = es;
+
+  es.addEventListener('health', e => {
+    if (!S.dashLive) { S.dashLive = true; _retries = 0; _stopPolling(); }
+    applyHealth(JSON.parse(e.data));
+  });
+  es.addEventListener('sessions',  e => _applySessions(JSON.parse(e.data)));
+  es.addEventListener('session_state', e => _applySessionState(JSON.parse(e.data)));
+  es.addEventListener('cli_cache', e => _applySystem(JSON.parse(e.data)));
+  es.addEventListener('system',    e => _applySystem(JSON.parse(e.data)));
+  es.addEventListener('status', e => {
+    if (JSON.parse(e.data).type === 'warn') {
+      // too many dashboard streams: poll, and try the stream again later
+      stopDashboard();
+      _startPolling();
+      _retryLater();
+    }
+  });
+  es.onerror = () => {
+    // EventSource reconnects by itself; poll meanwhile so nothing goes stale
+    S.dashLive = false;
+    _startPolling();
+    if (es.readyState === EventSource.CLOSED && S.dashES === es) {
+      stopDashboard();
+      _retryLater();
+    }
+  };
+}
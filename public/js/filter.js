@@ -1,11 +1,17 @@
 import { S } from './state.js';
-import { appendLogRow } from './render-log.js';
+import { setLogRows } from './render-log.js';
+
+const FILTER_TYPES = { queue:['enqueue','dequeue'], run:['run_start','run_done'],
+                       tool:['tool_start','tool_end'], session:['session_state'], error:['error','warn'] };
+
+/* log types a filter pill subscribes to, or null for everything */
+export function filterTypes(f) {
+  return f === 'all' ? null : (FILTER_TYPES[f] || []);
+}
 
 export function filterMatch(type, f) {
   if (f === 'all') return true;
-  const map = { queue:['enqueue','dequeue'], run:['run_start','run_done'],
-                tool:['tool_start','tool_end'], session:['session_state'], error:['error','warn'] };
-  return map[f] && map[f].includes(type);
+  return FILTER_TYPES[f] && FILTER_TYPES[f].includes(type);
 }
 
 export function searchMatch(text, query) {
@@ -14,11 +20,7 @@ export function searchMatch(text, query) {
 }
 
 export function reRenderLive() {
-  const stream = document.getElementById('stream');
-  stream.innerHTML = '';
-  S.liveLogs.forEach(d => {
-    if (filterMatch(d.type, S.filter) && searchMatch(d.raw || '', S.searchQuery)) {
-      appendLogRow(d);
-    }
-  });
+  // a worker-backed stream keeps the buffer and filters it off-thread
+  if (S.es && S.es.refilter) { S.es.refilter(); return; }
+  setLogRows(S.liveLogs.filter(d => filterMatch(d.type, S.filter) && searchMatch(d.raw || '', S.searchQuery)));
 }
@@ -33,6 +33,8 @@ export const I18N = {
     user: 'User',
     assistant: 'Assistant',
     toolResult: 'Tool Result',
+    showFull: 'Show full',
+    loadFailed: 'Load failed — retry',
     meta: 'Meta',
     thinking: 'Thinking',
     response: 'Response',
@@ -62,7 +64,9 @@ export const I18N = {
     modelSwitchHint: 'Switch will update openclaw.json and restart gateway.',
     modelSwitchProgressTitle: 'Switch Progress',
     modelSwitchStepWrite: 'Write config',
-    modelSwitchStepRestart: 'Restart service',
+    modelSwitchStepRestart: 'Restart issued',
+    modelSwitchStepDown: 'Gateway port down',
+    modelSwitchStepUp: 'Gateway port back up',
     modelSwitchStepPending: 'Pending',
     modelSwitchStepRunning: 'Running…',
     modelSwitchStepDone: 'Done',
@@ -151,6 +155,8 @@ export const I18N = {
     user: '用户',
     assistant: '助手',
     toolResult: '工具结果',
+    showFull: '显示全部',
+    loadFailed: '加载失败，点击重试',
     meta: '元数据',
     thinking: '思考中',
     response: '回答',
@@ -180,7 +186,9 @@ export const I18N = {
     modelSwitchHint: '点击切换后会更新 openclaw.json 并重启 gateway。',
     modelSwitchProgressTitle: '切换进度',
     modelSwitchStepWrite: '写入配置',
-    modelSwitchStepRestart: '重启服务',
+    modelSwitchStepRestart: '已发出重启',
+    modelSwitchStepDown: 'Gateway 端口已关闭',
+    modelSwitchStepUp: 'Gateway 端口已恢复',
     modelSwitchStepPending: '等待中',
     modelSwitchStepRunning: '执行中…',
     modelSwitchStepDone: '已完成',
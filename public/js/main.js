@@ -9,6 +9,8 @@ import { loadModels } from './render-models.js';
 import { bootCheck } from './boot.js';
 import { initGwOverlay } from './connection.js';
 import { reRenderLive } from './filter.js';
+import { restartLive } from './sse.js';
+import { resetLogView } from './render-log.js';
 
 // Register functions on window for inline onclick handlers
 window.switchView = switchView;
@@ -59,14 +61,14 @@ function bindAll() {
   searchInput.addEventListener('input', function() {
     S.searchQuery = this.value;
     searchClear.classList.toggle('show', this.value.length > 0);
-    if (S.view === 'live') reRenderLive();
+    if (S.view === 'live') { reRenderLive(); restartLive(400); }
   });
 
   searchClear.onclick = () => {
     searchInput.value = '';
     S.searchQuery = '';
     searchClear.classList.remove('show');
-    if (S.view === 'live') reRenderLive();
+    if (S.view === 'live') { reRenderLive(); restartLive(); }
   };
 
   document.querySelectorAll('.fpill').forEach(btn => {
@@ -74,7 +76,7 @@ function bindAll() {
       S.filter = btn.dataset.f;
       document.querySelectorAll('.fpill').forEach(b => b.classList.remove('active'));
       btn.classList.add('active');
-      if (S.view === 'live') reRenderLive();
+      if (S.view === 'live') { reRenderLive(); restartLive(); }
     };
   });
 
@@ -86,7 +88,10 @@ function bindAll() {
   };
 
   document.getElementById('btn-clr').onclick = () => {
+    // a worker-backed stream keeps its own buffer for re-filtering
+    if (S.es && S.es.clear) S.es.clear();
     S.liveLogs = [];
+    resetLogView();
     document.getElementById('evt-cnt').textContent = '0';
     document.getElementById('stream').innerHTML = '';
   };
@@ -3,6 +3,30 @@ import { i18n } from './i18n.js';
 import { esc, fmtTime, badgeLabel, linkSids, rmEmpty } from './utils.js';
 import { showToast } from './toast.js';
 
+/* ── Virtual live-log list ──────────────────────────────
+   Rows live in a bounded array; only the ones in (or near) the viewport
+   exist in the DOM. Appends are queued and applied once per animation
+   frame, and one delegated listener on #stream handles expand and copy. */
+
+const LIVE_LOG_CAP = 5000;    // rows kept in S.liveLogs / the view
+const OVERSCAN     = 12;      // rows rendered above and below the viewport
+
+const COPY_ICON = '<span class="icon icon-sm"><svg viewBox="0 0 24 24"><rect x="9" y="9" width="13" height="13" rx="2"/><path d="M5 15H4a2 2 0 01-2-2V4a2 2 0 012-2h9a2 2 0 012 2v1"/></svg></span>';
+const DONE_ICON = '<span class="icon icon-sm"><svg viewBox="0 0 24 24"><polyline points="20 6 9 17 4 12"/></svg></span>';
+
+let _rows     = [];           // entries shown, after filtering
+let _pending  = [];           // queued by appendLogRow, applied next frame
+let _frame    = 0;
+let _force    = false;        // re-render even if the window did not move
+let _stick    = false;        // rows were added: follow the tail if autoScroll
+let _list     = null;         // .log-vlist: full-height spacer
+let _win      = null;         // .log-vwin: the rendered slice
+let _rowH     = 0;            // measured height of a collapsed row
+let _expanded = [];           // [index, extra px] of expanded rows, by index
+let _first    = -1;
+let _last     = -1;
+let _count    = null;         // buffer size reported by the stream worker
+
 export function ensureLogHeader() {
   const stream = document.getElementById('stream');
   let header = stream.querySelector('.log-header');
@@ -14,75 +38,219 @@ export function ensureLogHeader() {
   header.innerHTML = `<span>${i18n('time')}</span><span>${i18n('type')}</span><span>${i18n('content')}</span><span>${i18n('actions')}</span>`;
 }
 
-export function appendLogRow(data) {
+/* create the list inside #stream if another view replaced it */
+function mount() {
+  if (_list && _list.isConnected) return;
   const stream = document.getElementById('stream');
   rmEmpty(stream);
   ensureLogHeader();
+  _list = document.createElement('div');
+  _list.className = 'log-vlist';
+  _win = document.createElement('div');
+  _win.className = 'log-vwin';
+  _list.appendChild(_win);
+  stream.appendChild(_list);
+  _first = _last = -1;
+  if (!stream._logDelegated) {
+    stream._logDelegated = true;
+    stream.addEventListener('click', onClick);
+    stream.addEventListener('scroll', () => { if (_list && _list.isConnected) schedule(); }, { passive: true });
+  }
+}
 
-  const t    = data.type || 'other';
-  const ts   = data.timestamp || data.ts || data.time || data['@timestamp'] || (data._meta && data._meta.date) || null;
-  const time = fmtTime(ts);
-  const rawText = data.raw || '';
-  const row  = document.createElement('div');
-  row.className = 'log-row';
-  row.dataset.raw = rawText;
-  row.innerHTML =
-    `<span class="lr-time">${time}</span>` +
-    `<span class="lr-badge bt-${t}">${badgeLabel(t)}</span>` +
-    `<span class="lr-msg">${linkSids(esc(rawText))}</span>` +
-    `<div class="lr-actions"><button class="copy-btn" title="Copy log"><span class="icon icon-sm"><svg viewBox="0 0 24 24"><rect x="9" y="9" width="13" height="13" rx="2"/><path d="M5 15H4a2 2 0 01-2-2V4a2 2 0 012-2h9a2 2 0 012 2v1"/></svg></span></button></div>`;
-
-  row.addEventListener('click', function(e) {
-    if (e.target.classList.contains('s-link') || e.target.classList.contains('copy-btn')) return;
-    this.classList.toggle('expanded');
-  });
-
-  const copyBtn = row.querySelector('.copy-btn');
-  copyBtn.addEventListener('click', function(e) {
-    e.stopPropagation();
-    const text = rawText;
-    const btn = this;
-
-    const copySuccess = () => {
-      btn.classList.add('copied');
-      btn.innerHTML = '<span class="icon icon-sm"><svg viewBox="0 0 24 24"><polyline points="20 6 9 17 4 12"/></svg></span>';
-      showToast(i18n('copySuccess'));
-      setTimeout(() => {
-        btn.classList.remove('copied');
-        btn.innerHTML = '<span class="icon icon-sm"><svg viewBox="0 0 24 24"><rect x="9" y="9" width="13" height="13" rx="2"/><path d="M5 15H4a2 2 0 01-2-2V4a2 2 0 012-2h9a2 2 0 012 2v1"/></svg></span>';
-      }, 1500);
-    };
-
-    const copyFail = () => {
-      showToast(i18n('copyFailed'), 'error');
-    };
-
-    if (navigator.clipboard && window.isSecureContext) {
-      navigator.clipboard.writeText(text).then(copySuccess).catch(copyFail);
-    } else {
-      const textarea = document.createElement('textarea');
-      textarea.value = text;
-      textarea.style.position = 'fixed';
-      textarea.style.opacity = '0';
-      document.body.appendChild(textarea);
-      textarea.select();
-      try {
-        document.execCommand('copy');
-        copySuccess();
-      } catch (err) {
-        copyFail();
-      }
-      document.body.removeChild(textarea);
+function schedule(force) {
+  if (force) _force = true;
+  if (!_frame) _frame = requestAnimationFrame(flush);
+}
+
+/* queue one entry for the next frame */
+export function appendLogRow(data) {
+  _pending.push(data);
+  _stick = true;
+  schedule(true);
+}
+
+/* replace the shown rows (filter change) without touching the stream */
+export function setLogRows(rows) {
+  _pending = [];
+  _rows = rows.length > LIVE_LOG_CAP ? rows.slice(-LIVE_LOG_CAP) : rows.slice();
+  for (const d of _rows) d._exp = false;
+  _expanded = [];
+  _stick = true;
+  schedule(true);
+}
+
+/* event counter when the buffer lives in the stream worker */
+export function setLogCount(n) {
+  _count = n;
+}
+
+/* drop everything (clear button, stream restart, view switch) */
+export function resetLogView() {
+  _count = null;
+  _rows = [];
+  _pending = [];
+  _expanded = [];
+  _first = _last = -1;
+  if (_list && _list.isConnected) _list.remove();
+  _list = _win = null;
+}
+
+function flush() {
+  _frame = 0;
+  if (S.view !== 'live') { _pending = []; _force = _stick = false; return; }
+  mount();
+  const stream = document.getElementById('stream');
+
+  let dropped = 0;
+  if (_pending.length) {
+    for (const d of _pending) _rows.push(d);
+    _pending = [];
+    if (_rows.length > LIVE_LOG_CAP) {
+      dropped = _rows.length - LIVE_LOG_CAP;
+      _rows = _rows.slice(dropped);
     }
-  });
+  }
+  if (S.liveLogs.length > LIVE_LOG_CAP) S.liveLogs = S.liveLogs.slice(-LIVE_LOG_CAP);
+  document.getElementById('evt-cnt').textContent = _count === null ? S.liveLogs.length : _count;
+  if (dropped) {
+    reindexExpanded();
+    // keep the rows under the reader in place when older ones fall off
+    if (!S.autoScroll) stream.scrollTo({ top: Math.max(0, stream.scrollTop - dropped * rowHeight()), behavior: 'instant' });
+  }
 
-  stream.appendChild(row);
+  _list.style.height = totalHeight() + 'px';
+  if (S.autoScroll && _stick) stream.scrollTo({ top: stream.scrollHeight, behavior: 'instant' });
+  render(stream, _force);
+  _force = _stick = false;
+}
+
+/* ── Geometry ─────────────────────────────────────────── */
+function rowHeight() { return _rowH || 23; }
 
-  const rows = stream.querySelectorAll('.log-row');
-  if (rows.length > 600) {
-    for (let i = 0; i < 100; i++) rows[i].remove();
-    S.liveLogs = S.liveLogs.slice(-500);
+function reindexExpanded() {
+  _expanded = [];
+  _rows.forEach((d, i) => { if (d._exp) _expanded.push([i, d._extra || 0]); });
+}
+
+function offsetOf(i) {
+  let y = i * rowHeight();
+  for (const [idx, extra] of _expanded) {
+    if (idx >= i) break;
+    y += extra;
   }
+  return y;
+}
 
-  if (S.autoScroll) stream.scrollTo({ top: stream.scrollHeight, behavior: 'smooth' });
+function indexAt(y) {
+  const h = rowHeight();
+  let acc = 0;
+  for (const [idx, extra] of _expanded) {
+    const top = idx * h + acc;
+    if (y < top) break;
+    if (y < top + h + extra) return idx;
+    acc += extra;
+  }
+  return Math.max(0, Math.min(_rows.length, Math.floor((y - acc) / h)));
+}
+
+function totalHeight() { return offsetOf(_rows.length); }
+
+/* cells of one row; pure, so stream-worker.js can pre-render them */
+export function logCellsHtml(d) {
+  const t    = d.type || 'other';
+  const ts   = d.timestamp || d.ts || d.time || d['@timestamp'] || (d._meta && d._meta.date) || null;
+  return `<span class="lr-time">${fmtTime(ts)}</span>` +
+    `<span class="lr-badge bt-${esc(t)}">${badgeLabel(t)}</span>` +
+    `<span class="lr-msg">${linkSids(esc(d.raw || ''))}</span>` +
+    `<div class="lr-actions"><button class="copy-btn" title="Copy log">${COPY_ICON}</button></div>`;
+}
+
+function rowHtml(d, i) {
+  if (!d._cells) d._cells = logCellsHtml(d);
+  return `<div class="log-row${d._exp ? ' expanded' : ''}" data-i="${i}">${d._cells}</div>`;
+}
+
+function render(stream, force) {
+  const y     = Math.max(0, stream.scrollTop - _list.offsetTop);
+  const first = Math.max(0, indexAt(y) - OVERSCAN);
+  const last  = Math.min(_rows.length, indexAt(y + stream.clientHeight) + OVERSCAN + 1);
+  if (!force && first === _first && last === _last) return;
+  _first = first;
+  _last  = last;
+
+  let html = '';
+  for (let i = first; i < last; i++) html += rowHtml(_rows[i], i);
+  _win.style.transform = `translateY(${offsetOf(first)}px)`;
+  _win.innerHTML = html;
+
+  // measure once, then again only for expanded rows whose height is unknown
+  let changed = false;
+  for (const el of _win.children) {
+    const d = _rows[+el.dataset.i];
+    if (!d._exp) {
+      if (!_rowH) { _rowH = el.offsetHeight || 23; changed = true; }
+    } else if (d._extra === undefined) {
+      d._extra = Math.max(0, el.offsetHeight - rowHeight());
+      changed = true;
+    }
+  }
+  if (changed) {
+    reindexExpanded();
+    _list.style.height = totalHeight() + 'px';
+    _win.style.transform = `translateY(${offsetOf(first)}px)`;
+  }
+}
+
+/* ── Delegated interaction ────────────────────────────── */
+function onClick(e) {
+  const row = e.target.closest('.log-row[data-i]');
+  if (!row || !_win || !_win.contains(row)) return;
+  const d = _rows[+row.dataset.i];
+  if (!d) return;
+  const btn = e.target.closest('.copy-btn');
+  if (btn) {
+    e.stopPropagation();
+    copyRaw(d.raw || '', btn);
+    return;
+  }
+  if (e.target.classList.contains('s-link')) return;
+  d._exp = !d._exp;
+  d._extra = undefined;
+  reindexExpanded();
+  schedule(true);
+}
+
+function copyRaw(text, btn) {
+  const copySuccess = () => {
+    btn.classList.add('copied');
+    btn.innerHTML = DONE_ICON;
+    showToast(i18n('copySuccess'));
+    setTimeout(() => {
+      btn.classList.remove('copied');
+      btn.innerHTML = COPY_ICON;
+    }, 1500);
+  };
+
+  const copyFail = () => {
+    showToast(i18n('copyFailed'), 'error');
+  };
+
+  if (navigator.clipboard && window.isSecureContext) {
+    navigator.clipboard.writeText(text).then(copySuccess).catch(copyFail);
+  } else {
+    const textarea = document.createElement('textarea');
+    textarea.value = text;
+    textarea.style.position = 'fixed';
+    textarea.style.opacity = '0';
+    document.body.appendChild(textarea);
+    textarea.select();
+    try {
+      document.execCommand('copy');
+      copySuccess();
+    } catch (err) {
+      copyFail();
+    }
+    document.body.removeChild(textarea);
+  }
 }
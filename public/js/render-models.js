@@ -58,15 +58,72 @@ function _setSwitchProgress(progressBox, fillEl, pctEl, percent, failed = false)
   if (pctEl) pctEl.textContent = `${Math.round(safePercent)}%`;
 }
 
-function _inferFailedStep(msg) {
-  const text = String(msg || '').toLowerCase();
-  if (text.includes('write config') || text.includes('failed to write config') || text.includes('写入配置')) {
-    return 'write';
-  }
-  if (text.includes('restart') || text.includes('gateway') || text.includes('重启')) {
-    return 'restart';
+/* ── Switch job progress ──────────────────────────────
+   POST /api/models/switch answers once the config is written; the gateway
+   restart runs as a server-side job whose steps arrive over SSE. */
+const _JOB_STEPS = ['written', 'issued', 'down', 'up'];
+const _STEP_LABELS = {
+  written: 'modelSwitchStepWrite',
+  issued:  'modelSwitchStepRestart',
+  down:    'modelSwitchStepDown',
+  up:      'modelSwitchStepUp',
+};
+
+function _showJobProgress(job, stepEls, progressBox, fillEl, pctEl) {
+  const seen = new Set((job.steps || []).map(s => s.step));
+  // a step counts once any later one was reached (a quick restart may skip "down")
+  let reached = -1;
+  _JOB_STEPS.forEach((step, i) => { if (seen.has(step)) reached = i; });
+  const failed = job.state === 'failed' || job.state === 'superseded';
+  _JOB_STEPS.forEach((step, i) => {
+    const state = i <= reached ? 'done'
+      : i === reached + 1 ? (failed ? 'fail' : job.state === 'done' ? 'done' : 'active')
+      : 'pending';
+    _setSwitchStepState(stepEls[i], state);
+  });
+  const pct = job.state === 'done' ? 100 : ((reached + 1) / _JOB_STEPS.length) * 100;
+  _setSwitchProgress(progressBox, fillEl, pctEl, pct, failed);
+}
+
+/* poll GET /api/models/switch/<id> when the server refused a job stream */
+async function _pollJob(jobId, onJob) {
+  for (;;) {
+    const job = await _fetchJsonOrThrow(`/api/models/switch/${encodeURIComponent(jobId)}`);
+    if (job.state === 'superseded' && job.supersededBy) return _followJob(job.supersededBy, onJob);
+    onJob(job);
+    if (job.state !== 'queued' && job.state !== 'running') return job;
+    await new Promise(resolve => setTimeout(resolve, 1000));
   }
-  return '';
+}
+
+/* follow a switch job until it ends; resolves with its final state */
+function _followJob(jobId, onJob) {
+  return new Promise((resolve, reject) => {
+    const es = new EventSource(`/api/models/switch/${encodeURIComponent(jobId)}/stream`);
+    es.addEventListener('job', e => {
+      const job = JSON.parse(e.data);
+      if (job.state === 'superseded' && job.supersededBy) {
+        // a newer switch replaced this one before its restart ran
+        es.close();
+        resolve(_followJob(job.supersededBy, onJob));
+        return;
+      }
+      onJob(job);
+      if (job.state === 'queued' || job.state === 'running') return;
+      es.close();
+      resolve(job);
+    });
+    es.onerror = () => {
+      if (es.readyState === EventSource.CLOSED) reject(new Error(i18n('modelSwitchFailed')));
+    };
+    es.addEventListener('status', e => {
+      es.close();
+      const st = JSON.parse(e.data);
+      // too many job streams open: the job itself is fine, follow it by polling
+      if (st.type === 'warn') return resolve(_pollJob(jobId, onJob));
+      reject(new Error(st.message || i18n('modelSwitchFailed')));
+    });
+  });
 }
 
 function _bindEvents(data) {
@@ -78,8 +135,7 @@ function _bindEvents(data) {
   const progressBox = document.getElementById('model-switch-progress');
   const progressFill = document.getElementById('model-switch-progress-fill');
   const progressPct = document.getElementById('model-switch-progress-pct');
-  const stepWrite = document.getElementById('model-switch-step-write');
-  const stepRestart = document.getElementById('model-switch-step-restart');
+  const steps = _JOB_STEPS.map(step => document.getElementById(`model-switch-step-${step}`));
 
   if (refreshBtn) {
     refreshBtn.onclick = () => {
@@ -114,8 +170,7 @@ function _bindEvents(data) {
       modal.classList.remove('show');
       modal.hidden = true;
     }
-    _setSwitchStepState(stepWrite, 'pending');
-    _setSwitchStepState(stepRestart, 'pending');
+    steps.forEach(el => _setSwitchStepState(el, 'pending'));
     _setSwitchProgress(progressBox, progressFill, progressPct, 0, false);
   };
 
@@ -135,17 +190,8 @@ function _bindEvents(data) {
     status.textContent = i18n('modelSwitching');
     status.className = 'model-switch-status';
     showModal();
-    _setSwitchStepState(stepWrite, 'active');
-    _setSwitchStepState(stepRestart, 'pending');
-    _setSwitchProgress(progressBox, progressFill, progressPct, 18, false);
-
-    let autoAdvance = false;
-    const autoAdvanceTimer = setTimeout(() => {
-      autoAdvance = true;
-      _setSwitchStepState(stepWrite, 'done');
-      _setSwitchStepState(stepRestart, 'active');
-      _setSwitchProgress(progressBox, progressFill, progressPct, 72, false);
-    }, 650);
+    _setSwitchStepState(steps[0], 'active');
+    _setSwitchProgress(progressBox, progressFill, progressPct, 10, false);
 
     try {
       const body = await _fetchJsonOrThrow('/api/models/switch', {
@@ -153,16 +199,14 @@ function _bindEvents(data) {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ target }),
       });
-      clearTimeout(autoAdvanceTimer);
 
-      _setSwitchStepState(stepWrite, 'done');
-      if (!autoAdvance) {
-        _setSwitchStepState(stepRestart, 'active');
-        _setSwitchProgress(progressBox, progressFill, progressPct, 72, false);
-        await new Promise(resolve => setTimeout(resolve, 160));
+      if (body.jobId) {
+        const job = await _followJob(body.jobId, j => _showJobProgress(j, steps, progressBox, progressFill, progressPct));
+        if (job.state !== 'done') throw Object.assign(new Error(job.error || i18n('modelSwitchFailed')), { job });
+      } else {
+        _showJobProgress({ steps: _JOB_STEPS.map(step => ({ step })), state: 'done' },
+          steps, progressBox, progressFill, progressPct);
       }
-      _setSwitchStepState(stepRestart, 'done');
-      _setSwitchProgress(progressBox, progressFill, progressPct, 100, false);
       await new Promise(resolve => setTimeout(resolve, 260));
       hideModal();
 
@@ -179,19 +223,8 @@ function _bindEvents(data) {
       S.modelsData = null;
       await loadModels();
     } catch (e) {
-      clearTimeout(autoAdvanceTimer);
       const msg = e?.message || i18n('modelSwitchFailed');
-      const failedStep = _inferFailedStep(msg);
-
-      if (failedStep === 'restart' || autoAdvance) {
-        _setSwitchStepState(stepWrite, 'done');
-        _setSwitchStepState(stepRestart, 'fail');
-        _setSwitchProgress(progressBox, progressFill, progressPct, 72, true);
-      } else {
-        _setSwitchStepState(stepWrite, 'fail');
-        _setSwitchStepState(stepRestart, 'pending');
-        _setSwitchProgress(progressBox, progressFill, progressPct, 22, true);
-      }
+      _showJobProgress(e?.job || { steps: [], state: 'failed' }, steps, progressBox, progressFill, progressPct);
 
       status.textContent = msg;
       status.className = 'model-switch-status err';
@@ -294,16 +327,13 @@ export function renderModels(data) {
   h += `      </div>`;
   h += `      <div class="model-switch-progress-track"><div id="model-switch-progress-fill" class="model-switch-progress-fill"></div></div>`;
   h += `      <div class="model-switch-steps">`;
-  h += `        <div id="model-switch-step-write" class="model-switch-step pending">`;
-  h += `          <span class="model-switch-step-icon">1</span>`;
-  h += `          <span class="model-switch-step-label">${esc(i18n('modelSwitchStepWrite'))}</span>`;
-  h += `          <span class="model-switch-step-state">${esc(i18n('modelSwitchStepPending'))}</span>`;
-  h += `        </div>`;
-  h += `        <div id="model-switch-step-restart" class="model-switch-step pending">`;
-  h += `          <span class="model-switch-step-icon">2</span>`;
-  h += `          <span class="model-switch-step-label">${esc(i18n('modelSwitchStepRestart'))}</span>`;
-  h += `          <span class="model-switch-step-state">${esc(i18n('modelSwitchStepPending'))}</span>`;
-  h += `        </div>`;
+  _JOB_STEPS.forEach((step, i) => {
+    h += `        <div id="model-switch-step-${step}" class="model-switch-step pending">`;
+    h += `          <span class="model-switch-step-icon">${i + 1}</span>`;
+    h += `          <span class="model-switch-step-label">${esc(i18n(_STEP_LABELS[step]))}</span>`;
+    h += `          <span class="model-switch-step-state">${esc(i18n('modelSwitchStepPending'))}</span>`;
+    h += `        </div>`;
+  });
   h += `      </div>`;
   h += `    </div>`;
   h += `  </div>`;
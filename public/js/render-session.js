@@ -2,14 +2,16 @@ import { S } from './state.js';
 import { i18n } from './i18n.js';
 import { esc, renderMd, hlJson, rmEmpty } from './utils.js';
 
-export function appendSessionBlock(data, isLive) {
-  const stream = document.getElementById('stream');
-  rmEmpty(stream);
+/* "show full" button for a block the server cut to a preview */
+function moreBtn(b) {
+  if (!b.truncated) return '';
+  return `<button class="blk-more" data-offset="${b.offset}" data-index="${b.index}" data-len="${b.length}" data-type="${esc(b.type)}">${i18n('showFull')} (${b.length} chars)</button>`;
+}
 
+/* inner HTML of one transcript event; pure, so stream-worker.js can run it */
+export function sessionBlockHtml(data) {
   const role   = data.role || 'unknown';
   const blocks = data.blocks || [];
-  const div    = document.createElement('div');
-  div.className = 'session-msg' + (isLive ? ' live' : '');
 
   let h = '';
 
@@ -18,7 +20,7 @@ export function appendSessionBlock(data, isLive) {
     blocks.forEach(b => {
       if (b.type === 'text') h += `<div class="blk-user">
           <div class="user-hdr"><span class="icon icon-sm"><svg viewBox="0 0 24 24"><path d="M21 15a2 2 0 01-2 2H7l-4 4V5a2 2 0 012-2h14a2 2 0 012 2z"/></svg></span> ${i18n('user')}</div>
-          <div class="user-body">${esc(b.content)}</div>
+          <div class="user-body">${esc(b.content)}</div>${moreBtn(b)}
         </div>`;
     });
 
@@ -27,18 +29,18 @@ export function appendSessionBlock(data, isLive) {
     blocks.forEach(b => {
       if (b.type === 'thinking') {
         h += `<div class="blk-think">
-          <div class="think-hdr"><span class="icon icon-sm"><svg viewBox="0 0 24 24"><circle cx="12" cy="12" r="10"/><path d="M8 14s1.5 2 4 2 4-2 4-2"/><line x1="9" y1="9" x2="9.01" y2="9"/><line x1="15" y1="9" x2="15.01" y2="9"/></svg></span> ${i18n('thinking')} <span style="color:var(--t3);font-size:10px">(${b.content.length} chars)</span></div>
-          <div class="think-body"><pre>${esc(b.content)}</pre></div>
+          <div class="think-hdr"><span class="icon icon-sm"><svg viewBox="0 0 24 24"><circle cx="12" cy="12" r="10"/><path d="M8 14s1.5 2 4 2 4-2 4-2"/><line x1="9" y1="9" x2="9.01" y2="9"/><line x1="15" y1="9" x2="15.01" y2="9"/></svg></span> ${i18n('thinking')} <span style="color:var(--t3);font-size:10px">(${b.length || b.content.length} chars)</span></div>
+          <div class="think-body"><pre>${esc(b.content)}</pre></div>${moreBtn(b)}
         </div>`;
       } else if (b.type === 'tool_call') {
         h += `<div class="blk-tcall">
           <div class="tcall-name"><span class="icon icon-sm"><svg viewBox="0 0 24 24"><circle cx="12" cy="12" r="3"/><path d="M19.4 15a1.65 1.65 0 00.33 1.82l.06.06a2 2 0 010 2.83 2 2 0 01-2.83 0l-.06-.06a1.65 1.65 0 00-1.82-.33 1.65 1.65 0 00-1 1.51V21a2 2 0 01-4 0v-.09A1.65 1.65 0 009 19.4a1.65 1.65 0 00-1.82.33l-.06.06a2 2 0 01-2.83-2.83l.06-.06A1.65 1.65 0 004.68 15a1.65 1.65 0 00-1.51-1H3a2 2 0 010-4h.09A1.65 1.65 0 004.6 9a1.65 1.65 0 00-.33-1.82l-.06-.06a2 2 0 012.83-2.83l.06.06A1.65 1.65 0 009 4.68a1.65 1.65 0 001-1.51V3a2 2 0 014 0v.09a1.65 1.65 0 001 1.51 1.65 1.65 0 001.82-.33l.06-.06a2 2 0 012.83 2.83l-.06.06A1.65 1.65 0 0019.4 9a1.65 1.65 0 001.51 1H21a2 2 0 010 4h-.09a1.65 1.65 0 00-1.51 1z"/></svg></span> ${esc(b.name)} <span class="tid">${esc(b.toolCallId||'')}</span></div>
-          <div class="tcall-args">${hlJson(esc(JSON.stringify(b.arguments, null, 2)))}</div>
+          <div class="tcall-args">${hlJson(esc(b.truncated ? b.argsText : JSON.stringify(b.arguments, null, 2)))}</div>${moreBtn(b)}
         </div>`;
       } else if (b.type === 'text') {
         h += `<div class="blk-text">
           <div class="text-hdr"><span class="icon icon-sm"><svg viewBox="0 0 24 24"><path d="M21 11.5a8.38 8.38 0 01-.9 3.8 8.5 8.5 0 01-7.6 4.7 8.38 8.38 0 01-3.8-.9L3 21l1.9-5.7a8.38 8.38 0 01-.9-3.8 8.5 8.5 0 014.7-7.6 8.38 8.38 0 013.8-.9h.5a8.48 8.48 0 018 8v.5z"/></svg></span> ${i18n('response')}</div>
-          <div class="text-body">${renderMd(b.content)}</div>
+          <div class="text-body">${b.truncated ? `<pre>${esc(b.content)}</pre>` : renderMd(b.content)}</div>${moreBtn(b)}
         </div>`;
       }
     });
@@ -48,7 +50,7 @@ export function appendSessionBlock(data, isLive) {
     blocks.forEach(b => {
       if (b.type === 'tool_result') {
         const txt = typeof b.content === 'string' ? b.content : JSON.stringify(b.content, null, 2);
-        h += `<div class="blk-tres"><pre>${esc(txt)}</pre></div>`;
+        h += `<div class="blk-tres"><pre>${esc(txt)}</pre>${moreBtn(b)}</div>`;
       }
     });
 
@@ -60,7 +62,97 @@ export function appendSessionBlock(data, isLive) {
     h += `<div class="blk-meta">${esc(JSON.stringify(data))}</div>`;
   }
 
-  div.innerHTML = h;
-  stream.appendChild(div);
+  return h;
+}
+
+export function appendSessionBlock(data, isLive) {
+  appendSessionHtml([sessionBlockHtml(data)], isLive);
+}
+
+/* ── Lazy mounting ──────────────────────────────────────
+   Replayed blocks go in as empty placeholders; their HTML is parsed only
+   when they come within a screen or so of the viewport. Live blocks and
+   browsers without IntersectionObserver are rendered straight away. */
+const _lazyHtml = new Map();  // placeholder element → block HTML
+let _observer = null;
+
+function observer() {
+  if (_observer) return _observer;
+  if (typeof IntersectionObserver === 'undefined') return null;
+  _observer = new IntersectionObserver(entries => {
+    for (const e of entries) {
+      if (!e.isIntersecting) continue;
+      mountBlock(e.target);
+    }
+  }, { root: document.getElementById('stream'), rootMargin: '800px 0px' });
+  return _observer;
+}
+
+function mountBlock(el) {
+  const html = _lazyHtml.get(el);
+  if (_observer) _observer.unobserve(el);
+  _lazyHtml.delete(el);
+  if (html === undefined) return;
+  el.classList.remove('lazy');
+  el.innerHTML = html;
+}
+
+/* forget placeholders of the previous session (view switch) */
+export function resetSessionView() {
+  if (_observer) _observer.disconnect();
+  _observer = null;
+  _lazyHtml.clear();
+}
+
+/* append a batch of pre-rendered blocks with one DOM insertion */
+export function appendSessionHtml(blocks, isLive) {
+  const stream = document.getElementById('stream');
+  rmEmpty(stream);
+  const io = isLive ? null : observer();
+  if (!io) {
+    const cls = 'session-msg' + (isLive ? ' live' : '');
+    stream.insertAdjacentHTML('beforeend', blocks.map(h => `<div class="${cls}">${h}</div>`).join(''));
+  } else {
+    const frag = document.createDocumentFragment();
+    for (const h of blocks) {
+      const el = document.createElement('div');
+      el.className = 'session-msg lazy';
+      _lazyHtml.set(el, h);
+      frag.appendChild(el);
+    }
+    const added = [...frag.children];
+    stream.appendChild(frag);
+    added.forEach(el => io.observe(el));
+  }
   if (S.autoScroll) stream.scrollTo({ top: stream.scrollHeight, behavior: 'smooth' });
 }
+
+/* ── Full text of truncated blocks ────────────────────── */
+function onMoreClick(e) {
+  const btn = e.target.closest && e.target.closest('.blk-more');
+  if (!btn || btn.disabled) return;
+  e.stopPropagation();
+  btn.disabled = true;
+  const { offset, index, len, type } = btn.dataset;
+  fetch(`/api/session/${encodeURIComponent(S.view)}/block?offset=${offset}&index=${index}`)
+    .then(r => r.ok ? r.json() : Promise.reject(r.status))
+    .then(d => {
+      // the line at offset changed under us (file rewritten): don't show the wrong text
+      if (String(d.length) !== len) return Promise.reject('length');
+      const blk = btn.parentElement;
+      if (type === 'thinking') blk.querySelector('.think-body pre').innerHTML = esc(d.content);
+      else if (type === 'tool_call') blk.querySelector('.tcall-args').innerHTML = hlJson(esc(d.content));
+      else if (type === 'tool_result') blk.querySelector('pre').innerHTML = esc(d.content);
+      else if (blk.querySelector('.text-body')) blk.querySelector('.text-body').innerHTML = renderMd(d.content);
+      else if (blk.querySelector('.user-body')) blk.querySelector('.user-body').innerHTML = esc(d.content);
+      btn.remove();
+    })
+    .catch(() => {
+      btn.disabled = false;
+      btn.textContent = i18n('loadFailed');
+    });
+}
+
+if (typeof document !== 'undefined') {
+  document.addEventListener('click', onMoreClick);
+}
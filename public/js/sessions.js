@@ -5,6 +5,7 @@ import { showToast } from './toast.js';
 import { isMobile, closeSidebar } from './mobile.js';
 import { closeES, clearStream, setConn } from './connection.js';
 import { startLive, startSession } from './sse.js';
+import { resetLogView } from './render-log.js';
 import { loadSystem, renderSystem } from './render-system.js';
 import { loadModels } from './render-models.js';
 
@@ -76,14 +77,14 @@ export function renderSessions() {
         </span>
       </div>
       <div class="s-card-bot">
-        <span>${esc(shortId)} · ${s.message_count||0} ${i18n('msgs')}</span>
+        <span>${s.agent && s.agent !== 'main' ? esc(s.agent) + ' · ' : ''}${esc(shortId)} · ${s.message_count||0} ${i18n('msgs')}</span>
         <span>${s.model||'—'}</span>
       </div>
     </div>`;
   }).join('');
 }
 
-function updateSessionSummary() {
+export function updateSessionSummary() {
   const id = S.view;
   if (id === 'live' || id === 'system' || id === 'models') return;
   const sess = S.sessions.find(s => s.id === id);
@@ -151,6 +152,7 @@ export function switchView(id) {
     document.getElementById('search-box').style.display = 'flex';
     document.getElementById('sess-summary').style.display = 'none';
     S.liveLogs = [];
+    resetLogView();
     startLive();
   } else if (id === 'system') {
     document.getElementById('btn-system').classList.add('active');
@@ -160,8 +162,10 @@ export function switchView(id) {
     document.getElementById('search-box').style.display = 'none';
     document.getElementById('sess-summary').style.display = 'none';
     setConn('connected');
-    loadSystem();
-    S.systemTimer = setInterval(loadSystem, 30000);
+    if (S.systemData) renderSystem(S.systemData);
+    else loadSystem();
+    // the dashboard stream pushes system changes; poll only without it
+    S.systemTimer = setInterval(() => { if (!S.dashLive) loadSystem(); }, 30000);
   } else if (id === 'models') {
     document.getElementById('btn-models').classList.add('active');
     document.getElementById('mh-title').textContent = i18n('modelSwitch');
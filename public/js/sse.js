@@ -1,37 +1,181 @@
 import { S } from './state.js';
-import { setConn } from './connection.js';
-import { filterMatch, searchMatch } from './filter.js';
-import { appendLogRow } from './render-log.js';
-import { appendSessionBlock } from './render-session.js';
+import { setConn, closeES, clearStream } from './connection.js';
+import { filterMatch, filterTypes, searchMatch } from './filter.js';
+import { appendLogRow, resetLogView, setLogRows, setLogCount } from './render-log.js';
+import { appendSessionBlock, appendSessionHtml, resetSessionView } from './render-session.js';
 import { esc } from './utils.js';
 
+/* the part of the filter the server applies: log types and search text */
+function serverFilter() {
+  return { types: filterTypes(S.filter), q: S.searchQuery.trim().toLowerCase() };
+}
+
+function liveStreamUrl(f) {
+  const params = new URLSearchParams();
+  if (f.types) params.set('types', f.types.join(','));
+  if (f.q) params.set('q', f.q);
+  const qs = params.toString();
+  return '/api/logs/stream' + (qs ? '?' + qs : '');
+}
+
+/* every line f lets through also passes the open stream's filter, so the
+   buffer can be re-filtered on the client instead of reconnecting */
+function covers(open, f) {
+  const types = !open.types || (f.types && f.types.every(t => open.types.includes(t)));
+  return types && f.q.includes(open.q);
+}
+
+function showStreamError(message) {
+  document.getElementById('stream').innerHTML =
+    `<div class="empty"><div class="ei" style="animation:none;border:none"><span class="icon" style="font-size:28px;color:var(--red)"><svg viewBox="0 0 24 24"><path d="M10.29 3.86L1.82 18a2 2 0 001.71 3h16.94a2 2 0 001.71-3L13.71 3.86a2 2 0 00-3.42 0z"/><line x1="12" y1="9" x2="12" y2="13"/><line x1="12" y1="17" x2="12.01" y2="17"/></svg></span></div><p>${esc(message)}</p></div>`;
+}
+
+/* ── Stream worker ──────────────────────────────────────
+   Where module workers (and EventSource inside them) are available, the
+   stream is consumed by stream-worker.js and this thread only applies
+   batched, pre-rendered results. Otherwise everything runs here. */
+let _worker   = null;
+let _noWorker = typeof Worker === 'undefined';
+let _gen      = 0;            // stream whose worker messages are current
+let _onMsg    = null;
+
+function streamWorker() {
+  if (_noWorker) return null;
+  if (!_worker) {
+    try {
+      _worker = new Worker('/js/stream-worker.js', { type: 'module' });
+    } catch (e) {
+      _noWorker = true;
+      return null;
+    }
+    _worker.onmessage = e => { if (e.data.gen === _gen && _onMsg) _onMsg(e.data); };
+    _worker.onerror = () => workerFailed();
+  }
+  return _worker;
+}
+
+/* the worker can't run here: drop it and reopen the view on this thread */
+function workerFailed() {
+  if (_worker) _worker.terminate();
+  _worker = null;
+  _noWorker = true;
+  _onMsg = null;
+  S.es = null;
+  if (S.view === 'live') { resetLive(); startLive(); }
+  else if (S.view !== 'system' && S.view !== 'models') {
+    S.historyDone = false;
+    clearStream();
+    startSession(S.view);
+  }
+}
+
+function openInWorker(msg, onMsg) {
+  const w = streamWorker();
+  if (!w) return false;
+  const gen = ++_gen;
+  _onMsg = onMsg;
+  w.postMessage(Object.assign({ gen, lang: S.lang, filter: S.filter, q: S.searchQuery }, msg));
+  S.es = {
+    close() {
+      if (_gen === gen) _onMsg = null;
+      w.postMessage({ cmd: 'close', gen });
+    },
+    refilter() {
+      w.postMessage({ cmd: 'refilter', gen, filter: S.filter, q: S.searchQuery });
+    },
+    clear() {
+      w.postMessage({ cmd: 'clear', gen });
+    },
+  };
+  return true;
+}
+
+/* ── Live log ───────────────────────────────────────────
+   The server ends a stream it refuses (too many open) or cannot serve; the
+   page then reconnects with a growing delay instead of the EventSource's
+   own fixed retry. */
+let _liveFilter = null;       // server-side filter of the open live stream
+let _liveRetry  = 0;          // failed attempts since the last received line
+let _liveTimer  = null;
+let _lastStatus = '';
+
+function retryLive() {
+  closeES();
+  if (_liveTimer) clearTimeout(_liveTimer);
+  const delay = Math.min(1000 * 2 ** _liveRetry, 30000);
+  _liveRetry++;
+  _liveTimer = setTimeout(() => {
+    _liveTimer = null;
+    if (S.view === 'live' && !S.es) startLive();
+  }, delay);
+}
+
+function liveStatus(d) {
+  // a refused reconnect repeats the same message: show it once
+  if (d.message === _lastStatus && _liveRetry) return;
+  _lastStatus = d.message || '';
+  appendLogRow({ type: d.type || 'warn', raw: d.message || '' });
+}
+
+function resetLive() {
+  S.liveLogs = [];
+  resetLogView();
+  document.getElementById('evt-cnt').textContent = '0';
+  document.getElementById('stream').innerHTML = '';
+}
+
 export function startLive() {
   setConn('connecting');
-  S.es = new EventSource('/api/logs/stream');
+  if (_liveTimer) { clearTimeout(_liveTimer); _liveTimer = null; }
+  _liveFilter = serverFilter();
+  const url = liveStreamUrl(_liveFilter);
+  if (openInWorker({ cmd: 'live', url }, onLiveMessage)) return;
+
+  S.es = new EventSource(url);
 
   S.es.addEventListener('log', e => {
     const d = JSON.parse(e.data);
+    _liveRetry = 0;
     S.liveLogs.push(d);
     if (filterMatch(d.type, S.filter) && searchMatch(d.raw || '', S.searchQuery)) {
       appendLogRow(d);
     }
-    document.getElementById('evt-cnt').textContent = S.liveLogs.length;
   });
 
-  S.es.addEventListener('status', e => {
-    const d = JSON.parse(e.data);
-    appendLogRow({ type: d.type || 'warn', raw: d.message || '' });
-  });
+  S.es.addEventListener('status', e => liveStatus(JSON.parse(e.data)));
 
   S.es.onopen  = () => setConn('connected');
   S.es.onerror = () => {
     setConn('disconnected');
-    setTimeout(() => { if (S.view==='live') startLive(); }, 3000);
+    if (S.view === 'live') retryLive();
   };
 }
 
+function onLiveMessage(m) {
+  if (m.kind === 'logs') {
+    _liveRetry = 0;
+    m.rows.forEach(appendLogRow);
+    setLogCount(m.count);
+  } else if (m.kind === 'rows') {
+    setLogRows(m.rows);
+    setLogCount(m.count);
+  } else if (m.kind === 'status') {
+    liveStatus(m.d);
+  } else if (m.kind === 'open') {
+    setConn('connected');
+  } else if (m.kind === 'error') {
+    setConn('disconnected');
+    if (S.view === 'live') retryLive();
+  } else if (m.kind === 'unsupported') {
+    workerFailed();
+  }
+}
+
 export function startSession(sid) {
   setConn('connecting');
+  resetSessionView();
+  if (openInWorker({ cmd: 'session', url: `/api/session/${sid}/stream` }, onSessionMessage)) return;
+
   S.es = new EventSource(`/api/session/${sid}/stream`);
 
   S.es.addEventListener('session_event', e => {
@@ -47,11 +191,48 @@ export function startSession(sid) {
     const d = JSON.parse(e.data);
     if (d.type === 'error') {
       setConn('disconnected');
-      document.getElementById('stream').innerHTML =
-        `<div class="empty"><div class="ei" style="animation:none;border:none"><span class="icon" style="font-size:28px;color:var(--red)"><svg viewBox="0 0 24 24"><path d="M10.29 3.86L1.82 18a2 2 0 001.71 3h16.94a2 2 0 001.71-3L13.71 3.86a2 2 0 00-3.42 0z"/><line x1="12" y1="9" x2="12" y2="13"/><line x1="12" y1="17" x2="12.01" y2="17"/></svg></span></div><p>${esc(d.message)}</p></div>`;
+      showStreamError(d.message);
     }
   });
 
   S.es.onopen  = () => setConn('connecting');
   S.es.onerror = () => setConn('disconnected');
 }
+
+function onSessionMessage(m) {
+  if (m.kind === 'blocks') {
+    appendSessionHtml(m.html, m.live);
+  } else if (m.kind === 'history_done') {
+    S.historyDone = true;
+    setConn('connected');
+  } else if (m.kind === 'status') {
+    if (m.d.type === 'error') {
+      setConn('disconnected');
+      showStreamError(m.d.message);
+    }
+  } else if (m.kind === 'open') {
+    setConn('connecting');
+  } else if (m.kind === 'error') {
+    setConn('disconnected');
+  } else if (m.kind === 'unsupported') {
+    workerFailed();
+  }
+}
+
+/* after a filter/search change (the buffer is already re-filtered):
+   re-subscribe only when the open stream's server-side filter drops lines
+   the new one needs. A stream waiting for its retry picks the filter up then. */
+let _restartTimer = null;
+export function restartLive(delay = 0) {
+  if (_restartTimer) clearTimeout(_restartTimer);
+  _restartTimer = setTimeout(() => {
+    _restartTimer = null;
+    if (S.view !== 'live' || !S.es || covers(_liveFilter, serverFilter())) return;
+    closeES();
+    resetLive();
+    // the server frees the closed stream's slot once it sees the disconnect;
+    // a refusal meanwhile ends in retryLive()
+    _liveRetry = 0;
+    startLive();
+  }, delay);
+}
@@ -16,4 +16,6 @@ export const S = {
   sessionsTimer: null,
   gatewayOnline: null,
   healthTimer: null,
+  dashES:      null,     // multiplexed dashboard EventSource
+  dashLive:    false,
 };
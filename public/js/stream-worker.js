@@ -0,0 +1,117 @@
+/* ── Stream worker ──────────────────────────────────────
+   Owns the EventSource of the live log or of one session transcript.
+   JSON parsing, filter/search matching and row/block HTML generation run
+   here; the page receives batched, pre-rendered results (see sse.js). */
+import { S } from './state.js';
+import { filterMatch, searchMatch } from './filter.js';
+import { logCellsHtml } from './render-log.js';
+import { sessionBlockHtml } from './render-session.js';
+
+const BATCH_MS = 16;          // longest a queued item waits before posting
+const LIVE_CAP = 5000;        // live entries kept for re-filtering
+
+let es     = null;
+let gen    = 0;               // stream id assigned by the page
+let mode   = null;            // 'live' | 'session'
+let buf    = [];              // live: every entry received (bounded)
+let out    = [];              // queued rows (live) or block HTML (session)
+let timer  = 0;
+let replayDone = false;
+
+function post(kind, data) {
+  postMessage(Object.assign({ kind, gen }, data));
+}
+
+function matches(row) {
+  return filterMatch(row.type, S.filter) && searchMatch(row.raw, S.searchQuery);
+}
+
+function queue(item) {
+  out.push(item);
+  if (!timer) timer = setTimeout(flush, BATCH_MS);
+}
+
+function flush() {
+  if (timer) { clearTimeout(timer); timer = 0; }
+  if (!out.length) return;
+  if (mode === 'live') post('logs', { rows: out, count: buf.length });
+  else post('blocks', { html: out, live: replayDone });
+  out = [];
+}
+
+function close() {
+  if (es) { es.close(); es = null; }
+  if (timer) { clearTimeout(timer); timer = 0; }
+  buf = [];
+  out = [];
+  mode = null;
+}
+
+function open(url) {
+  es = new EventSource(url);
+  es.onopen  = () => post('open');
+  es.onerror = () => { flush(); post('error'); };
+  es.addEventListener('status', e => { flush(); post('status', { d: JSON.parse(e.data) }); });
+}
+
+function startLive(url) {
+  open(url);
+  es.addEventListener('log', e => {
+    const d = JSON.parse(e.data);
+    const row = {
+      type:      d.type || 'other',
+      raw:       d.raw || '',
+      timestamp: d.timestamp || d.ts || d.time || d['@timestamp'] || (d._meta && d._meta.date) || null,
+      _cells:    logCellsHtml(d),
+    };
+    buf.push(row);
+    if (buf.length > LIVE_CAP + 500) buf = buf.slice(-LIVE_CAP);
+    if (matches(row)) queue(row);
+  });
+}
+
+function startSession(url) {
+  replayDone = false;
+  open(url);
+  es.addEventListener('session_event', e => queue(sessionBlockHtml(JSON.parse(e.data))));
+  es.addEventListener('history_done', () => {
+    flush();
+    replayDone = true;
+    post('history_done');
+  });
+}
+
+self.onmessage = e => {
+  const m = e.data;
+  if (m.cmd === 'close') {
+    if (m.gen === gen) close();
+    return;
+  }
+  if (m.cmd === 'clear') {
+    if (m.gen !== gen || mode !== 'live') return;
+    buf = [];
+    out = [];
+    return;
+  }
+  if (m.cmd === 'refilter') {
+    if (m.gen !== gen || mode !== 'live') return;
+    S.filter = m.filter;
+    S.searchQuery = m.q;
+    out = [];
+    post('rows', { rows: buf.filter(matches), count: buf.length });
+    return;
+  }
+  close();
+  if (typeof EventSource === 'undefined') {
+    gen = m.gen;
+    post('unsupported');
+    return;
+  }
+  gen = m.gen;
+  mode = m.cmd;
+  S.lang = m.lang;
+  S.filter = m.filter;
+  S.searchQuery = m.q;
+  if (m.cmd === 'live') startLive(m.url);
+  else startSession(m.url);
+};
@@ -54,6 +54,12 @@ fi
 
 cd "$PROJECT_DIR"
 
+# ── Version stamp ─────────────────────────────────────────
+# Read by the server at start-up instead of running git
+if VERSION_STAMP=$(git log -1 --format='%h %ci' 2>/dev/null) && [ -n "$VERSION_STAMP" ]; then
+    echo "$VERSION_STAMP" > .version
+fi
+
 AUTH_FILE=".auth"
 AUTH_REQUIRED_FILE=".auth_required"
 
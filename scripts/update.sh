@@ -87,6 +87,10 @@ if ! git pull --ff-only 2>/dev/null; then
     exit 1
 fi
 
+# ── Version stamp ─────────────────────────────────────────
+# Read by the server at start-up instead of running git
+git log -1 --format='%h %ci' > .version 2>/dev/null || rm -f .version
+
 # ── Make new scripts executable ───────────────────────────
 chmod +x scripts/start.sh scripts/check.sh scripts/install.sh scripts/update.sh scripts/uninstall.sh bin/openclaw-monitor 2>/dev/null || true
 
@@ -0,0 +1,218 @@
+"""
+Per-agent session shards: discovery of ~/.openclaw/agents/*/sessions,
+each with its own summary cache, sessions.json metadata and watcher.
+"""
+
+import os
+import threading
+import time
+
+import context_history
+import session_state
+import sessions
+
+_SHARD_WATCH_INTERVAL = 2    # seconds between change checks of one shard
+_DISCOVERY_INTERVAL   = 10   # seconds between agent directory rescans
+
+_shards = {}                 # agent name → _Shard
+_shards_lock = threading.Lock()
+_discovered = False
+_summary_stats = {'hits': 0, 'misses': 0}   # transcript summaries reused vs. re-parsed
+_summary_stats_lock = threading.Lock()      # shard watchers update it concurrently
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class _Shard:
+    """One agent's session directory. All scanning happens under the shard's own lock."""
+
+    def __init__(self, agent, session_dir):
+        self.agent         = agent
+        self.session_dir   = session_dir
+        self.sessions_json = os.path.join(session_dir, 'sessions.json')
+        self._lock       = threading.Lock()
+        self._summaries  = {}     # sessionId → (mtime, info)
+        self._meta       = {}     # sessionId → sessions.json metadata
+        self._meta_mtime = None
+        self._listing    = None   # enriched list, rebuilt only on change
+        self._watching   = False
+        self._stopped    = False
+
+    def refresh(self) -> bool:
+        """Re-read changed transcripts and sessions.json. Returns True if anything changed."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        changed = False
+
+        meta_mtime = _mtime(self.sessions_json)
+        if meta_mtime != self._meta_mtime:
+            self._meta = sessions._load_session_meta(self.sessions_json)
+            self._meta_mtime = meta_mtime
+            context_history.sample(self.agent, self._meta, meta_mtime)
+            changed = True
+
+        seen = set()
+        hits = misses = 0
+        try:
+            entries = list(os.scandir(self.session_dir))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if not entry.name.endswith('.jsonl'):
+                continue
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            sid = entry.name[:-len('.jsonl')]
+            seen.add(sid)
+            cached = self._summaries.get(sid)
+            if cached and cached[0] == mtime:
+                hits += 1
+                continue
+            misses += 1
+            info = sessions._read_session_info(entry.path, mtime)
+            info['id']    = sid
+            info['file']  = entry.path
+            info['mtime'] = mtime
+            info['agent'] = self.agent
+            self._summaries[sid] = (mtime, info)
+            session_state.track(sid, entry.path)
+            changed = True
+
+        with _summary_stats_lock:
+            _summary_stats['hits'] += hits
+            _summary_stats['misses'] += misses
+
+        for sid in list(self._summaries):
+            if sid not in seen:
+                del self._summaries[sid]
+                session_state.forget(sid)
+                changed = True
+
+        if changed or self._listing is None:
+            entries = [dict(info) for _, info in self._summaries.values()]
+            entries.sort(key=lambda e: e.get('mtime', 0), reverse=True)
+            self._listing = sessions._enrich_with_meta(entries, self._meta)
+        return changed
+
+    def sessions(self, cli_rows=None) -> list:
+        """Return this shard's session summaries.
+
+        With `cli_rows` (parsed `openclaw sessions` output), only those sessions
+        are returned, in CLI order, merged with the cached summaries.
+        """
+        with self._lock:
+            if self._listing is None:
+                self._refresh_locked()
+            listing = self._listing
+            if cli_rows is None:
+                return [session_state.overlay(s) for s in listing]
+            by_id = {s['id']: s for s in listing}
+            meta = self._meta
+
+        rows = []
+        for row in cli_rows:
+            s = by_id.get(row['id'])
+            if s:
+                s = dict(session_state.overlay(s), raw_line=row['raw_line'])
+            else:
+                s = dict(row, file=os.path.join(self.session_dir, f"{row['id']}.jsonl"),
+                         agent=self.agent)
+            rows.append(s)
+        return sessions._enrich_with_meta(rows, meta)
+
+    def meta(self) -> dict:
+        """Return this shard's sessions.json metadata (sessionId → fields)."""
+        with self._lock:
+            if self._listing is None:
+                self._refresh_locked()
+            return self._meta
+
+    def summary(self, session_id):
+        """Return the cached summary for one session, or None."""
+        with self._lock:
+            cached = self._summaries.get(session_id)
+        return dict(cached[1]) if cached else None
+
+    def _watch(self):
+        while not self._stopped:
+            try:
+                self.refresh()
+            except Exception:
+                pass
+            time.sleep(_SHARD_WATCH_INTERVAL)
+
+
+def _discover():
+    """Sync the shard registry with the agent session directories on disk."""
+    global _discovered
+    found = {}
+    for d in sessions._agent_session_dirs():
+        found[os.path.basename(os.path.dirname(d))] = d
+    with _shards_lock:
+        for agent, d in found.items():
+            shard = _shards.get(agent)
+            if shard is None or shard.session_dir != d:
+                if shard:
+                    shard._stopped = True
+                _shards[agent] = _Shard(agent, d)
+        for agent in list(_shards):
+            if agent not in found:
+                _shards.pop(agent)._stopped = True
+        _discovered = True
+
+
+def _discovery_worker():
+    while True:
+        try:
+            _discover()
+        except Exception:
+            pass
+        with _shards_lock:
+            idle = [s for s in _shards.values() if not s._watching]
+            for shard in idle:
+                shard._watching = True
+        for shard in idle:
+            threading.Thread(target=shard._watch, daemon=True).start()
+        time.sleep(_DISCOVERY_INTERVAL)
+
+
+def get_shards(agent: str = '') -> list:
+    """Return all shards, or just the named agent's shard (empty if unknown)."""
+    if not _discovered:
+        _discover()
+    with _shards_lock:
+        if agent:
+            shard = _shards.get(agent)
+            return [shard] if shard else []
+        return sorted(_shards.values(), key=lambda s: (s.agent != 'main', s.agent))
+
+
+def list_sessions(agent: str = '', cli_rows=None) -> list:
+    """Merged session list across shards, newest first.
+
+    `cli_rows` only applies to the main agent, which is the one `openclaw sessions`
+    lists: its sessions then come first, in CLI order, followed by the other agents'.
+    """
+    ordered, result = [], []
+    for shard in get_shards(agent):
+        if cli_rows is not None and shard.agent == 'main':
+            ordered = shard.sessions(cli_rows)
+        else:
+            result.extend(shard.sessions())
+    result.sort(key=lambda e: e.get('mtime', 0), reverse=True)
+    return ordered + result
+
+
+def start():
+    """Start the discovery thread; it spawns one watcher thread per shard."""
+    t = threading.Thread(target=_discovery_worker, daemon=True)
+    t.start()
@@ -11,6 +11,7 @@ import threading
 import time
 
 import config
+import perf
 
 _cli_cache = {
     'channel_health': None,
@@ -19,6 +20,10 @@ _cli_cache = {
 }
 _cli_cache_lock = threading.Lock()
 _CLI_CACHE_INTERVAL = 120  # seconds between refreshes
+
+# Per-command run statistics: name → {'runs', 'errors', 'last_sec', 'total_sec', 'last_at'}
+_cli_stats = {}
+_cli_stats_lock = threading.Lock()
 _ANSI_RE = re.compile(r'\x1B\[[0-?]*[ -/]*[@-~]')
 
 
@@ -58,8 +63,35 @@ def _extract_json_payload(text):
     return best_obj
 
 
+def _record_cli(name, secs, ok):
+    """Account one CLI invocation for the /metrics latency and error counters."""
+    with _cli_stats_lock:
+        st = _cli_stats.setdefault(name, {'runs': 0, 'errors': 0, 'last_sec': 0.0,
+                                          'total_sec': 0.0, 'last_at': None})
+        st['runs'] += 1
+        st['errors'] += 0 if ok else 1
+        st['last_sec'] = secs
+        st['total_sec'] += secs
+        st['last_at'] = time.time()
+
+
+def cli_stats():
+    """Return a snapshot of the per-command run statistics."""
+    with _cli_stats_lock:
+        return {name: dict(st) for name, st in _cli_stats.items()}
+
+
+@perf.timed('_run_cli_cached')
 def _run_cli_cached(cmd, timeout=30):
     """Run a CLI command, return parsed result."""
+    t0 = time.monotonic()
+    result = _run_cli(cmd, timeout)
+    _record_cli(' '.join(a for a in cmd[1:] if not a.startswith('-')), time.monotonic() - t0,
+                not ('error' in result or 'exitCode' in result) if isinstance(result, dict) else True)
+    return result
+
+
+def _run_cli(cmd, timeout):
     try:
         r = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, env=config.OC_ENV)
         out = (r.stdout or '').strip()
@@ -0,0 +1,95 @@
+"""
+JSON codec for the hot paths (transcript/log parsing, SSE frames, API
+responses). Decoding uses orjson when it is importable and the stdlib json
+module otherwise; set MONITOR_JSON=json to force the stdlib. Anything
+orjson refuses (lone surrogates, NaN literals) is retried with the stdlib,
+and so is text with a run of 19+ digits, since orjson turns ints wider than
+64 bits into floats instead of failing. Both decode the same inputs to the
+same values.
+
+Encoding always uses the stdlib (compact, non-ASCII left as is): orjson
+spells floats differently (3e-6 for 3e-06, which per-token costs hit) and
+writes NaN/Infinity as null, and API output must not depend on whether
+orjson happens to be installed. bench/codec_check.py compares both.
+
+write_blob / read_blob store one value as a zlib-compressed JSON file
+(search index, tool stats, context history).
+"""
+
+import json
+import os
+import tempfile
+import zlib
+
+orjson = None
+if os.environ.get('MONITOR_JSON', '') != 'json':
+    try:
+        import orjson
+    except ImportError:
+        pass
+
+BACKEND = 'orjson' if orjson else 'json'
+
+JSONDecodeError = json.JSONDecodeError     # orjson.JSONDecodeError subclasses it
+
+_SEPARATORS = (',', ':')
+
+
+def _std_dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=_SEPARATORS)
+
+
+if orjson:
+    # digits → '0', everything else → ' ': a wide int leaves 19 zeros in a row
+    # (bytes.translate is several times cheaper than a regex scan here)
+    _DIGITS   = bytes(0x30 if 0x30 <= c <= 0x39 else 0x20 for c in range(256))
+    _WIDE_RUN = b'0' * 19
+
+    def loads(s):
+        """Decode str or bytes. Raises JSONDecodeError."""
+        b = s.encode('utf-8', 'surrogatepass') if isinstance(s, str) else s
+        if _WIDE_RUN in b.translate(_DIGITS):
+            return json.loads(s)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return json.loads(s)
+else:
+    def loads(s):
+        """Decode str or bytes. Raises JSONDecodeError."""
+        return json.loads(s)
+
+
+def dumpb(obj) -> bytes:
+    """Encode to UTF-8 bytes."""
+    return _std_dumps(obj).encode('utf-8')
+
+
+def dumps(obj) -> str:
+    """Encode to str."""
+    return _std_dumps(obj)
+
+
+# ── Compressed files ─────────────────────────────────────
+def write_blob(path: str, obj):
+    """Atomically write obj as zlib-compressed JSON."""
+    data = zlib.compress(dumpb(obj))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp.', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def read_blob(path: str):
+    """Value stored by write_blob, or None if missing or unreadable."""
+    try:
+        with open(path, 'rb') as fh:
+            return loads(zlib.decompress(fh.read()))
+    except (OSError, zlib.error, ValueError):
+        return None
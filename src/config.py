@@ -9,6 +9,7 @@ import shutil
 import subprocess
 import sys
 import threading
+import time
 from datetime import datetime
 
 # ── CLI Arguments ────────────────────────────────────────────
@@ -25,21 +26,50 @@ BASE_DIR    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SERVE_DIR   = os.path.join(BASE_DIR, 'public')
 
 # ── Version ──────────────────────────────────────────────────
-def _get_version():
-    """Read version from git: short hash + commit date."""
+# scripts/install.sh and update.sh stamp `git log -1 --format='%h %ci'`
+# here so neither start-up nor /api/version needs a git subprocess
+VERSION_FILE = os.path.join(BASE_DIR, '.version')
+_version     = None
+
+
+def _parse_version(line):
+    parts = line.strip().split()
+    if not parts:
+        return None
+    h = parts[0]
+    date = parts[1] if len(parts) > 1 else ''
+    return {'hash': h, 'date': date, 'version': f'{h} ({date})'}
+
+
+def _read_version():
+    """Version stamp file, else git: short hash + commit date."""
+    try:
+        with open(VERSION_FILE) as fh:
+            v = _parse_version(fh.readline())
+        if v:
+            return v
+    except OSError:
+        pass
     try:
         r = subprocess.run(
             ['git', 'log', '-1', '--format=%h %ci'],
             capture_output=True, text=True, timeout=5, cwd=BASE_DIR)
-        if r.returncode == 0 and r.stdout.strip():
-            parts = r.stdout.strip().split()
-            h = parts[0]
-            date = parts[1] if len(parts) > 1 else ''
-            return {'hash': h, 'date': date, 'version': f'{h} ({date})'}
+        if r.returncode == 0:
+            v = _parse_version(r.stdout)
+            if v:
+                return v
     except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
         pass
     return {'hash': 'unknown', 'date': '', 'version': 'unknown'}
 
+
+def _get_version():
+    """Version info, read once per process."""
+    global _version
+    if _version is None:
+        _version = _read_version()
+    return _version
+
 if ARGS.version:
     print(_get_version()['version'])
     sys.exit(0)
@@ -51,6 +81,7 @@ TODAY_LOG   = os.path.join(LOG_DIR, f"openclaw-{datetime.now().strftime('%Y-%m-%
 
 # ── System monitoring paths ─────────────────────────────────
 OC_ROOT         = os.path.expanduser("~/.openclaw")
+AGENTS_DIR      = os.path.join(OC_ROOT, "agents")
 OPENCLAW_CONFIG = os.path.join(OC_ROOT, "openclaw.json")
 SESSIONS_JSON   = os.path.join(SESSION_DIR, "sessions.json")
 DEVICES_PAIRED  = os.path.join(OC_ROOT, "devices", "paired.json")
@@ -60,13 +91,40 @@ UPDATE_CHECK    = os.path.join(OC_ROOT, "update-check.json")
 EXEC_APPROVALS  = os.path.join(OC_ROOT, "exec-approvals.json")
 MODEL_SWITCH_LOCK = threading.Lock()
 
+# ── Monitor-owned cache directory (search index, etc.) ──────
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                         'openclaw-monitor')
+
+# Context window samples kept per session (sessions.json changes);
+# MONITOR_CONTEXT_HISTORY=0 keeps them in memory only
+CONTEXT_HISTORY_SIZE    = 256
+CONTEXT_HISTORY_PERSIST = os.environ.get('MONITOR_CONTEXT_HISTORY', '1') != '0'
+
 # ── Regex patterns ───────────────────────────────────────────
 UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.I)
 TS_RE   = re.compile(r'^(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?|\d{2}:\d{2}:\d{2}(?:\.\d+)?)')
 
 # ── SSE concurrency & rate limiting ─────────────────────────
 MAX_LOG_STREAMS     = 2
-MAX_LOG_LINES_SEC   = 50
+# Per-type token buckets of one log stream: (lines/sec, burst); types not
+# listed use 'other'. None = never dropped. Identical consecutive lines are
+# collapsed into one "repeated ×N" line; dropped lines are reported in a
+# summary status event every LOG_SUMMARY_INTERVAL seconds. The droppable
+# budgets add up to 50 lines/sec; most lines are 'other'. The backlog sent
+# when a stream opens is not limited.
+LOG_RATE_BUDGETS = {
+    'error':         None,
+    'session_state': None,
+    'warn':          (8, 24),
+    'enqueue':       (2, 10),
+    'dequeue':       (2, 10),
+    'run_start':     (2, 10),
+    'run_done':      (2, 10),
+    'tool_start':    (2, 10),
+    'tool_end':      (2, 10),
+    'other':         (30, 90),
+}
+LOG_SUMMARY_INTERVAL = 10
 _log_stream_count   = 0
 _log_stream_lock    = threading.Lock()
 
@@ -74,6 +132,33 @@ MAX_SESSION_STREAMS   = 3
 _session_stream_count = 0
 _session_stream_lock  = threading.Lock()
 
+MAX_DASHBOARD_STREAMS   = 16
+_dashboard_stream_count = 0
+_dashboard_stream_lock  = threading.Lock()
+
+MAX_RUN_STREAMS   = 8
+_run_stream_count = 0
+_run_stream_lock  = threading.Lock()
+
+MAX_SWITCH_STREAMS   = 8
+_switch_stream_count = 0
+_switch_stream_lock  = threading.Lock()
+
+# Transcript blocks longer than this (chars) are streamed as a preview;
+# /api/session/<id>/block serves the full text on demand
+SESSION_BLOCK_MAX_CHARS     = 16384
+SESSION_BLOCK_PREVIEW_CHARS = 2048
+
+# Frames queued on an _SSEWriter go out in one write once this many bytes
+# are pending or the oldest has waited this long (replays and bursts)
+SSE_FLUSH_BYTES = 64 << 10
+SSE_FLUSH_MS    = 5
+
+# ── HTTP/1.1 keep-alive ─────────────────────────────────────
+KEEPALIVE_TIMEOUT      = 15      # seconds an idle persistent connection is kept open
+KEEPALIVE_MAX_REQUESTS = 200     # requests served per connection before closing it
+MAX_REQUEST_BODY       = 1 << 20
+
 # ── Auth config ─────────────────────────────────────────────
 AUTH_FILE          = os.path.join(BASE_DIR, '.auth')
 AUTH_REQUIRED_FILE = os.path.join(BASE_DIR, '.auth_required')
@@ -83,6 +168,9 @@ COOKIE_NAME        = 'monitor_sid'
 # Env var set by systemd unit — survives file deletion
 ENV_AUTH_REQUIRED  = os.environ.get('MONITOR_AUTH') == '1'
 
+# Bearer token that lets Prometheus scrape /metrics without a login cookie
+METRICS_TOKEN      = os.environ.get('MONITOR_METRICS_TOKEN', '')
+
 # ── Resolve openclaw binary + env ────────────────────────────
 def _find_openclaw():
     """Find openclaw binary and build an env dict with node on PATH."""
@@ -107,7 +195,19 @@ def _find_openclaw():
 
     return 'openclaw', None
 
-OC_BIN, OC_ENV = _find_openclaw()
+# Resolved by server.py's start-up warm-up (after the port is bound);
+# until then, and in tools that never call it, PATH lookup is used
+OC_BIN, OC_ENV = 'openclaw', None
+
+
+def _resolve_openclaw():
+    global OC_BIN, OC_ENV
+    OC_BIN, OC_ENV = _find_openclaw()
+
+# ── Start-up readiness (/api/ready) ─────────────────────────
+READY       = threading.Event()   # set once server.py's warm-up has finished
+STARTED_AT  = time.time()
+READY_AT    = None
 
 # ── Gateway probe ──────────────────────────────────────
 GATEWAY_HOST = '127.0.0.1'
@@ -0,0 +1,208 @@
+"""
+Context window history per session.
+
+Every time an agent shard re-reads its sessions.json, the contextTokens /
+totalTokens / compactionCount of each session are sampled into a fixed-size
+ring (one compact [ts, context, total, compactions] row per change). A rise
+in compactionCount is recorded as a compaction event with the token counts
+around it. From the samples since the last compaction, the growth rate and
+the usage at which earlier compactions fired give an estimate of the next
+one. Rings persist in CACHE_DIR/context_history.z unless
+MONITOR_CONTEXT_HISTORY=0.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import codec
+import config
+
+_HISTORY_FILE    = os.path.join(config.CACHE_DIR, 'context_history.z')
+_SESSIONS_MAX    = 512        # sessions with a ring (least recently sampled dropped)
+_COMPACTIONS_MAX = 64         # compaction events kept per session
+_SAVE_INTERVAL   = 30         # seconds between writes of the history file
+_FIT_SAMPLES     = 16         # newest samples used for the growth rate
+
+_lock     = threading.Lock()
+_rings    = OrderedDict()     # sessionId → {'agent', 'samples': deque, 'compactions': deque}
+_dirty    = False
+_loaded   = False             # history file read; only then is it rewritten
+_saved_at = 0.0
+
+
+def _ring(sid, agent) -> dict:
+    """Get or create the ring for sid. Caller holds _lock."""
+    r = _rings.get(sid)
+    if r is None:
+        r = _rings[sid] = {'agent': agent,
+                           'samples': deque(maxlen=config.CONTEXT_HISTORY_SIZE),
+                           'compactions': deque(maxlen=_COMPACTIONS_MAX)}
+        while len(_rings) > _SESSIONS_MAX:
+            _rings.popitem(last=False)
+    _rings.move_to_end(sid)
+    return r
+
+
+def sample(agent, meta, ts=None):
+    """Record one sessions.json reading (sessionId → metadata, as loaded by
+    sessions._load_session_meta). Unchanged sessions add no row. Runs under
+    the agent shard's lock, so it never touches the disk: the _saver thread
+    writes the history file."""
+    global _dirty
+    ts = ts or time.time()
+    with _lock:
+        for sid, m in meta.items():
+            row = [ts, m.get('contextTokens'), m.get('totalTokens'), m.get('compactionCount')]
+            if row[1] is None and row[2] is None and row[3] is None:
+                continue
+            r = _ring(sid, agent)
+            samples = r['samples']
+            last = samples[-1] if samples else None
+            if last and last[1:] == row[1:]:
+                continue
+            if last and isinstance(row[3], int) and isinstance(last[3], int) and row[3] > last[3]:
+                r['compactions'].append({'ts': ts, 'from': last[3], 'to': row[3],
+                                         'tokensBefore': last[2], 'tokensAfter': row[2],
+                                         'contextTokens': row[1] or last[1]})
+            samples.append(row)
+            _dirty = True
+
+
+# ── Persistence ──────────────────────────────────────────
+def _maybe_save():
+    global _dirty, _saved_at
+    if not (_loaded and config.CONTEXT_HISTORY_PERSIST):
+        return
+    now = time.monotonic()
+    with _lock:
+        if not _dirty or now - _saved_at < _SAVE_INTERVAL:
+            return
+        blob = {sid: {'agent': r['agent'], 'samples': list(r['samples']),
+                      'compactions': list(r['compactions'])}
+                for sid, r in _rings.items()}
+        _dirty, _saved_at = False, now
+    try:
+        os.makedirs(config.CACHE_DIR, mode=0o700, exist_ok=True)
+    except OSError:
+        return
+    codec.write_blob(_HISTORY_FILE, blob)
+
+
+def _saver():
+    while True:
+        time.sleep(_SAVE_INTERVAL)
+        try:
+            _maybe_save()
+        except Exception:
+            pass
+
+
+def _merge(r, samples, compactions):
+    """Merge loaded rows into a ring that a shard may already have sampled
+    into, keeping time order. Caller holds _lock."""
+    rows = sorted(list(samples) + list(r['samples']), key=lambda row: row[0])
+    events = {c['ts']: c for c in list(compactions) + list(r['compactions'])}
+    for last, row in zip(rows, rows[1:]):
+        # a rise across the load boundary was not seen by sample()
+        if (isinstance(row[3], int) and isinstance(last[3], int) and row[3] > last[3]
+                and row[0] not in events):
+            events[row[0]] = {'ts': row[0], 'from': last[3], 'to': row[3],
+                              'tokensBefore': last[2], 'tokensAfter': row[2],
+                              'contextTokens': row[1] or last[1]}
+    r['samples'].clear()
+    r['samples'].extend(rows)
+    r['compactions'].clear()
+    r['compactions'].extend(sorted(events.values(), key=lambda c: c['ts']))
+
+
+def start():
+    """Load the persisted history and start the periodic writer. Rows a shard
+    sampled before the load are merged in by timestamp."""
+    global _loaded
+    if not config.CONTEXT_HISTORY_PERSIST:
+        return
+    blob = codec.read_blob(_HISTORY_FILE)
+    with _lock:
+        if isinstance(blob, dict):
+            for sid, v in blob.items():
+                _merge(_ring(sid, v.get('agent')), v.get('samples') or (),
+                       v.get('compactions') or ())
+        _loaded = True
+    threading.Thread(target=_saver, daemon=True).start()
+
+
+# ── Queries ──────────────────────────────────────────────
+def _predict(samples, compactions) -> dict | None:
+    """Estimate when totalTokens reaches the compaction threshold, by a
+    least-squares rate over the samples since the last compaction."""
+    if not samples:
+        return None
+    ctx, total = samples[-1][1], samples[-1][2]
+    if not ctx or total is None:
+        return None
+    # threshold: usage at which this session compacted before, else the limit
+    ratios = sorted(c['tokensBefore'] / c['contextTokens'] for c in compactions
+                    if c.get('tokensBefore') and c.get('contextTokens'))
+    ratio = min(ratios[len(ratios) // 2], 1.0) if ratios else 1.0
+    threshold = round(ctx * ratio)
+    pts = []
+    for row in reversed(samples):
+        if row[2] is None or row[3] != samples[-1][3]:
+            break
+        pts.append((row[0], row[2]))
+        if len(pts) >= _FIT_SAMPLES:
+            break
+    rate = None
+    if len(pts) >= 2:
+        n = len(pts)
+        mx = sum(p[0] for p in pts) / n
+        my = sum(p[1] for p in pts) / n
+        var = sum((p[0] - mx) ** 2 for p in pts)
+        if var > 0:
+            rate = sum((p[0] - mx) * (p[1] - my) for p in pts) / var
+    eta = None
+    if rate and rate > 0:
+        eta = samples[-1][0] + max(0, threshold - total) / rate
+    return {'threshold': threshold, 'basis': 'observed' if ratios else 'limit',
+            'tokensPerHour': round(rate * 3600) if rate is not None else None,
+            'eta': eta, 'samples': len(pts)}
+
+
+def _row(row) -> dict:
+    ts, ctx, total, count = row
+    pct = round(total / ctx * 100, 1) if ctx and total is not None else None
+    return {'ts': ts, 'contextTokens': ctx, 'totalTokens': total,
+            'percent': pct, 'compactionCount': count}
+
+
+def history(sid) -> dict | None:
+    """All samples, compaction events and the next-compaction estimate of one session."""
+    with _lock:
+        r = _rings.get(sid)
+        if r is None:
+            return None
+        samples, compactions = list(r['samples']), list(r['compactions'])
+        agent = r['agent']
+    return {'sessionId': sid, 'agent': agent,
+            'samples': [_row(s) for s in samples],
+            'compactions': compactions,
+            'prediction': _predict(samples, compactions)}
+
+
+def overview(agent='') -> list:
+    """Latest sample, compaction count and estimate of every sampled session."""
+    with _lock:
+        rings = [(sid, r['agent'], list(r['samples']), list(r['compactions']))
+                 for sid, r in _rings.items() if not agent or r['agent'] == agent]
+    out = []
+    for sid, ag, samples, compactions in rings:
+        if not samples:
+            continue
+        out.append(dict(_row(samples[-1]), sessionId=sid, agent=ag,
+                        samples=len(samples), compactions=len(compactions),
+                        lastCompaction=compactions[-1]['ts'] if compactions else None,
+                        prediction=_predict(samples, compactions)))
+    out.sort(key=lambda s: s['percent'] or 0, reverse=True)
+    return out
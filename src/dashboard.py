@@ -0,0 +1,163 @@
+"""
+Multiplexed dashboard channel: one hub thread watches gateway health, the
+session list, the CLI cache and system files, and publishes typed events
+only when a source changes. Every /api/dashboard/stream subscriber replays
+from the same event log, so N open tabs cost one set of probes.
+"""
+
+import threading
+import time
+from collections import deque
+
+import agents
+import session_state
+import sessions
+import system
+from sse import _SSEWriter, _follow_event_log
+
+_TICK                  = 1.0    # seconds between hub passes
+_SYSTEM_INTERVAL       = 2      # seconds between system-file signature checks
+_CLI_SESSIONS_INTERVAL = 30     # seconds between shared `openclaw sessions` calls
+_EVENT_LOG_SIZE        = 512
+_IDLE_SHUTDOWN         = 30     # seconds without subscribers before the hub stops
+
+_cond        = threading.Condition()
+_events      = deque(maxlen=_EVENT_LOG_SIZE)   # (seq, event, data)
+_seq         = 0
+_subscribers = 0
+_hub_running = False
+_primed      = False   # True once the hub finished its first full pass
+_transitions_hooked = False
+
+# Latest value of every source; read by new subscribers as their snapshot
+_state = {'health': None, 'sessions': {}, 'cli_cache': None, 'system': None}
+
+
+def _publish(event, data):
+    """Append one event to the log and wake subscribers. Caller holds _cond."""
+    global _seq
+    _seq += 1
+    _events.append((_seq, event, data))
+    _cond.notify_all()
+
+
+def _diff_sessions(old: dict, new: dict) -> dict:
+    upsert = [s for sid, s in new.items() if old.get(sid) != s]
+    remove = [sid for sid in old if sid not in new]
+    return {'reset': False, 'upsert': upsert, 'remove': remove}
+
+
+def _hub_worker():
+    global _hub_running, _primed
+    next_system = next_cli_rows = 0
+    system_sig = None
+    cli_rows = None
+    idle_since = None
+
+    while True:
+        with _cond:
+            if _subscribers == 0:
+                idle_since = idle_since or time.monotonic()
+                if time.monotonic() - idle_since > _IDLE_SHUTDOWN:
+                    _hub_running = _primed = False
+                    return
+            else:
+                idle_since = None
+
+        now = time.monotonic()
+        try:
+            # gateway state comes from the shared prober, so this is a memory read
+            health = system._health_payload()
+            with _cond:
+                if health != _state['health']:
+                    _state['health'] = health
+                    _publish('health', health)
+
+            if now >= next_cli_rows:
+                next_cli_rows = now + _CLI_SESSIONS_INTERVAL
+                cli_rows = sessions._cli_session_rows()
+            current = {s['id']: s for s in agents.list_sessions('', cli_rows)}
+            with _cond:
+                delta = _diff_sessions(_state['sessions'], current)
+                if delta['upsert'] or delta['remove']:
+                    _state['sessions'] = current
+                    _publish('sessions', delta)
+
+            cli = system._cli_payload()
+            cli.pop('cli_age', None)
+            with _cond:
+                if _state['cli_cache'] is None or cli['cli_lastUpdated'] != _state['cli_cache']['cli_lastUpdated']:
+                    _state['cli_cache'] = cli
+                    _publish('cli_cache', cli)
+
+            if now >= next_system:
+                next_system = now + _SYSTEM_INTERVAL
+                sig = system._files_signature()
+                if sig != system_sig:
+                    system_sig = sig
+                    payload = system._files_payload()
+                    with _cond:
+                        _state['system'] = payload
+                        _publish('system', payload)
+        except Exception:
+            pass
+        if not _primed:
+            with _cond:
+                _primed = True
+                _cond.notify_all()
+        time.sleep(_TICK)
+
+
+def _on_transition(t):
+    """Forward a session_state transition as soon as it happens, ahead of
+    the next sessions diff."""
+    with _cond:
+        _publish('session_state', {
+            'id': t['id'], 'state': t['to'], 'from': t['from'], 'since': t['ts'], 'reason': t['reason'],
+            'status': 'idle' if t['to'] == 'idle' else 'processing',
+        })
+
+
+def _ensure_hub():
+    """Start the hub thread if it isn't running. Caller holds _cond."""
+    global _hub_running, _transitions_hooked
+    if not _transitions_hooked:
+        _transitions_hooked = True
+        session_state.add_listener(_on_transition)
+    if not _hub_running:
+        _hub_running = True
+        threading.Thread(target=_hub_worker, daemon=True).start()
+
+
+def _send_snapshot(writer) -> bool:
+    with _cond:
+        snap = dict(_state)
+    if snap['health'] is not None and not writer.send('health', snap['health']):
+        return False
+    if not writer.send('sessions', {'reset': True, 'upsert': list(snap['sessions'].values()),
+                                    'remove': []}):
+        return False
+    if snap['cli_cache'] is not None and not writer.send('cli_cache', snap['cli_cache']):
+        return False
+    if snap['system'] is not None and not writer.send('system', snap['system']):
+        return False
+    return writer.flush()
+
+
+def _stream(handler):
+    """Serve one subscriber until it disconnects. SSE headers already sent."""
+    global _subscribers
+    with _cond:
+        _subscribers += 1
+        _ensure_hub()
+        # wait briefly for the first pass so the snapshot isn't empty
+        _cond.wait_for(lambda: _primed, timeout=3)
+        seq = _seq
+    writer = _SSEWriter(handler)
+    try:
+        if not _send_snapshot(writer):
+            return
+        _follow_event_log(handler, writer, _cond, _events, lambda: _seq, seq, _send_snapshot)
+    finally:
+        with _cond:
+            _subscribers -= 1
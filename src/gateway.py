@@ -0,0 +1,194 @@
+"""
+Shared gateway health prober.
+
+One background thread TCP-probes GATEWAY_HOST:GATEWAY_PORT at a fixed
+cadence (faster for a while after a state change) and keeps the current
+state, a ring buffer of up/down transitions and uptime totals in memory.
+Requests read the state instead of opening their own connections.
+"""
+
+import socket
+import threading
+import time
+from collections import deque
+
+import config
+
+_PROBE_INTERVAL     = 3      # seconds between probes in a steady state
+_FAST_INTERVAL      = 1      # seconds between probes right after a transition
+_FAST_WINDOW        = 20     # seconds the fast cadence lasts after a transition
+_PROBE_TIMEOUT      = 0.5
+_TRANSITIONS_MAX    = 256
+
+_cond        = threading.Condition()
+_online      = None          # None until the first probe
+_since       = None          # epoch of the last transition (or first probe)
+_initial     = None          # state seen by the first probe
+_last_check  = None
+_last_rtt_ms = None
+_up_secs     = 0.0           # observed time spent up / in total since start
+_total_secs  = 0.0
+_started_at  = None
+_transitions = deque(maxlen=_TRANSITIONS_MAX)   # (epoch, online)
+_listeners   = []
+_running     = False
+
+
+def _probe():
+    """One TCP connect. Returns (online, rtt_ms)."""
+    t0 = time.perf_counter()
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(_PROBE_TIMEOUT)
+        online = s.connect_ex((config.GATEWAY_HOST, config.GATEWAY_PORT)) == 0
+        s.close()
+    except OSError:
+        online = False
+    return online, round((time.perf_counter() - t0) * 1000, 2)
+
+
+def _record(online: bool, rtt_ms: float):
+    """Fold one probe result into the state. Returns True on a transition.
+    The first probe only initializes it: no transition, no listeners."""
+    global _online, _since, _initial, _last_check, _last_rtt_ms, _up_secs, _total_secs, _started_at
+    now = time.time()
+    with _cond:
+        if _last_check is not None:
+            dt = max(0.0, now - _last_check)
+            _total_secs += dt
+            if _online:
+                _up_secs += dt
+        else:
+            _started_at = _since = now
+            _initial = online
+        changed = _online is not None and online != _online
+        if changed:
+            _transitions.append((now, online))
+            _since = now
+        _online = online
+        _last_check = now
+        _last_rtt_ms = rtt_ms
+        _cond.notify_all()
+        listeners = list(_listeners) if changed else ()
+    for fn in listeners:
+        try:
+            fn(online, now)
+        except Exception:
+            pass
+    return changed
+
+
+def check_now() -> bool:
+    """Probe immediately (outside the regular cadence) and return the new state."""
+    online, rtt = _probe()
+    _record(online, rtt)
+    return online
+
+
+def _prober_worker():
+    fast_until = 0
+    while True:
+        try:
+            if _record(*_probe()):
+                fast_until = time.monotonic() + _FAST_WINDOW
+        except Exception:
+            pass
+        time.sleep(_FAST_INTERVAL if time.monotonic() < fast_until else _PROBE_INTERVAL)
+
+
+def start():
+    """Start the background prober thread (idempotent)."""
+    global _running
+    with _cond:
+        if _running:
+            return
+        _running = True
+    t = threading.Thread(target=_prober_worker, daemon=True)
+    t.start()
+
+
+def add_listener(fn):
+    """Call fn(online, epoch) from the prober thread on every transition."""
+    with _cond:
+        _listeners.append(fn)
+
+
+def remove_listener(fn):
+    with _cond:
+        try:
+            _listeners.remove(fn)
+        except ValueError:
+            pass
+
+
+def wait_for(online: bool, timeout: float) -> bool:
+    """Block until the gateway reaches the given state or timeout expires."""
+    with _cond:
+        return _cond.wait_for(lambda: _online == online, timeout=timeout)
+
+
+def is_online() -> bool:
+    """Current state; probes synchronously if the prober hasn't run yet."""
+    if _last_check is None:
+        return check_now()
+    return bool(_online)
+
+
+def since():
+    return _since
+
+
+# ── Reporting ────────────────────────────────────────────
+def _outages(transitions, now, down_from=None) -> list:
+    """Down periods reconstructed from the transition ring, oldest first.
+    down_from: start of an outage already under way at the first probe."""
+    out, down_at = [], down_from
+    for ts, online in transitions:
+        if not online and down_at is None:
+            down_at = ts
+        elif online and down_at is not None:
+            out.append({'start': down_at, 'end': ts, 'duration': round(ts - down_at, 1)})
+            down_at = None
+    if down_at is not None:
+        out.append({'start': down_at, 'end': None, 'duration': round(now - down_at, 1)})
+    return out
+
+
+def summary() -> dict:
+    """Current state plus uptime totals (no history)."""
+    is_online()
+    now = time.time()
+    with _cond:
+        up, total = _up_secs, _total_secs
+        if _last_check is not None:
+            # account for the time since the last probe in the current state
+            dt = max(0.0, now - _last_check)
+            total += dt
+            if _online:
+                up += dt
+        return {
+            'online':      bool(_online),
+            'since':       _since,
+            'lastCheck':   _last_check,
+            'rttMs':       _last_rtt_ms,
+            'uptimePct':   round(up / total * 100, 3) if total > 0 else (100.0 if _online else 0.0),
+            'observedSec': round(total, 1),
+            'startedAt':   _started_at,
+            'transitions': len(_transitions),
+        }
+
+
+def history() -> dict:
+    """Summary plus the transition ring and the outages derived from it."""
+    result = summary()
+    now = time.time()
+    with _cond:
+        transitions = list(_transitions)
+        # the ring still reaches back to the first probe: it may have found the gateway down
+        down_from = (_started_at if _initial is False and len(transitions) < _TRANSITIONS_MAX
+                     else None)
+    outages = _outages(transitions, now, down_from)
+    result['transitionLog'] = [{'ts': ts, 'online': online} for ts, online in transitions]
+    result['outages'] = outages
+    result['outageSec'] = round(sum(o['duration'] for o in outages), 1)
+    return result
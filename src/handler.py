@@ -2,29 +2,41 @@
 HTTP request handler: routing, auth guards, all API endpoints.
 """
 
+import hmac
 import http.cookies
 import http.server
 import json
 import os
 import select
-import socket
 import subprocess
 import tempfile
-import time
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
 
+import codec
 import config
+import context_history
+import agents
 import auth
-import cli_cache
-import diagnostics
+import dashboard
+import gateway
+import log_archive
 import logs
+import metrics
+import model_switch
+import perf
+import runs
+import search
+import session_state
+import tool_stats
 import sessions
+import system
+import timeutil
 import jsonl
-from sse import _begin_sse, _send_sse, _send_sse_heartbeat, _json_resp, _read_json_file
+from sse import _SSEWriter, _begin_sse, _send_sse, _send_sse_heartbeat, _json_resp, _read_json_file
 
 
 def _json_resp_status(handler, obj, status=200):
-    body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    body = codec.dumpb(obj)
     handler.send_response(status)
     handler.send_header('Content-Type', 'application/json')
     handler.send_header('Content-Length', str(len(body)))
@@ -122,18 +134,67 @@ def _write_json_atomic(path: str, data):
 
 
 class Handler(http.server.SimpleHTTPRequestHandler):
+    # Persistent connections: every non-SSE response carries Content-Length,
+    # SSE responses send `Connection: close`.
+    protocol_version = 'HTTP/1.1'
+    timeout          = config.KEEPALIVE_TIMEOUT   # idle keep-alive timeout (socket timeout)
 
     def __init__(self, *args, **kwargs):
+        self._requests_handled = 0
+        self._body = b''
         super().__init__(*args, directory=config.SERVE_DIR, **kwargs)
 
     # suppress per-request logging
     def log_message(self, *_): pass
 
     def handle_one_request(self):
+        self._requests_handled += 1
+        self._body = b''
         try:
             super().handle_one_request()
-        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
-            pass  # client disconnected, nothing to do
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError, TimeoutError):
+            self.close_connection = True  # client disconnected, nothing to do
+
+    def end_headers(self):
+        if self._requests_handled >= config.KEEPALIVE_MAX_REQUESTS and not self.close_connection:
+            self.send_header('Connection', 'close')
+        super().end_headers()
+
+    def _send_body(self, status, body: bytes, content_type='application/json', headers=()):
+        """Write a complete response with Content-Length so the connection can be reused."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bool:
+        """Consume the request body so the next request on this connection parses cleanly.
+
+        Returns False (after sending 413) if the body is too large to accept.
+        """
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            length = 0
+        if length > config.MAX_REQUEST_BODY:
+            self.close_connection = True
+            self._send_body(413, json.dumps({'ok': False, 'error': 'Request body too large'}).encode())
+            return False
+        self._body = self.rfile.read(length) if length > 0 else b''
+        return True
+
+    def _json_body(self) -> dict:
+        try:
+            body = json.loads(self._body) if self._body else {}
+        except (json.JSONDecodeError, ValueError):
+            body = {}
+        return body if isinstance(body, dict) else {}
+
+    def _query(self):
+        return parse_qs(urlparse(self.path).query)
 
     # ── auth guard ───────────────────────────────────────────
     def _require_auth(self, api=False):
@@ -145,67 +206,92 @@ class Handler(http.server.SimpleHTTPRequestHandler):
         if status == 'enabled' and auth._check_auth(self):
             return False
 
+        self._perf_denied = True
         # 'locked' → auth file missing/tampered, refuse everything
         if status == 'locked':
             if api:
-                body = json.dumps({'error': 'System locked — auth file missing'}).encode()
-                self.send_response(403)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(body)))
-                self.end_headers()
-                self.wfile.write(body)
+                self._send_body(403, json.dumps({'error': 'System locked — auth file missing'}).encode())
             else:
-                body = auth.LOCKED_HTML.encode('utf-8')
-                self.send_response(403)
-                self.send_header('Content-Type', 'text/html; charset=utf-8')
-                self.send_header('Content-Length', str(len(body)))
-                self.end_headers()
-                self.wfile.write(body)
+                self._send_body(403, auth.LOCKED_HTML.encode('utf-8'), 'text/html; charset=utf-8')
             return True
 
         # 'enabled' but not authenticated → login page
         if api:
-            body = json.dumps({'error': 'Unauthorized'}).encode()
-            self.send_response(401)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            self._send_body(401, json.dumps({'error': 'Unauthorized'}).encode())
         else:
-            body = auth.LOGIN_HTML.encode('utf-8')
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/html; charset=utf-8')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            self._send_body(200, auth.LOGIN_HTML.encode('utf-8'), 'text/html; charset=utf-8')
         return True
 
+    def _metrics_token_ok(self) -> bool:
+        if not config.METRICS_TOKEN:
+            return False
+        given = self.headers.get('Authorization', '')
+        return hmac.compare_digest(given.encode(), f'Bearer {config.METRICS_TOKEN}'.encode())
+
     # ── routing ─────────────────────────────────────────────
     def do_GET(self):
         path = urlparse(self.path).path
+        with perf.request(self, path):
+            self._route_get(path)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        with perf.request(self, path):
+            self._route_post(path)
+
+    def _route_get(self, path):
 
         if path == '/api/logout':
             return self._api_logout()
         if path == '/api/version':
             return _json_resp(self, config._get_version())
+        if path == '/api/ready':
+            return self._api_ready()
+
+        if path == '/metrics':
+            if not self._metrics_token_ok() and self._require_auth(api=True):
+                return
+            return self._send_body(200, metrics.render(), metrics.CONTENT_TYPE)
 
         is_api = path.startswith('/api/')
         if self._require_auth(api=is_api):
             return
 
         if   path == '/api/sessions':            return self._api_sessions()
+        elif path == '/api/agents':              return self._api_agents()
         elif path == '/api/health':              return self._api_health()
+        elif path == '/api/health/history':      return self._api_health_history()
         elif path == '/api/models':              return self._api_models()
         elif path == '/api/system':              return self._api_system()
+        elif path == '/api/search':              return self._api_search()
+        elif path == '/api/tools/stats':         return self._api_tool_stats()
+        elif path == '/api/runs':                return self._api_runs()
+        elif path == '/api/runs/stream':         return self._api_runs_stream()
+        elif path == '/api/context/history':     return self._api_context_history()
         elif path == '/api/logs/stream':         return self._api_log_stream()
+        elif path == '/api/dashboard/stream':    return self._api_dashboard_stream()
+        elif path == '/api/logs/query':          return self._api_log_query()
+        elif path == '/api/debug/perf':          return self._api_debug_perf()
         elif path.startswith('/api/session/') and path.endswith('/stream'):
             sid = path[len('/api/session/'):-len('/stream')]
             return self._api_session_stream(sid)
+        elif path.startswith('/api/models/switch/') and path.endswith('/stream'):
+            jid = path[len('/api/models/switch/'):-len('/stream')]
+            return self._api_models_switch_stream(jid)
+        elif path.startswith('/api/models/switch/'):
+            return self._api_models_switch_job(path[len('/api/models/switch/'):])
+        elif path.startswith('/api/session/') and path.endswith('/state'):
+            sid = path[len('/api/session/'):-len('/state')]
+            return self._api_session_state(sid)
+        elif path.startswith('/api/session/') and path.endswith('/block'):
+            sid = path[len('/api/session/'):-len('/block')]
+            return self._api_session_block(sid)
 
         return super().do_GET()
 
-    def do_POST(self):
-        path = urlparse(self.path).path
+    def _route_post(self, path):
+        if not self._read_body():
+            return
 
         if path == '/api/login':
             return self._api_login()
@@ -215,6 +301,8 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 
         if path == '/api/models/switch':
             return self._api_models_switch()
+        if path == '/api/debug/perf/profile':
+            return self._api_debug_profile()
 
         self.send_error(404, 'Not Found')
 
@@ -223,37 +311,18 @@ class Handler(http.server.SimpleHTTPRequestHandler):
         # If system is locked, reject all login attempts
         if auth._auth_status() == 'locked':
             resp = json.dumps({'ok': False, 'error': 'System locked — auth file missing'}).encode()
-            self.send_response(403)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(resp)))
-            self.end_headers()
-            self.wfile.write(resp)
-            return
+            return self._send_body(403, resp)
 
-        try:
-            length = int(self.headers.get('Content-Length', 0))
-            body = json.loads(self.rfile.read(length)) if length else {}
-        except (json.JSONDecodeError, ValueError):
-            body = {}
-        password = body.get('password', '')
+        password = self._json_body().get('password', '')
 
         if auth._verify_password(password):
             token = auth._create_session()
             resp = json.dumps({'ok': True}).encode()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(resp)))
-            self.send_header('Set-Cookie',
-                f'{config.COOKIE_NAME}={token}; Path=/; HttpOnly; SameSite=Strict; Max-Age={config.SESSION_TTL}')
-            self.end_headers()
-            self.wfile.write(resp)
+            self._send_body(200, resp, headers=[('Set-Cookie',
+                f'{config.COOKIE_NAME}={token}; Path=/; HttpOnly; SameSite=Strict; Max-Age={config.SESSION_TTL}')])
         else:
             resp = json.dumps({'ok': False, 'error': 'Invalid password'}).encode()
-            self.send_response(401)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(resp)))
-            self.end_headers()
-            self.wfile.write(resp)
+            self._send_body(401, resp)
 
     # ── GET /api/logout ──────────────────────────────────────
     def _api_logout(self):
@@ -269,49 +338,47 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                 pass
 
         resp = json.dumps({'ok': True}).encode()
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.send_header('Content-Length', str(len(resp)))
-        self.send_header('Set-Cookie',
-            f'{config.COOKIE_NAME}=; Path=/; HttpOnly; SameSite=Strict; Max-Age=0')
-        self.end_headers()
-        self.wfile.write(resp)
+        self._send_body(200, resp, headers=[('Set-Cookie',
+            f'{config.COOKIE_NAME}=; Path=/; HttpOnly; SameSite=Strict; Max-Age=0')])
+
+    # ── GET /api/ready ──────────────────────────────────────
+    def _api_ready(self):
+        # unauthenticated, like /api/version: for systemd/health checks
+        ready = config.READY.is_set()
+        _json_resp_status(self, {
+            'ready': ready,
+            'startedAt': config.STARTED_AT,
+            'readyAt': config.READY_AT,
+            'version': config._get_version()['version'],
+        }, 200 if ready else 503)
 
     # ── GET /api/sessions ───────────────────────────────────
     def _api_sessions(self):
-        sess = []
-        try:
-            r = subprocess.run([config.OC_BIN, 'sessions'],
-                               capture_output=True, text=True, timeout=5, env=config.OC_ENV)
-            if r.returncode == 0 and r.stdout.strip():
-                sess = sessions._parse_oc_sessions(r.stdout)
-        except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
-            pass
+        agent = self._query().get('agent', [''])[0]
+        cli_rows = None
+        if agent in ('', 'main'):
+            cli_rows = sessions._cli_session_rows()
 
-        if not sess:
-            sess = sessions._scan_session_files()
+        _json_resp(self, agents.list_sessions(agent, cli_rows))
 
-        _json_resp(self, sess)
+    # ── GET /api/agents ─────────────────────────────────────
+    def _api_agents(self):
+        _json_resp(self, [
+            {'agent': shard.agent, 'sessionDir': shard.session_dir,
+             'sessionCount': len(shard.sessions())}
+            for shard in agents.get_shards()
+        ])
 
     # ── GET /api/health ─────────────────────────────────────
     def _api_health(self):
-        # Socket probe to gateway port — ~0.1 ms, no subprocess
-        gw_online = False
-        try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(0.5)
-            gw_online = s.connect_ex((config.GATEWAY_HOST, config.GATEWAY_PORT)) == 0
-            s.close()
-        except OSError:
-            pass
-
-        result = {
-            'openclaw_available': gw_online,
-            'session_dir_exists': os.path.isdir(config.SESSION_DIR),
-            'today_log_exists':   os.path.isfile(config.TODAY_LOG),
-        }
+        result = system._health_payload()
+        result['gateway'] = gateway.summary()
         _json_resp(self, result)
 
+    # ── GET /api/health/history ─────────────────────────────
+    def _api_health_history(self):
+        _json_resp(self, gateway.history())
+
     # ── GET /api/models ─────────────────────────────────────
     def _api_models(self):
         cfg = _read_json_file(config.OPENCLAW_CONFIG)
@@ -331,11 +398,7 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 
     # ── POST /api/models/switch ─────────────────────────────
     def _api_models_switch(self):
-        try:
-            length = int(self.headers.get('Content-Length', 0))
-            body = json.loads(self.rfile.read(length)) if length else {}
-        except (json.JSONDecodeError, ValueError):
-            body = {}
+        body = self._json_body()
 
         target = body.get('target', '')
         if not isinstance(target, str) or not target.strip():
@@ -397,6 +460,7 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                 added_model_key = True
 
             changed = changed_primary or added_model_key
+            job = None
             if changed:
                 try:
                     _write_json_atomic(config.OPENCLAW_CONFIG, cfg)
@@ -405,119 +469,167 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                         'ok': False,
                         'error': f'Failed to write config: {e}'
                     }, 500)
-
-                try:
-                    p = subprocess.run(
-                        [config.OC_BIN, 'gateway', 'restart'],
-                        capture_output=True,
-                        text=True,
-                        timeout=20,
-                        env=config.OC_ENV
-                    )
-                except (FileNotFoundError, subprocess.TimeoutExpired, OSError) as e:
-                    return _json_resp_status(self, {
-                        'ok': False,
-                        'changed': True,
-                        'current': canonical,
-                        'error': f'Gateway restart failed: {e}'
-                    }, 500)
-
-                if p.returncode != 0:
-                    err = (p.stderr or p.stdout or '').strip() or 'Gateway restart failed'
-                    return _json_resp_status(self, {
-                        'ok': False,
-                        'changed': True,
-                        'current': canonical,
-                        'error': err
-                    }, 500)
+                job = model_switch.submit(canonical)
+            else:
+                # repeated click while the restart for this target is still running
+                job = model_switch.active_job(canonical)
 
             _json_resp(self, {
                 'ok': True,
                 'changed': changed,
                 'current': canonical,
-                'gatewayRestarted': changed,
+                'gatewayRestarted': job is not None,
+                'jobId': job['id'] if job else None,
+                'job': job,
             })
 
-    # ── GET /api/system ────────────────────────────────────
-    def _api_system(self):
-        result = {}
-
-        # CLI data from background cache
-        cache = cli_cache.get_cache()
-        result['channel_health'] = cache['channel_health'] or {'error': 'loading'}
-        result['presence'] = cache['presence'] or {'error': 'loading'}
-        last = cache['lastUpdated']
-        result['cli_lastUpdated'] = last
-        result['cli_age'] = round(time.time() - last, 1) if last else None
-
-        # File-based diagnostics
-        result['diagnostics'] = diagnostics._file_diagnostics()
-
-        # File-based data
-        sessions_data = _read_json_file(config.SESSIONS_JSON)
-
-        # Context Window
-        ctx = []
-        if isinstance(sessions_data, dict):
-            for key, s in sessions_data.items():
-                if not isinstance(s, dict):
-                    continue
-                sid = s.get('sessionId', key)
-                ct = s.get('contextTokens')
-                tt = s.get('totalTokens')
-                if ct is not None or tt is not None:
-                    pct = round(tt / ct * 100, 1) if ct and tt and ct > 0 else None
-                    ctx.append({'sessionId': sid, 'contextTokens': ct, 'totalTokens': tt, 'percent': pct})
-        result['context_window'] = ctx
-
-        # System Prompt Report
-        spr = []
-        if isinstance(sessions_data, dict):
-            for key, s in sessions_data.items():
-                if not isinstance(s, dict):
-                    continue
-                report = s.get('systemPromptReport')
-                if report:
-                    spr.append({'sessionId': s.get('sessionId', key), 'report': report})
-        result['system_prompt_report'] = spr
-
-        # Skills Snapshot
-        skills = []
-        if isinstance(sessions_data, dict):
-            for key, s in sessions_data.items():
-                if not isinstance(s, dict):
-                    continue
-                snap = s.get('skillsSnapshot')
-                if snap:
-                    skills.append({'sessionId': s.get('sessionId', key), 'snapshot': snap})
-        result['skills_snapshot'] = skills
-
-        # Compaction History
-        compaction = []
-        if isinstance(sessions_data, dict):
-            for key, s in sessions_data.items():
-                if not isinstance(s, dict):
-                    continue
-                cc = s.get('compactionCount')
-                if cc is not None:
-                    compaction.append({'sessionId': s.get('sessionId', key), 'compactionCount': cc})
-        result['compaction_history'] = compaction
+    # ── GET /api/models/switch/<id>[/stream] ───────────────
+    def _api_models_switch_job(self, job_id):
+        job = model_switch.get(job_id)
+        if not job:
+            return _json_resp_status(self, {'ok': False, 'error': 'Job not found'}, 404)
+        _json_resp(self, job)
 
-        # Devices
-        paired = _read_json_file(config.DEVICES_PAIRED)
-        pending = _read_json_file(config.DEVICES_PENDING)
-        result['devices'] = {'paired': paired, 'pending': pending}
+    def _api_models_switch_stream(self, job_id):
+        with config._switch_stream_lock:
+            if config._switch_stream_count >= config.MAX_SWITCH_STREAMS:
+                _begin_sse(self)
+                _send_sse(self, 'status', {
+                    'type': 'warn',
+                    'message': f'Too many switch job streams ({config.MAX_SWITCH_STREAMS} max). '
+                               'Falling back to polling.'
+                })
+                return
+            config._switch_stream_count += 1
 
-        # Cron Jobs
-        result['cron_jobs'] = _read_json_file(config.CRON_JOBS)
+        _begin_sse(self)
+        try:
+            self._follow_switch_job(job_id)
+        finally:
+            with config._switch_stream_lock:
+                config._switch_stream_count -= 1
 
-        # Update Check
-        result['update_check'] = _read_json_file(config.UPDATE_CHECK)
+    def _follow_switch_job(self, job_id):
+        job = model_switch.get(job_id)
+        if not job:
+            _send_sse(self, 'status', {'type': 'error', 'message': f'Job not found: {job_id}'})
+            return
+        seen = -1
+        while True:
+            if len(job['steps']) != seen or job['state'] not in ('queued', 'running'):
+                seen = len(job['steps'])
+                if not _send_sse(self, 'job', job):
+                    return
+                if job['state'] not in ('queued', 'running'):
+                    return
+            elif not _send_sse_heartbeat(self):
+                return
+            job = model_switch.wait(job_id, seen, 15)
+            if not job:
+                return
 
-        # Exec Approvals
-        result['exec_approvals'] = _read_json_file(config.EXEC_APPROVALS)
+    # ── GET /api/system ────────────────────────────────────
+    def _api_system(self):
+        _json_resp(self, system._system_payload())
+
+    # ── GET /api/search ─────────────────────────────────────
+    def _api_search(self):
+        params = self._query()
+        q = params.get('q', [''])[0].strip()
+        if not q:
+            return _json_resp_status(self, {'ok': False, 'error': 'Missing query'}, 400)
+        try:
+            limit = int(params.get('limit', ['50'])[0])
+        except ValueError:
+            limit = 50
+        _json_resp(self, search.search(q, limit, params.get('agent', [''])[0]))
+
+    # ── GET /api/tools/stats ────────────────────────────────
+    def _api_tool_stats(self):
+        params = self._query()
+        arg = lambda k: params.get(k, [''])[0].strip()
+        t_from = timeutil.ts_epoch(arg('from')) if arg('from') else None
+        t_to   = timeutil.ts_epoch(arg('to')) if arg('to') else None
+        if (arg('from') and t_from is None) or (arg('to') and t_to is None):
+            return _json_resp_status(self, {'ok': False, 'error': 'Invalid from/to timestamp'}, 400)
+        _json_resp(self, tool_stats.stats(t_from, t_to))
+
+    # ── GET /api/runs ───────────────────────────────────────
+    def _api_runs(self):
+        params = self._query()
+        arg = lambda k: params.get(k, [''])[0].strip()
+        t_from = timeutil.ts_epoch(arg('from')) if arg('from') else None
+        t_to   = timeutil.ts_epoch(arg('to')) if arg('to') else None
+        if (arg('from') and t_from is None) or (arg('to') and t_to is None):
+            return _json_resp_status(self, {'ok': False, 'error': 'Invalid from/to timestamp'}, 400)
+        kinds = {k for k in arg('kind').split(',') if k}
+        try:
+            limit = int(arg('limit') or runs._QUERY_LIMIT)
+        except ValueError:
+            limit = runs._QUERY_LIMIT
+        _json_resp(self, runs.query(t_from, t_to, arg('session'), kinds, max(1, limit)))
+
+    # ── SSE /api/runs/stream ────────────────────────────────
+    def _api_runs_stream(self):
+        with config._run_stream_lock:
+            if config._run_stream_count >= config.MAX_RUN_STREAMS:
+                _begin_sse(self)
+                _send_sse(self, 'status', {
+                    'type': 'warn',
+                    'message': f'Too many run streams ({config.MAX_RUN_STREAMS} max). '
+                               'Close another tab and retry.'
+                })
+                return
+            config._run_stream_count += 1
 
-        _json_resp(self, result)
+        _begin_sse(self)
+        try:
+            runs._stream(self)
+        finally:
+            with config._run_stream_lock:
+                config._run_stream_count -= 1
+
+    # ── GET /api/context/history ────────────────────────────
+    def _api_context_history(self):
+        params = self._query()
+        sid = params.get('session', [''])[0].strip()
+        if not sid:
+            return _json_resp(self, context_history.overview(params.get('agent', [''])[0]))
+        hist = context_history.history(sid)
+        if hist is None:
+            return _json_resp_status(self, {'ok': False, 'error': 'Session not found'}, 404)
+        _json_resp(self, hist)
+
+    # ── GET /api/logs/query ─────────────────────────────────
+    def _api_log_query(self):
+        params = self._query()
+        arg = lambda k: params.get(k, [''])[0].strip()
+        t_from = timeutil.ts_epoch(arg('from')) if arg('from') else None
+        t_to   = timeutil.ts_epoch(arg('to')) if arg('to') else None
+        if (arg('from') and t_from is None) or (arg('to') and t_to is None):
+            return _json_resp_status(self, {'ok': False, 'error': 'Invalid from/to timestamp'}, 400)
+        types = {t for t in arg('type').split(',') if t}
+        try:
+            limit = int(arg('limit') or 200)
+        except ValueError:
+            limit = 200
+        _json_resp(self, log_archive.query(t_from, t_to, types, arg('q'), limit, arg('cursor')))
+
+    # ── GET /api/debug/perf ─────────────────────────────────
+    def _api_debug_perf(self):
+        if self._query().get('reset', [''])[0] == '1':
+            perf.reset()
+        _json_resp(self, perf.snapshot())
+
+    # ── POST /api/debug/perf/profile ────────────────────────
+    def _api_debug_profile(self):
+        body = self._json_body()
+        try:
+            seconds = float(body.get('seconds', 30))
+            sample = float(body.get('sample', 0.1))
+        except (TypeError, ValueError):
+            return _json_resp_status(self, {'ok': False, 'error': 'Invalid seconds/sample'}, 400)
+        _json_resp(self, dict(perf.start_profile(seconds, sample), ok=True))
 
     # ── SSE /api/logs/stream ────────────────────────────────
     def _api_log_stream(self):
@@ -532,9 +644,13 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                 return
             config._log_stream_count += 1
 
+        params = self._query()
+        types = {t for t in params.get('types', [''])[0].split(',') if t}
+        query = params.get('q', [''])[0].strip().lower()
+
         _begin_sse(self)
         try:
-            if not logs._tail_log_file(self):
+            if not logs._tail_log_file(self, types, query):
                 _send_sse(self, 'status', {
                     'type': 'warn',
                     'message': 'No log file available. Ensure openclaw is running.'
@@ -543,6 +659,49 @@ class Handler(http.server.SimpleHTTPRequestHandler):
             with config._log_stream_lock:
                 config._log_stream_count -= 1
 
+    # ── SSE /api/dashboard/stream ───────────────────────────
+    def _api_dashboard_stream(self):
+        with config._dashboard_stream_lock:
+            if config._dashboard_stream_count >= config.MAX_DASHBOARD_STREAMS:
+                _begin_sse(self)
+                _send_sse(self, 'status', {
+                    'type': 'warn',
+                    'message': f'Too many dashboard streams ({config.MAX_DASHBOARD_STREAMS} max). '
+                               'Falling back to polling.'
+                })
+                return
+            config._dashboard_stream_count += 1
+
+        _begin_sse(self)
+        try:
+            dashboard._stream(self)
+        finally:
+            with config._dashboard_stream_lock:
+                config._dashboard_stream_count -= 1
+
+    # ── GET /api/session/<id>/state ─────────────────────────
+    def _api_session_state(self, session_id):
+        state = session_state.get(session_id, history=True)
+        if state is None:
+            return _json_resp_status(self, {'ok': False, 'error': 'Session not found'}, 404)
+        _json_resp(self, state)
+
+    # ── GET /api/session/<id>/block ─────────────────────────
+    def _api_session_block(self, session_id):
+        params = self._query()
+        try:
+            offset = int(params.get('offset', [''])[0])
+            index = int(params.get('index', [''])[0])
+        except ValueError:
+            return _json_resp_status(self, {'ok': False, 'error': 'offset and index are required'}, 400)
+        session_file = sessions._find_session_file(session_id)
+        if not session_file:
+            return _json_resp_status(self, {'ok': False, 'error': 'Session not found'}, 404)
+        block = jsonl._read_block(session_file, offset, index)
+        if block is None:
+            return _json_resp_status(self, {'ok': False, 'error': 'Block not found'}, 404)
+        _json_resp(self, block)
+
     # ── SSE /api/session/<id>/stream ────────────────────────
     def _api_session_stream(self, session_id):
         with config._session_stream_lock:
@@ -558,30 +717,38 @@ class Handler(http.server.SimpleHTTPRequestHandler):
 
         _begin_sse(self)
 
-        session_file = os.path.join(config.SESSION_DIR, f'{session_id}.jsonl')
-        if not os.path.isfile(session_file):
+        session_file = sessions._find_session_file(session_id)
+        if not session_file:
             _send_sse(self, 'status', {
                 'type': 'error',
-                'message': f'Session file not found: {session_file}'
+                'message': f'Session file not found: {session_id}.jsonl'
             })
             with config._session_stream_lock:
                 config._session_stream_count -= 1
             return
 
         proc = None
+        writer = _SSEWriter(self)
         try:
-            # replay history
-            with open(session_file) as fh:
-                for line in fh:
-                    parsed = jsonl._parse_jsonl_line(line)
-                    if parsed and not _send_sse(self, 'session_event', parsed):
+            # replay history; byte offsets let oversized blocks be fetched
+            # later through /api/session/<id>/block
+            pos = 0
+            with perf.timer('session_replay'), open(session_file, 'rb') as fh:
+                for raw in fh:
+                    if not raw.endswith(b'\n'):
+                        break           # unfinished line: tail delivers it whole
+                    parsed = jsonl._parse_jsonl_line(raw.decode('utf-8', errors='replace'), pos)
+                    pos += len(raw)
+                    if parsed and not writer.send('session_event', parsed):
                         return
+                writer.send('history_done', {})
+                if not writer.flush():
+                    return
 
-            _send_sse(self, 'history_done', {})
-
-            # tail for new lines (non-blocking with select)
+            # tail from the byte where the replay stopped, so the offsets of
+            # live blocks stay exact even if lines were appended meanwhile
             proc = subprocess.Popen(
-                ['tail', '-f', '-n', '0', session_file],
+                ['tail', '-c', f'+{pos + 1}', '-f', session_file],
                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
             fd = proc.stdout.fileno()
@@ -604,12 +771,15 @@ class Handler(http.server.SimpleHTTPRequestHandler):
                     if not chunk:
                         break
                     buf += chunk
-                    while b'\n' in buf:
-                        raw, buf = buf.split(b'\n', 1)
+                    *complete, buf = buf.split(b'\n')
+                    for raw in complete:
                         parsed = jsonl._parse_jsonl_line(
-                            raw.decode('utf-8', errors='replace'))
-                        if parsed and not _send_sse(self, 'session_event', parsed):
+                            raw.decode('utf-8', errors='replace'), pos)
+                        pos += len(raw) + 1
+                        if parsed and not writer.send('session_event', parsed):
                             return
+                    if not writer.flush():
+                        return
         finally:
             if proc:
                 proc.kill()
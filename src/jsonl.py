@@ -3,15 +3,32 @@ JSONL line parser for session transcript files.
 """
 
 import json
+import os
 
+import codec
+import config
 
-def _parse_jsonl_line(line: str):
+
+def _parse_jsonl_line(line: str, offset: int = None):
+    """Parse one transcript line into {role, blocks}.
+
+    With `offset` (the line's byte offset in its file), blocks longer than
+    SESSION_BLOCK_MAX_CHARS are cut to a preview that /api/session/<id>/block
+    can expand; without it every block is returned in full.
+    """
+    parsed = _parse(line)
+    if offset is not None and parsed:
+        _truncate_blocks(parsed, offset)
+    return parsed
+
+
+def _parse(line: str):
     line = line.strip()
     if not line:
         return None
     try:
-        obj = json.loads(line)
-    except json.JSONDecodeError:
+        obj = codec.loads(line)
+    except codec.JSONDecodeError:
         return {'role': 'raw', 'blocks': [{'type': 'text', 'content': line}]}
 
     if obj.get('type') != 'message':
@@ -49,3 +66,55 @@ def _parse_jsonl_line(line: str):
             blocks.append({'type': 'text', 'content': b.get('text', '')})
 
     return {'role': role, 'blocks': blocks}
+
+
+# ── Oversized blocks ─────────────────────────────────────
+def _block_text(block) -> str:
+    """Full text of a block as the UI shows it (tool-call args as indented JSON)."""
+    if block.get('type') == 'tool_call':
+        return json.dumps(block.get('arguments', {}), ensure_ascii=False, indent=2)
+    c = block.get('content', '')
+    return c if isinstance(c, str) else json.dumps(c, ensure_ascii=False, indent=2)
+
+
+def _truncate_blocks(parsed: dict, offset: int):
+    limit = config.SESSION_BLOCK_MAX_CHARS
+    for i, b in enumerate(parsed.get('blocks', [])):
+        if b.get('type') == 'tool_call':
+            # cheap compact size check before building the indented text
+            if len(codec.dumps(b.get('arguments', {}))) <= limit // 2:
+                continue
+            text = _block_text(b)
+            if len(text) <= limit:
+                continue
+            del b['arguments']
+            b['argsText'] = text[:config.SESSION_BLOCK_PREVIEW_CHARS]
+        else:
+            c = b.get('content')
+            if not isinstance(c, str) or len(c) <= limit:
+                continue
+            text = c
+            b['content'] = c[:config.SESSION_BLOCK_PREVIEW_CHARS]
+        b.update(truncated=True, length=len(text), offset=offset, index=i)
+
+
+def _read_block(path: str, offset: int, index: int):
+    """Return the full text of block `index` of the line starting at `offset`,
+    or None if offset is not a line start or the block does not exist."""
+    try:
+        if offset < 0 or offset >= os.path.getsize(path):
+            return None
+        with open(path, 'rb') as fh:
+            if offset > 0:
+                fh.seek(offset - 1)
+                if fh.read(1) != b'\n':
+                    return None
+            line = fh.readline().decode('utf-8', errors='replace')
+    except OSError:
+        return None
+    parsed = _parse(line)
+    blocks = parsed.get('blocks', []) if parsed else []
+    if not 0 <= index < len(blocks):
+        return None
+    text = _block_text(blocks[index])
+    return {'type': blocks[index].get('type'), 'content': text, 'length': len(text)}
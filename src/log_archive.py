@@ -0,0 +1,179 @@
+"""
+Historical log queries across all daily openclaw-*.log files.
+
+Each file gets a sparse timestamp index (one (epoch, offset) entry every
+_INDEX_EVERY lines), built once and extended as the file grows, so a
+time-range query binary-searches to its starting offset instead of
+scanning from the top. Results are returned in pages with a resume cursor.
+"""
+
+import bisect
+import glob as globmod
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+import config
+import logs
+import perf
+import timeutil
+
+_INDEX_EVERY    = 256            # lines per sparse index entry
+_PAGE_MAX       = 1000
+_SCAN_BUDGET    = 32 << 20       # bytes scanned per page before returning a cursor
+_FILE_DAY_RE    = re.compile(r'openclaw-(\d{4}-\d{2}-\d{2})\.log$')
+
+_indexes = {}                    # path → sparse index record
+_indexes_lock = threading.Lock()
+
+
+def _log_files() -> list:
+    """All daily log files, oldest first."""
+    return sorted(p for p in globmod.glob(os.path.join(config.LOG_DIR, 'openclaw-*.log'))
+                  if _FILE_DAY_RE.search(p))
+
+
+def _file_day(path: str) -> str:
+    m = _FILE_DAY_RE.search(path)
+    return m.group(1) if m else None
+
+
+def _line_epoch(line: str, day: str):
+    return timeutil.ts_epoch(logs._parse_log_line(line, day).get('timestamp'))
+
+
+def _get_index(path: str):
+    """Return the sparse index for a log file, extending it over newly appended lines."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _indexes_lock:
+        idx = _indexes.get(path)
+        if idx is None or idx['ino'] != st.st_ino or st.st_size < idx['indexed_to']:
+            idx = {'ino': st.st_ino, 'indexed_to': 0, 'lines': 0, 'last_ts': None,
+                   'pending': None, 'ts': [], 'offsets': [], 'lock': threading.Lock()}
+            _indexes[path] = idx
+    with idx['lock']:
+        if st.st_size > idx['indexed_to']:
+            _extend_index(path, idx, st.st_size)
+    return idx
+
+
+@perf.timed('log_archive._extend_index')
+def _extend_index(path: str, idx: dict, size: int):
+    day = _file_day(path)
+    try:
+        fh = open(path, 'rb')
+    except OSError:
+        return
+    with fh:
+        fh.seek(idx['indexed_to'])
+        pos = idx['indexed_to']
+        for raw in fh:
+            if not raw.endswith(b'\n') or pos >= size:
+                break
+            if idx['lines'] % _INDEX_EVERY == 0:
+                idx['pending'] = pos
+            idx['lines'] += 1
+            if idx['pending'] is not None:
+                line = raw.decode('utf-8', errors='replace').strip()
+                ts = _line_epoch(line, day) if line else None
+                if ts is not None:
+                    # first timestamp at/after the block start marks the block
+                    idx['ts'].append(ts)
+                    idx['offsets'].append(idx['pending'])
+                    idx['pending'] = None
+                    idx['last_ts'] = ts
+            pos += len(raw)
+        idx['indexed_to'] = pos
+
+
+def _start_offset(idx: dict, t_from) -> int:
+    """Offset of the last indexed block that starts before t_from."""
+    if t_from is None or not idx['ts']:
+        return 0
+    i = bisect.bisect_left(idx['ts'], t_from) - 1
+    return idx['offsets'][i] if i >= 0 else 0
+
+
+@perf.timed('log_archive.query')
+def query(t_from=None, t_to=None, types=None, q='', limit=200, cursor=''):
+    """Scan logs in time order. Returns one page plus a cursor for the next one."""
+    t0 = time.perf_counter()
+    limit = max(1, min(limit, _PAGE_MAX))
+    q = (q or '').lower()
+    files = _log_files()
+
+    start_name, start_off = None, None
+    if cursor:
+        name, _, off = cursor.rpartition(':')
+        if name and off.isdigit():
+            start_name, start_off = name, int(off)
+
+    day_lo = datetime.fromtimestamp(t_from - 86400).strftime('%Y-%m-%d') if t_from else None
+    day_hi = datetime.fromtimestamp(t_to + 86400).strftime('%Y-%m-%d') if t_to else None
+
+    items, scanned, next_cursor = [], 0, None
+    for path in files:
+        name = os.path.basename(path)
+        day = _file_day(path)
+        if start_name and name < start_name:
+            continue
+        if (day_lo and day < day_lo) or (day_hi and day > day_hi):
+            continue
+        idx = _get_index(path)
+        if idx is None:
+            continue
+        if start_name == name:
+            offset = start_off
+        else:
+            offset = _start_offset(idx, t_from)
+        last_ts = None
+        done = False
+        try:
+            fh = open(path, 'rb')
+        except OSError:
+            continue
+        with fh:
+            fh.seek(offset)
+            pos = offset
+            for raw in fh:
+                if not raw.endswith(b'\n'):
+                    break
+                line_off = pos
+                pos += len(raw)
+                scanned += len(raw)
+                line = raw.decode('utf-8', errors='replace').strip()
+                if line:
+                    data = logs._parse_log_line(line, day)
+                    ts = timeutil.ts_epoch(data.get('timestamp'))
+                    if ts is not None:
+                        last_ts = ts
+                    if t_to is not None and last_ts is not None and last_ts > t_to:
+                        done = True
+                        break
+                    if ((t_from is None or (last_ts is not None and last_ts >= t_from))
+                            and (not types or data.get('type') in types)
+                            and (not q or q in line.lower())):
+                        data['file'] = name
+                        data['offset'] = line_off
+                        items.append(data)
+                        if len(items) >= limit:
+                            next_cursor = f'{name}:{pos}'
+                            break
+                if scanned >= _SCAN_BUDGET:
+                    next_cursor = f'{name}:{pos}'
+                    break
+        if done or next_cursor:
+            break
+
+    return {
+        'items':   items,
+        'next':    next_cursor,
+        'scanned': scanned,
+        'files':   [os.path.basename(p) for p in files],
+        'tookMs':  round((time.perf_counter() - t0) * 1000, 2),
+    }
@@ -3,21 +3,22 @@ Log file resolution, tailing, parsing, and classification.
 """
 
 import glob as globmod
-import json
 import os
 import select
 import subprocess
+import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 
+import codec
 import config
-from sse import _send_sse, _send_sse_heartbeat
+import perf
+from sse import _SSEWriter, _send_sse_heartbeat
 
 
 def _resolve_today_log():
     """Find today's log file, fall back to most recent one."""
-    today = os.path.join(config.LOG_DIR,
-                         f"openclaw-{datetime.now().strftime('%Y-%m-%d')}.log")
+    today = os.path.join(config.LOG_DIR, f"openclaw-{_today_str()}.log")
     if os.path.isfile(today):
         return today
     candidates = sorted(globmod.glob(os.path.join(config.LOG_DIR, 'openclaw-*.log')),
@@ -25,74 +26,256 @@ def _resolve_today_log():
     return candidates[0] if candidates else None
 
 
-def _tail_log_file(handler):
+_BACKLOG_LINES = 200            # lines replayed when a log stream opens
+_BACKLOG_STEP  = 64 << 10
+
+
+def _read_backlog(path, n=_BACKLOG_LINES):
+    """The last n complete lines of path and the offset just past them."""
+    with open(path, 'rb') as fh:
+        pos = os.fstat(fh.fileno()).st_size
+        data = b''
+        while pos > 0 and data.count(b'\n') <= n:
+            step = min(_BACKLOG_STEP, pos)
+            pos -= step
+            fh.seek(pos)
+            data = fh.read(step) + data
+    cut = data.rfind(b'\n') + 1          # an unfinished last line is left to tail
+    lines = data[:cut].split(b'\n')[:-1]
+    if pos > 0:
+        lines = lines[1:]                 # partial first line
+    return lines[-n:], pos + cut
+
+
+def _tail_log_file(handler, types=None, query=''):
+    """Stream the log tail as SSE. Lines not matching `types`/`query` are
+    dropped before serialization and before they reach the rate limiter.
+    The backlog replayed on connect bypasses the limiter; `tail` follows
+    from the byte where it stopped."""
     log_file = _resolve_today_log()
     if not log_file:
         return False
+    try:
+        backlog, start = _read_backlog(log_file)
+    except OSError:
+        return False
+
+    def matching(raw_lines):
+        lines = []
+        for raw in raw_lines:
+            line = raw.decode('utf-8', errors='replace').strip()
+            if line and (not query or query in line.lower()):
+                lines.append(line)
+        return [d for d in _parse_log_lines(lines) if not types or d.get('type') in types]
+
+    writer = _SSEWriter(handler)
+    for data in matching(backlog):
+        if not writer.send('log', data):
+            return True
+    if not writer.flush():
+        return True
 
     proc = subprocess.Popen(
-        ['tail', '-f', '-n', '200', log_file],
+        ['tail', '-c', f'+{start + 1}', '-f', log_file],
         stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     try:
         fd = proc.stdout.fileno()
         client_fd = handler.connection.fileno()
-        sent_this_sec = 0
-        window_start  = time.monotonic()
+        limiter = _LogLimiter(time.monotonic())
+        last_write = time.monotonic()
         buf = b''
 
         while True:
-            readable, _, _ = select.select([fd, client_fd], [], [], 15)
-
-            if not readable:
-                # Timeout — send heartbeat to detect dead connections
-                if not _send_sse_heartbeat(handler):
-                    break
-                continue
+            now = time.monotonic()
+            timeout = max(0.0, min(15 - (now - last_write), limiter.next_due(now)))
+            readable, _, _ = select.select([fd, client_fd], [], [], timeout)
 
             if client_fd in readable:
                 # Client socket became readable → disconnected
                 break
 
+            events = []
             if fd in readable:
                 chunk = os.read(fd, 8192)
                 if not chunk:
                     break
                 buf += chunk
-                while b'\n' in buf:
-                    raw, buf = buf.split(b'\n', 1)
-                    line = raw.decode('utf-8', errors='replace').strip()
-                    if not line:
-                        continue
-
-                    now = time.monotonic()
-                    if now - window_start >= 1.0:
-                        sent_this_sec = 0
-                        window_start  = now
-                    if sent_this_sec >= config.MAX_LOG_LINES_SEC:
-                        continue
-                    sent_this_sec += 1
-
-                    data = _parse_log_line(line)
-                    if not _send_sse(handler, 'log', data):
+                *complete, buf = buf.split(b'\n')
+                now = time.monotonic()
+                for data in matching(complete):
+                    events.extend(limiter.feed(data, now))
+            events.extend(limiter.tick(time.monotonic()))
+
+            if events:
+                for event, data in events:
+                    if not writer.send(event, data):
                         return True
+                if not writer.flush():
+                    return True
+                last_write = time.monotonic()
+            elif time.monotonic() - last_write >= 15:
+                # Idle — send heartbeat to detect dead connections
+                if not _send_sse_heartbeat(handler):
+                    break
+                last_write = time.monotonic()
     finally:
         proc.kill()
         proc.wait()
     return True
 
 
-def _parse_log_line(line: str) -> dict:
-    """Parse a single log line (JSON or plain text) into an SSE payload."""
+def _line_key(data: dict):
+    """What makes two log lines identical for collapsing: the message
+    without its timestamp."""
+    for k in ('1', 'msg', 'message'):
+        v = data.get(k)
+        if isinstance(v, str):
+            return data.get('type'), str(data.get('0', '')), v
+    raw = data.get('raw') or ''
+    m = config.TS_RE.match(raw)
+    return data.get('type'), '', raw[m.end():] if m else raw
+
+
+class _LogLimiter:
+    """Rate limiter of one log stream: a token bucket per line type
+    (config.LOG_RATE_BUDGETS), collapsing of identical consecutive lines and
+    a periodic summary of what was dropped. feed() and tick() return the
+    (event, data) pairs to send."""
+
+    def __init__(self, now):
+        self.budgets    = config.LOG_RATE_BUDGETS
+        self.interval   = config.LOG_SUMMARY_INTERVAL
+        self.buckets    = {}          # type → [tokens, last refill]
+        self.suppressed = {}          # type → lines dropped since the last summary
+        self.last       = None        # first line of the current run of identical lines
+        self.last_key   = None
+        self.last_sent  = False
+        self.repeats    = 0           # identical lines held back since last / last flush
+        self.repeat_at  = now         # start of the held-back run
+        self.seen_at    = now         # latest identical line
+        self.summary_at = now + self.interval
+
+    def _allow(self, t, now) -> bool:
+        budget = self.budgets.get(t, self.budgets.get('other'))
+        if budget is None:
+            return True
+        rate, burst = budget
+        b = self.buckets.get(t)
+        if b is None:
+            b = self.buckets[t] = [burst, now]
+        b[0] = min(burst, b[0] + (now - b[1]) * rate)
+        b[1] = now
+        if b[0] >= 1:
+            b[0] -= 1
+            return True
+        return False
+
+    def _flush_repeats(self) -> list:
+        n, self.repeats = self.repeats, 0
+        if not n:
+            return []
+        if not self.last_sent:
+            # the line itself was dropped: its repeats count as dropped too
+            t = self.last.get('type', 'other')
+            self.suppressed[t] = self.suppressed.get(t, 0) + n
+            return []
+        data = dict(self.last, repeated=n)
+        data['raw'] = f"{self.last.get('raw', '')} (repeated ×{n})"
+        return [('log', data)]
+
+    def feed(self, data, now) -> list:
+        key = _line_key(data)
+        if key == self.last_key:
+            self.repeats += 1
+            self.seen_at = now
+            return []
+        out = self._flush_repeats()
+        self.last, self.last_key, self.repeat_at = data, key, now
+        t = data.get('type', 'other')
+        self.last_sent = self._allow(t, now)
+        if self.last_sent:
+            out.append(('log', data))
+        else:
+            self.suppressed[t] = self.suppressed.get(t, 0) + 1
+        return out
+
+    def tick(self, now) -> list:
+        """Flush held-back repeats once they stop (or every interval while they
+        go on) and emit the summary when due."""
+        out = []
+        if self.repeats and (now - self.seen_at >= 1 or now - self.repeat_at >= self.interval):
+            out.extend(self._flush_repeats())
+            self.repeat_at = now
+        if now >= self.summary_at:
+            self.summary_at = now + self.interval
+            if self.suppressed:
+                total = sum(self.suppressed.values())
+                detail = ', '.join(f'{t}: {n}' for t, n in
+                                   sorted(self.suppressed.items(), key=lambda kv: -kv[1]))
+                out.append(('status', {
+                    'type': 'warn',
+                    'message': f'Rate limit: {total} lines suppressed in the last '
+                               f'{self.interval}s ({detail})',
+                    'suppressed': self.suppressed,
+                }))
+                self.suppressed = {}
+        return out
+
+    def next_due(self, now) -> float:
+        """Seconds until tick() has something to do."""
+        due = self.summary_at
+        if self.repeats:
+            due = min(due, self.seen_at + 1, self.repeat_at + self.interval)
+        return max(0.0, due - now)
+
+
+# ── Parsing ──────────────────────────────────────────────
+_today = ('', 0.0)               # (YYYY-MM-DD, epoch of the next local midnight)
+
+
+def _today_str() -> str:
+    """Today's date as YYYY-MM-DD; strftime runs once per day, not per line."""
+    global _today
+    day, until = _today
+    now = time.time()
+    if now >= until:
+        d = datetime.fromtimestamp(now)
+        midnight = d.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        day = d.strftime('%Y-%m-%d')
+        _today = (day, midnight.timestamp())
+    return day
+
+
+def _parse_log_line(line: str, day: str = None) -> dict:
+    """Parse a single log line (JSON or plain text) into an SSE payload.
+
+    `day` (YYYY-MM-DD) dates time-only timestamps; defaults to today.
+    Not timed: per-line callers time the batch or query around it.
+    """
+    return _parse_line(line, day)
+
+
+@perf.timed('_parse_log_lines')
+def _parse_log_lines(lines, day: str = None) -> list:
+    """Batch form of _parse_log_line for non-empty, stripped lines.
+
+    Resolves the date once and records one timer sample per batch.
+    """
+    day = day or _today_str()
+    return [_parse_line(line, day) for line in lines]
+
+
+def _parse_line(line: str, day: str = None) -> dict:
     data = None
     if line and line[0] == '{':
         try:
-            data = json.loads(line)
+            data = codec.loads(line)
             data.setdefault('raw', line)
-        except json.JSONDecodeError:
+        except codec.JSONDecodeError:
             pass
 
     if data is None:
-        ts = _extract_timestamp(line)
+        ts = _extract_timestamp(line, day)
         data = {'raw': line, 'type': _classify(line)}
         if ts:
             data['timestamp'] = ts
@@ -106,13 +289,13 @@ def _parse_log_line(line: str) -> dict:
     return data
 
 
-def _extract_timestamp(line: str) -> str | None:
+def _extract_timestamp(line: str, day: str = None) -> str | None:
     """Extract timestamp from log line if present."""
     m = config.TS_RE.match(line)
     if m:
         ts = m.group(1)
         if len(ts) <= 12:
-            ts = datetime.now().strftime('%Y-%m-%d') + 'T' + ts
+            ts = (day or _today_str()) + 'T' + ts
         return ts
     return None
 
@@ -133,14 +316,114 @@ def _extract_timestamp_from_data(data: dict, raw_line: str = '') -> str | None:
 
 
 def _classify(line: str) -> str:
+    # First match wins, in this order. Every keyword before 'session state'
+    # contains 'queue', 'run' or 'tool', so one scan for the shared stem
+    # skips each group on lines that cannot match it.
     ll = line.lower()
-    if 'enqueue' in ll:                          return 'enqueue'
-    if 'dequeue' in ll:                          return 'dequeue'
-    if 'run start' in ll or 'run_start' in ll:   return 'run_start'
-    if 'run done'  in ll or 'run_done'  in ll:   return 'run_done'
-    if 'tool start' in ll or 'tool_start' in ll: return 'tool_start'
-    if 'tool end'   in ll or 'tool_end'   in ll: return 'tool_end'
-    if 'session state' in ll:                    return 'session_state'
-    if 'error' in ll:                            return 'error'
-    if 'warn'  in ll:                            return 'warn'
+    if 'queue' in ll:
+        if 'enqueue' in ll:                          return 'enqueue'
+        if 'dequeue' in ll:                          return 'dequeue'
+    if 'run' in ll:
+        if 'run start' in ll or 'run_start' in ll:   return 'run_start'
+        if 'run done'  in ll or 'run_done'  in ll:   return 'run_done'
+    if 'tool' in ll:
+        if 'tool start' in ll or 'tool_start' in ll: return 'tool_start'
+        if 'tool end'   in ll or 'tool_end'   in ll: return 'tool_end'
+    if 'session state' in ll:                        return 'session_state'
+    if 'error' in ll:                                return 'error'
+    if 'warn'  in ll:                                return 'warn'
     return 'other'
+
+
+# ── Log follower ─────────────────────────────────────────
+# One background reader of today's log that keeps per-type line counters
+# and hands every parsed line to registered listeners. Starts at the end of
+# the file it first sees; a new day's file (or a truncated one) is read from
+# the top.
+_FOLLOW_INTERVAL = 0.25          # seconds between reads of appended bytes
+_FOLLOW_CHUNK    = 4 << 20
+
+_line_counts      = {}           # type → lines seen since the follower started
+_follow_listeners = []
+_follow_lock      = threading.Lock()
+_follow_pos       = {'path': None, 'ino': None, 'offset': 0}
+_follow_running   = False
+
+
+def add_listener(fn):
+    """Call fn(data) from the follower thread for every parsed log line."""
+    with _follow_lock:
+        _follow_listeners.append(fn)
+
+
+def line_counts() -> dict:
+    """Return a snapshot of the per-type line counters."""
+    with _follow_lock:
+        return dict(_line_counts)
+
+
+def _follow_pass():
+    path = _resolve_today_log()
+    if not path:
+        return
+    try:
+        st = os.stat(path)
+    except OSError:
+        return
+    pos = _follow_pos
+    if pos['path'] is None:
+        pos.update(path=path, ino=st.st_ino, offset=st.st_size)
+        return
+    if path != pos['path'] or st.st_ino != pos['ino'] or st.st_size < pos['offset']:
+        pos.update(path=path, ino=st.st_ino, offset=0)
+    if st.st_size <= pos['offset']:
+        return
+
+    try:
+        with open(path, 'rb') as fh:
+            fh.seek(pos['offset'])
+            chunk = fh.read(min(_FOLLOW_CHUNK, st.st_size - pos['offset']))
+    except OSError:
+        return
+    end = chunk.rfind(b'\n')
+    if end < 0:
+        return
+    pos['offset'] += end + 1
+
+    lines = []
+    for raw in chunk[:end].split(b'\n'):
+        line = raw.decode('utf-8', errors='replace').strip()
+        if line:
+            lines.append(line)
+    parsed = _parse_log_lines(lines)
+    with _follow_lock:
+        for data in parsed:
+            t = data.get('type', 'other')
+            _line_counts[t] = _line_counts.get(t, 0) + 1
+        listeners = list(_follow_listeners)
+    for fn in listeners:
+        for data in parsed:
+            try:
+                fn(data)
+            except Exception:
+                pass
+
+
+def _follow_worker():
+    while True:
+        try:
+            _follow_pass()
+        except Exception:
+            pass
+        time.sleep(_FOLLOW_INTERVAL)
+
+
+def start_follower():
+    """Start the background log follower (idempotent)."""
+    global _follow_running
+    with _follow_lock:
+        if _follow_running:
+            return
+        _follow_running = True
+    t = threading.Thread(target=_follow_worker, daemon=True)
+    t.start()
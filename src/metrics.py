@@ -0,0 +1,213 @@
+"""
+Prometheus text exposition (/metrics) built only from state the monitor
+already keeps in memory: the gateway prober, the agent shards, the log
+follower's counters and the caches' hit/miss counters. A scrape never
+parses transcripts or runs the CLI.
+"""
+
+import os
+import time
+
+import agents
+import cli_cache
+import config
+import gateway
+import logs
+import search
+import sessions
+from sse import _read_json_file
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_cron_cache = {'mtime': None, 'counts': {}}
+
+
+def _esc(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _num(value) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _Family:
+    """One metric family: HELP/TYPE header plus labelled samples."""
+
+    def __init__(self, name, mtype, help_text):
+        self.name = name
+        self.mtype = mtype
+        self.help_text = help_text
+        self.samples = []
+
+    def add(self, value, **labels):
+        if value is None:
+            return
+        if labels:
+            lbl = ','.join(f'{k}="{_esc(v)}"' for k, v in labels.items())
+            self.samples.append(f'{self.name}{{{lbl}}} {_num(value)}')
+        else:
+            self.samples.append(f'{self.name} {_num(value)}')
+
+    def render(self, out):
+        if not self.samples:
+            return
+        out.append(f'# HELP {self.name} {self.help_text}')
+        out.append(f'# TYPE {self.name} {self.mtype}')
+        out.extend(self.samples)
+
+
+def _cron_counts() -> dict:
+    """Job counts by enabled state, re-read only when jobs.json changes."""
+    try:
+        mtime = os.stat(config.CRON_JOBS).st_mtime
+    except OSError:
+        return {}
+    if mtime != _cron_cache['mtime']:
+        data = _read_json_file(config.CRON_JOBS)
+        jobs = data.get('jobs') if isinstance(data, dict) else data
+        counts = {'true': 0, 'false': 0}
+        for job in jobs if isinstance(jobs, list) else ():
+            enabled = job.get('enabled', True) if isinstance(job, dict) else True
+            counts['false' if enabled is False else 'true'] += 1
+        _cron_cache.update(mtime=mtime, counts=counts)
+    return _cron_cache['counts']
+
+
+# ── Collectors ───────────────────────────────────────────
+def _gateway_metrics():
+    st = gateway.summary()
+    up = _Family('openclaw_gateway_up', 'gauge', 'Whether the gateway port accepts connections.')
+    up.add(st['online'])
+    ratio = _Family('openclaw_gateway_uptime_ratio', 'gauge',
+                    'Fraction of observed time the gateway was up since monitor start.')
+    ratio.add(st['uptimePct'] / 100)
+    trans = _Family('openclaw_gateway_transitions_total', 'counter',
+                    'Gateway up/down transitions seen by the prober.')
+    trans.add(st['transitions'])
+    rtt = _Family('openclaw_gateway_probe_seconds', 'gauge', 'Duration of the last gateway probe.')
+    rtt.add(st['rttMs'] / 1000 if st['rttMs'] is not None else None)
+    since = _Family('openclaw_gateway_state_since_timestamp_seconds', 'gauge',
+                    'Time of the last gateway state change.')
+    since.add(st['since'])
+    return [up, ratio, trans, rtt, since]
+
+
+def _session_metrics():
+    count    = _Family('openclaw_sessions', 'gauge', 'Sessions by agent and status.')
+    proc     = _Family('openclaw_session_processing', 'gauge', 'Whether a session is processing.')
+    msgs     = _Family('openclaw_session_messages', 'gauge', 'Transcript lines per session.')
+    tokens   = _Family('openclaw_session_tokens_total', 'counter', 'Tokens used per session.')
+    cost     = _Family('openclaw_session_cost_dollars_total', 'counter', 'Estimated cost per session.')
+    ctx_max  = _Family('openclaw_session_context_tokens', 'gauge',
+                       'Context window size per session (sessions.json).')
+    ctx_used = _Family('openclaw_session_context_used_tokens', 'gauge',
+                       'Tokens in the context window per session (sessions.json).')
+    ctx_pct  = _Family('openclaw_session_context_ratio', 'gauge',
+                       'Context window fill ratio per session (sessions.json).')
+    compact  = _Family('openclaw_session_compactions_total', 'counter',
+                       'Compactions per session (sessions.json).')
+
+    for shard in agents.get_shards():
+        by_status = {}
+        for s in shard.sessions():
+            sid, status = s['id'], s.get('status', 'idle')
+            by_status[status] = by_status.get(status, 0) + 1
+            proc.add(status == 'processing', agent=shard.agent, session_id=sid)
+            msgs.add(s.get('message_count', 0), agent=shard.agent, session_id=sid)
+            usage = s.get('usage') or {}
+            for kind, key in (('input', 'input'), ('output', 'output'), ('cache_read', 'cacheRead')):
+                tokens.add(usage.get(key, 0), agent=shard.agent, session_id=sid, kind=kind)
+            cost.add(usage.get('cost', 0), agent=shard.agent, session_id=sid)
+        for status, n in sorted(by_status.items()):
+            count.add(n, agent=shard.agent, status=status)
+
+        for sid, meta in shard.meta().items():
+            ct, tt = meta.get('contextTokens'), meta.get('totalTokens')
+            if isinstance(ct, (int, float)):
+                ctx_max.add(ct, agent=shard.agent, session_id=sid)
+            if isinstance(tt, (int, float)):
+                ctx_used.add(tt, agent=shard.agent, session_id=sid)
+            if isinstance(ct, (int, float)) and isinstance(tt, (int, float)) and ct > 0:
+                ctx_pct.add(tt / ct, agent=shard.agent, session_id=sid)
+            cc = meta.get('compactionCount')
+            if isinstance(cc, int):
+                compact.add(cc, agent=shard.agent, session_id=sid)
+    return [count, proc, msgs, tokens, cost, ctx_max, ctx_used, ctx_pct, compact]
+
+
+def _cron_metrics():
+    jobs = _Family('openclaw_cron_jobs', 'gauge', 'Cron jobs by enabled state.')
+    for enabled, n in sorted(_cron_counts().items()):
+        jobs.add(n, enabled=enabled)
+    return [jobs]
+
+
+def _log_metrics():
+    lines = _Family('openclaw_log_lines_total', 'counter',
+                    'Lines appended to the openclaw log since monitor start, by type.')
+    for t, n in sorted(logs.line_counts().items(), key=lambda kv: str(kv[0])):
+        lines.add(n, type=t)
+    return [lines]
+
+
+def _monitor_metrics():
+    streams = _Family('openclaw_monitor_sse_streams', 'gauge', 'Open SSE streams by kind.')
+    limit   = _Family('openclaw_monitor_sse_streams_max', 'gauge', 'SSE stream limit by kind.')
+    for kind, n, cap in (
+        ('logs',      config._log_stream_count,       config.MAX_LOG_STREAMS),
+        ('session',   config._session_stream_count,   config.MAX_SESSION_STREAMS),
+        ('dashboard', config._dashboard_stream_count, config.MAX_DASHBOARD_STREAMS),
+        ('runs',      config._run_stream_count,       config.MAX_RUN_STREAMS),
+        ('switch',    config._switch_stream_count,    config.MAX_SWITCH_STREAMS),
+    ):
+        streams.add(n, kind=kind)
+        limit.add(cap, kind=kind)
+
+    hits   = _Family('openclaw_monitor_cache_hits_total', 'counter', 'Cache hits by cache.')
+    misses = _Family('openclaw_monitor_cache_misses_total', 'counter', 'Cache misses by cache.')
+    ratio  = _Family('openclaw_monitor_cache_hit_ratio', 'gauge', 'Cache hit ratio since start.')
+    for name, st in (
+        ('session_index',  sessions._session_index_stats),
+        ('shard_summary',  agents._summary_stats),
+        ('search_segment', search._seg_cache_stats),
+    ):
+        h, m = st['hits'], st['misses']
+        hits.add(h, cache=name)
+        misses.add(m, cache=name)
+        if h + m:
+            ratio.add(h / (h + m), cache=name)
+
+    runs    = _Family('openclaw_monitor_cli_runs_total', 'counter', 'openclaw CLI invocations.')
+    errors  = _Family('openclaw_monitor_cli_errors_total', 'counter', 'Failed openclaw CLI invocations.')
+    last    = _Family('openclaw_monitor_cli_last_duration_seconds', 'gauge',
+                      'Duration of the last openclaw CLI invocation.')
+    total   = _Family('openclaw_monitor_cli_duration_seconds_total', 'counter',
+                      'Cumulative time spent in openclaw CLI invocations.')
+    for cmd, st in sorted(cli_cache.cli_stats().items()):
+        runs.add(st['runs'], command=cmd)
+        errors.add(st['errors'], command=cmd)
+        last.add(st['last_sec'], command=cmd)
+        total.add(st['total_sec'], command=cmd)
+
+    age = _Family('openclaw_monitor_cli_cache_age_seconds', 'gauge',
+                  'Seconds since the background CLI cache was refreshed.')
+    updated = cli_cache.get_cache()['lastUpdated']
+    age.add(time.time() - updated if updated else None)
+
+    info = _Family('openclaw_monitor_info', 'gauge', 'Monitor version.')
+    info.add(1, version=config._get_version().get('version', ''))
+    return [streams, limit, hits, misses, ratio, runs, errors, last, total, age, info]
+
+
+def render() -> bytes:
+    """Render every metric family in Prometheus text format."""
+    out = []
+    for collect in (_gateway_metrics, _session_metrics, _cron_metrics, _log_metrics, _monitor_metrics):
+        for family in collect():
+            family.render(out)
+    out.append('')
+    return '\n'.join(out).encode('utf-8')
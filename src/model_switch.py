@@ -0,0 +1,193 @@
+"""
+Model switch jobs.
+
+POST /api/models/switch writes the new default model synchronously and
+hands the gateway restart to this module. One background worker runs the
+restarts in order; each job records its progress (config written → restart
+issued → gateway port down → gateway port back up) as a list of steps that
+/api/models/switch/<id>/stream replays and follows. The port transitions
+come from the shared gateway prober, which is polled while the restart
+command runs so a quick bounce is not missed between regular probes.
+"""
+
+import subprocess
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+import config
+import gateway
+
+_RESTART_TIMEOUT = 20     # seconds `openclaw gateway restart` may take
+_UP_TIMEOUT      = 60     # seconds to wait for the port after the command returns
+_POLL_INTERVAL   = 0.5    # gateway probes while the restart command runs
+_JOBS_MAX        = 20     # finished jobs kept for late subscribers
+
+_cond    = threading.Condition()
+_jobs    = OrderedDict()  # id → job dict
+_queue   = deque()        # ids waiting for the worker
+_running = False
+
+_ACTIVE = ('queued', 'running')
+
+
+def _step(job, name, message=''):
+    """Append a progress step (caller holds _cond)."""
+    job['steps'].append({'step': name, 'ts': time.time(), 'message': message})
+    _cond.notify_all()
+
+
+def _finish(job, state, error=None):
+    with _cond:
+        job['state'] = state
+        job['error'] = error
+        job['finishedAt'] = time.time()
+        _cond.notify_all()
+
+
+def _snapshot(job) -> dict:
+    return {k: (list(v) if k == 'steps' else v) for k, v in job.items()}
+
+
+def _prune():
+    """Drop the oldest finished jobs beyond _JOBS_MAX (caller holds _cond)."""
+    done = [jid for jid, j in _jobs.items() if j['state'] not in _ACTIVE]
+    for jid in done[:max(0, len(done) - _JOBS_MAX)]:
+        del _jobs[jid]
+
+
+# ── Submission ───────────────────────────────────────────
+def _active(target: str):
+    """Queued/running job for target, case-insensitive (caller holds _cond)."""
+    for job in reversed(_jobs.values()):
+        if job['state'] in _ACTIVE and job['target'].lower() == target.lower():
+            return job
+    return None
+
+
+def active_job(target: str):
+    """Snapshot of the queued/running job for target, or None."""
+    with _cond:
+        job = _active(target)
+        return _snapshot(job) if job else None
+
+
+def submit(target: str) -> dict:
+    """Queue a gateway restart for a config that now points at target.
+
+    Call after the config write, under config.MODEL_SWITCH_LOCK. A queued
+    job for the same target is returned instead of a new one; restarts still
+    queued for other targets are superseded, since the one restart that runs
+    last picks up the latest config anyway. A running job never absorbs a
+    new write: its restart may already have read the old config.
+    """
+    with _cond:
+        for jid in _queue:
+            if _jobs[jid]['target'].lower() == target.lower():
+                return _snapshot(_jobs[jid])
+        job = {
+            'id':           uuid.uuid4().hex[:12],
+            'target':       target,
+            'state':        'queued',
+            'steps':        [],
+            'error':        None,
+            'supersededBy': None,
+            'createdAt':    time.time(),
+            'finishedAt':   None,
+        }
+        _step(job, 'written')
+        for jid in _queue:
+            old = _jobs[jid]
+            old['state'] = 'superseded'
+            old['error'] = f'Superseded by a switch to {target}'
+            old['supersededBy'] = job['id']
+            old['finishedAt'] = job['createdAt']
+        _queue.clear()
+        _jobs[job['id']] = job
+        _queue.append(job['id'])
+        _prune()
+        _start()
+        return _snapshot(job)
+
+
+def get(job_id: str):
+    with _cond:
+        job = _jobs.get(job_id)
+        return _snapshot(job) if job else None
+
+
+def wait(job_id: str, seen: int, timeout: float):
+    """Block until job has more than `seen` steps or finished, or timeout.
+    Returns a snapshot (None if the job is unknown)."""
+    with _cond:
+        _cond.wait_for(lambda: job_id not in _jobs or len(_jobs[job_id]['steps']) > seen
+                       or _jobs[job_id]['state'] not in _ACTIVE, timeout=timeout)
+        job = _jobs.get(job_id)
+        return _snapshot(job) if job else None
+
+
+# ── Worker ───────────────────────────────────────────────
+def _run(job):
+    def on_transition(online, ts):
+        with _cond:
+            _step(job, 'up' if online else 'down')
+
+    with _cond:
+        job['state'] = 'running'
+        _step(job, 'issued')
+    gateway.add_listener(on_transition)
+    try:
+        try:
+            proc = subprocess.Popen(
+                [config.OC_BIN, 'gateway', 'restart'],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=config.OC_ENV)
+        except (FileNotFoundError, OSError) as e:
+            return _finish(job, 'failed', f'Gateway restart failed: {e}')
+
+        deadline = time.monotonic() + _RESTART_TIMEOUT
+        while True:
+            try:
+                out, err = proc.communicate(timeout=_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                gateway.check_now()
+                if time.monotonic() >= deadline:
+                    proc.kill()
+                    proc.communicate()
+                    return _finish(job, 'failed',
+                                   f'Gateway restart failed: timed out after {_RESTART_TIMEOUT}s')
+        if proc.returncode != 0:
+            return _finish(job, 'failed',
+                           (err or out or '').strip() or 'Gateway restart failed')
+
+        gateway.check_now()
+        if not gateway.wait_for(True, _UP_TIMEOUT):
+            return _finish(job, 'failed', f'Gateway port did not come back within {_UP_TIMEOUT}s')
+        with _cond:
+            if job['steps'][-1]['step'] != 'up':
+                # restart finished between two probes: the port never looked down
+                _step(job, 'up')
+        _finish(job, 'done')
+    finally:
+        gateway.remove_listener(on_transition)
+
+
+def _worker():
+    while True:
+        with _cond:
+            _cond.wait_for(lambda: _queue)
+            job = _jobs[_queue.popleft()]
+        try:
+            _run(job)
+        except Exception as e:
+            _finish(job, 'failed', f'Gateway restart failed: {e}')
+
+
+def _start():
+    """Start the worker thread on first use (caller holds _cond)."""
+    global _running
+    if _running:
+        return
+    _running = True
+    threading.Thread(target=_worker, daemon=True).start()
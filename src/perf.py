@@ -0,0 +1,276 @@
+"""
+Lightweight in-process instrumentation: per-route latency histograms,
+timers around hot functions, SSE bytes/events per stream, and an optional
+sampled cProfile capture that can be started at runtime.
+
+Everything is kept in memory and read through /api/debug/perf. Set
+MONITOR_PERF=0 to turn the timers into no-ops.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import config
+
+ENABLED = os.environ.get('MONITOR_PERF', '1') != '0'
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_PROFILE_MAX_SECONDS = 300
+_PROFILE_TOP         = 40
+
+_lock      = threading.Lock()
+_routes    = {}      # route key → _Histogram
+_funcs     = {}      # function name → _Histogram
+_streams   = {}      # route key → finished-stream totals
+_active    = {}      # id(handler) → live stream counters
+_started   = time.time()
+
+_profile = {'until': 0, 'sample': 0.0, 'stats': None, 'requests': 0,
+            'startedAt': None, 'seconds': 0}
+
+
+class _Histogram:
+    """Fixed-bucket latency histogram (ms)."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, ms):
+        i = 0
+        while i < len(_BUCKETS_MS) and ms > _BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def _quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (capped at the observed max)."""
+        rank = q * self.count
+        acc = 0
+        for i, n in enumerate(self.counts):
+            acc += n
+            if acc >= rank and n:
+                return min(_BUCKETS_MS[i], self.max) if i < len(_BUCKETS_MS) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            'count':   self.count,
+            'sumMs':   round(self.total, 3),
+            'avgMs':   round(self.total / self.count, 3) if self.count else 0,
+            'maxMs':   round(self.max, 3),
+            'p50Ms':   round(self._quantile(0.50), 3),
+            'p90Ms':   round(self._quantile(0.90), 3),
+            'p99Ms':   round(self._quantile(0.99), 3),
+            'buckets': {('+Inf' if i == len(_BUCKETS_MS) else str(_BUCKETS_MS[i])): n
+                        for i, n in enumerate(self.counts) if n},
+        }
+
+
+def _observe(table, key, ms):
+    with _lock:
+        h = table.get(key)
+        if h is None:
+            h = table[key] = _Histogram()
+        h.observe(ms)
+
+
+# ── Function timers ──────────────────────────────────────
+def timed(name):
+    """Decorator: record every call's duration under `name`."""
+    def deco(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _observe(_funcs, name, (time.perf_counter() - t0) * 1000)
+        return wrapper
+    return deco
+
+
+@contextmanager
+def timer(name):
+    """Context manager form of `timed` for a block inside a function."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        if ENABLED:
+            _observe(_funcs, name, (time.perf_counter() - t0) * 1000)
+
+
+# ── Requests and streams ─────────────────────────────────
+# routes handler.py serves; any other /api/ path shares the '<other>' key so
+# clients cannot grow the route table by inventing paths
+_API_ROUTES = frozenset((
+    '/api/agents', '/api/context/history', '/api/dashboard/stream', '/api/debug/perf',
+    '/api/debug/perf/profile', '/api/health', '/api/health/history', '/api/login',
+    '/api/logout', '/api/logs/query', '/api/logs/stream', '/api/models', '/api/models/switch',
+    '/api/ready', '/api/runs', '/api/runs/stream', '/api/search', '/api/sessions',
+    '/api/system', '/api/tools/stats', '/api/version',
+))
+_SESSION_ROUTES = ('stream', 'state', 'block')
+
+
+def route_key(path: str) -> str:
+    """Collapse per-session and per-job paths so each route has one histogram."""
+    if path in _API_ROUTES or path == '/metrics':
+        return path
+    if path.startswith('/api/session/'):
+        sid, _, sub = path[len('/api/session/'):].partition('/')
+        if sid and sub in _SESSION_ROUTES:
+            return '/api/session/<id>/' + sub
+        return '<other>'
+    if path.startswith('/api/models/switch/'):
+        jid, _, sub = path[len('/api/models/switch/'):].partition('/')
+        if jid and sub in ('', 'stream'):
+            return '/api/models/switch/<id>' + ('/stream' if sub else '')
+        return '<other>'
+    if path.startswith('/api/'):
+        return '<other>'
+    return '<static>'
+
+
+@contextmanager
+def request(handler, path):
+    """Time one request. Streaming responses are accounted as streams instead.
+    Requests turned away by auth all count under '<unauthorized>'."""
+    key = route_key(path)
+    handler._perf_denied = False
+    prof = _maybe_profiler()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        ms = (time.perf_counter() - t0) * 1000
+        if prof is not None:
+            _finish_profiler(prof)
+        stream = getattr(handler, '_perf_stream', None)
+        if stream is not None:
+            handler._perf_stream = None
+            _stream_end(handler, key, stream, ms)
+        elif ENABLED:
+            _observe(_routes, '<unauthorized>' if handler._perf_denied else key, ms)
+
+
+def stream_begin(handler):
+    """Called by _begin_sse: start counting events/bytes for this response."""
+    st = {'path': route_key(handler.path.partition('?')[0]), 'startedAt': time.time(),
+          'events': 0, 'bytes': 0}
+    handler._perf_stream = st
+    with _lock:
+        _active[id(handler)] = st
+
+
+def _stream_end(handler, key, st, ms):
+    with _lock:
+        _active.pop(id(handler), None)
+        agg = _streams.setdefault(key, {'streams': 0, 'events': 0, 'bytes': 0, 'durationSec': 0.0})
+        agg['streams'] += 1
+        agg['events'] += st['events']
+        agg['bytes'] += st['bytes']
+        agg['durationSec'] += ms / 1000
+
+
+# ── Sampled profiling ────────────────────────────────────
+def start_profile(seconds: float, sample: float) -> dict:
+    """Profile a random `sample` fraction of requests for the next `seconds`."""
+    seconds = max(1.0, min(float(seconds), _PROFILE_MAX_SECONDS))
+    sample = max(0.0, min(float(sample), 1.0))
+    with _lock:
+        _profile.update(until=time.monotonic() + seconds, sample=sample, stats=None,
+                        requests=0, startedAt=time.time(), seconds=seconds)
+    return profile_status()
+
+
+def _maybe_profiler():
+    if time.monotonic() >= _profile['until'] or random.random() >= _profile['sample']:
+        return None
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:
+        return None   # another profiler is active on this interpreter (3.12+)
+    return prof
+
+
+def _finish_profiler(prof):
+    prof.disable()
+    with _lock:
+        if _profile['stats'] is None:
+            _profile['stats'] = pstats.Stats(prof)
+        else:
+            _profile['stats'].add(prof)
+        _profile['requests'] += 1
+
+
+def profile_status() -> dict:
+    with _lock:
+        running = time.monotonic() < _profile['until']
+        report = None
+        if _profile['stats'] is not None:
+            buf = io.StringIO()
+            stats = _profile['stats']
+            stats.stream = buf
+            stats.sort_stats('cumulative').print_stats(_PROFILE_TOP)
+            report = buf.getvalue()
+        return {
+            'running':   running,
+            'sample':    _profile['sample'],
+            'seconds':   _profile['seconds'],
+            'startedAt': _profile['startedAt'],
+            'requests':  _profile['requests'],
+            'report':    report,
+        }
+
+
+# ── Reporting ────────────────────────────────────────────
+def snapshot() -> dict:
+    now = time.time()
+    with _lock:
+        routes = {k: h.snapshot() for k, h in sorted(_routes.items())}
+        funcs = {k: h.snapshot() for k, h in sorted(_funcs.items())}
+        streams = {k: dict(v, durationSec=round(v['durationSec'], 1)) for k, v in sorted(_streams.items())}
+        active = [dict(st, ageSec=round(now - st['startedAt'], 1)) for st in _active.values()]
+    return {
+        'enabled':   ENABLED,
+        'uptimeSec': round(now - _started, 1),
+        'threads':   threading.active_count(),
+        'routes':    routes,
+        'functions': funcs,
+        'streams':   {'finished': streams, 'active': active,
+                      'limits': {'logs': config.MAX_LOG_STREAMS,
+                                 'session': config.MAX_SESSION_STREAMS,
+                                 'dashboard': config.MAX_DASHBOARD_STREAMS,
+                                 'runs': config.MAX_RUN_STREAMS,
+                                 'switch': config.MAX_SWITCH_STREAMS}},
+        'profile':   profile_status(),
+    }
+
+
+def reset():
+    with _lock:
+        _routes.clear()
+        _funcs.clear()
+        _streams.clear()
@@ -0,0 +1,239 @@
+"""
+Run timeline spans built from log events.
+
+The log follower's enqueue / dequeue, run_start / run_done and
+tool_start / tool_end lines are paired into spans:
+  queue   lane=session:<id> enqueue → dequeue
+  run     runId=<id> run start → run done
+  tool    runId + toolCallId tool start → tool end
+Open spans wait in a dict keyed by lane / run / call. Closed spans go into
+an interval index: a list ordered by end time plus the longest duration
+seen, so a [from, to] overlap query is one bisect over end ∈ [from, to +
+longest] instead of a scan. Every opened or closed span is also published
+to the /api/runs/stream event log.
+"""
+
+import bisect
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+import logs
+import timeutil
+from sse import _SSEWriter, _follow_event_log
+
+_SPANS_MAX      = 20000       # closed spans kept in the index
+_OPEN_MAX       = 2048        # open spans kept (oldest dropped first)
+_RUNS_MAX       = 1024        # runId → sessionId entries kept for tool lines
+_SEED_BYTES     = 2 << 20     # tail of today's log replayed at start
+_EVENT_LOG_SIZE = 512
+_QUERY_LIMIT    = 5000
+
+_cond    = threading.Condition()
+_open    = OrderedDict()      # (kind, key) → span
+_closed  = []                 # closed spans ordered by end
+_ends    = []                 # _closed[i]['end'], for bisect
+_longest = 0.0                # longest closed span (seconds) still in the index
+_runs    = OrderedDict()      # runId → sessionId
+_events  = deque(maxlen=_EVENT_LOG_SIZE)   # (seq, 'span', span)
+_seq     = 0
+_next_id = 0
+_running = False
+
+_SID_RE    = re.compile(r'sessionId=([\w:.-]+)')
+_LANE_RE   = re.compile(r'lane=session:([\w:.-]+)')
+_RUN_RE    = re.compile(r'runId=([\w:.-]+)')
+_CALL_RE   = re.compile(r'toolCallId=([\w:.-]+)')
+_TOOL_RE   = re.compile(r'\btool=([\w:.-]+)')
+_WAITED_RE = re.compile(r'waitedMs=(\d+)')
+_DUR_RE    = re.compile(r'durationMs=(\d+)')
+
+_OPENERS = {'enqueue': 'queue', 'run_start': 'run', 'tool_start': 'tool'}
+_CLOSERS = {'dequeue': 'queue', 'run_done': 'run', 'tool_end': 'tool'}
+
+
+def _new_span(kind, start, sid, run, tool=None, call=None) -> dict:
+    global _next_id
+    _next_id += 1
+    return {'id': _next_id, 'kind': kind, 'session': sid, 'run': run, 'tool': tool,
+            'toolCallId': call, 'start': start, 'end': None, 'durationMs': None, 'open': True}
+
+
+def _publish(span, emit):
+    """Record a span change for stream subscribers. Caller holds _cond."""
+    global _seq
+    if not emit:
+        return
+    _seq += 1
+    _events.append((_seq, 'span', dict(span)))
+    _cond.notify_all()
+
+
+def _index(span):
+    """Insert a closed span into the interval index. Caller holds _cond."""
+    global _longest
+    i = bisect.bisect_right(_ends, span['end'])
+    _ends.insert(i, span['end'])
+    _closed.insert(i, span)
+    _longest = max(_longest, span['end'] - span['start'])
+    if len(_closed) > _SPANS_MAX:
+        drop = len(_closed) - _SPANS_MAX + _SPANS_MAX // 10
+        del _closed[:drop]
+        del _ends[:drop]
+        _longest = max((s['end'] - s['start'] for s in _closed), default=0.0)
+
+
+# ── Log events ───────────────────────────────────────────
+def _on_log(data, emit=True):
+    kind = data.get('type')
+    if kind not in _OPENERS and kind not in _CLOSERS:
+        return
+    raw = data.get('raw') or ''
+    ts = timeutil.ts_epoch(data.get('timestamp')) or time.time()
+    m = _SID_RE.search(raw) or _LANE_RE.search(raw)
+    sid = m.group(1) if m else None
+    m = _RUN_RE.search(raw)
+    run = m.group(1) if m else None
+    m = _CALL_RE.search(raw)
+    call = m.group(1) if m else None
+    m = _TOOL_RE.search(raw)
+    tool = m.group(1) if m else None
+
+    with _cond:
+        if run and sid:
+            _runs[run] = sid
+            _runs.move_to_end(run)
+            while len(_runs) > _RUNS_MAX:
+                _runs.popitem(last=False)
+        elif run:
+            sid = _runs.get(run)
+
+        span_kind = _OPENERS.get(kind) or _CLOSERS[kind]
+        if span_kind == 'queue':
+            key = sid
+        elif span_kind == 'run':
+            key = run
+        else:
+            key = (run, call or tool)
+        if key is None or key == (None, None):
+            return
+        k = (span_kind, key)
+
+        if kind in _OPENERS:
+            if span_kind == 'queue' and k in _open:
+                return                  # lane already waiting: keep the first enqueue
+            span = _new_span(span_kind, ts, sid, run, tool, call)
+            _open[k] = span
+            _open.move_to_end(k)
+            while len(_open) > _OPEN_MAX:
+                _open.popitem(last=False)
+            return _publish(span, emit)
+
+        span = _open.pop(k, None)
+        if span is None:
+            # opened before the monitor started: use the duration the line reports
+            m = (_WAITED_RE if span_kind == 'queue' else _DUR_RE).search(raw)
+            if not m:
+                return
+            span = _new_span(span_kind, ts - int(m.group(1)) / 1000, sid, run, tool, call)
+        span['end'] = max(ts, span['start'])
+        span['durationMs'] = round((span['end'] - span['start']) * 1000)
+        span['open'] = False
+        span['session'] = span['session'] or sid
+        span['tool'] = span['tool'] or tool
+        _index(span)
+        _publish(span, emit)
+
+
+def _seed():
+    """Replay the tail of today's log so spans that closed before a restart show up."""
+    path = logs._resolve_today_log()
+    if not path:
+        return
+    try:
+        with open(path, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            start = max(0, size - _SEED_BYTES)
+            fh.seek(start)
+            chunk = fh.read(size - start)
+    except OSError:
+        return
+    lines = chunk.decode('utf-8', errors='replace').split('\n')
+    if start > 0:
+        lines = lines[1:]                 # partial first line
+    lines = [ln.strip() for ln in lines if ln.strip()]
+    for data in logs._parse_log_lines(lines):
+        _on_log(data, emit=False)
+
+
+def start():
+    """Seed from today's log and subscribe to the log follower (idempotent)."""
+    global _running
+    with _cond:
+        if _running:
+            return
+        _running = True
+    try:
+        _seed()
+    except Exception:
+        pass
+    logs.add_listener(_on_log)
+
+
+# ── Queries ──────────────────────────────────────────────
+def _summary(spans) -> dict:
+    out = {}
+    for s in spans:
+        k = out.setdefault(s['kind'], {'count': 0, 'open': 0, 'totalMs': 0, 'maxMs': 0})
+        k['count'] += 1
+        if s['open']:
+            k['open'] += 1
+        else:
+            k['totalMs'] += s['durationMs']
+            k['maxMs'] = max(k['maxMs'], s['durationMs'])
+    for k in out.values():
+        done = k['count'] - k['open']
+        k['avgMs'] = round(k.pop('totalMs') / done) if done else None
+    return out
+
+
+def query(t_from=None, t_to=None, session=None, kinds=None, limit=_QUERY_LIMIT) -> dict:
+    """Spans overlapping [t_from, t_to] (default: the last hour), oldest start
+    first. Open spans count as running until now."""
+    now = time.time()
+    t_to = now if t_to is None else t_to
+    t_from = t_to - 3600 if t_from is None else t_from
+    with _cond:
+        lo = bisect.bisect_left(_ends, t_from)
+        hi = bisect.bisect_right(_ends, t_to + _longest)
+        spans = [dict(s) for s in _closed[lo:hi] if s['start'] <= t_to]
+        spans += [dict(s) for s in _open.values() if s['start'] <= t_to]
+    spans = [s for s in spans
+             if (not session or s['session'] == session) and (not kinds or s['kind'] in kinds)]
+    for s in spans:
+        if s['open']:
+            s['durationMs'] = round((now - s['start']) * 1000)
+    spans.sort(key=lambda s: (s['start'], s['id']))
+    truncated = len(spans) > limit
+    return {'from': t_from, 'to': t_to, 'summary': _summary(spans),
+            'spans': spans[-limit:], 'truncated': truncated}
+
+
+# ── Live feed ────────────────────────────────────────────
+def _send_snapshot(writer) -> bool:
+    with _cond:
+        snapshot = [dict(s) for s in _open.values()]
+    return writer.send('snapshot', {'open': snapshot}) and writer.flush()
+
+
+def _stream(handler):
+    """Serve one /api/runs/stream subscriber until it disconnects. SSE
+    headers already sent. Sends the open spans, then every span change."""
+    with _cond:
+        seq = _seq
+    writer = _SSEWriter(handler)
+    if not _send_snapshot(writer):
+        return
+    _follow_event_log(handler, writer, _cond, _events, lambda: _seq, seq, _send_snapshot)
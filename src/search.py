@@ -0,0 +1,368 @@
+"""
+Full-text search index over session transcripts.
+
+The index is maintained incrementally by a background worker: only bytes
+appended to a transcript since the last pass are parsed (through
+jsonl._parse_jsonl_line) and tokenized. In memory we keep token → doc ids;
+per-transcript token → line offsets live in zlib-compressed segment files
+under CACHE_DIR/search and are loaded on demand.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import codec
+import config
+import jsonl
+import sessions
+
+_INDEX_DIR       = os.path.join(config.CACHE_DIR, 'search')
+_MANIFEST        = os.path.join(_INDEX_DIR, 'manifest.z')
+_INDEX_INTERVAL  = 5          # seconds between incremental passes
+_READ_CHUNK      = 4 << 20    # bytes read per step when indexing
+_MAX_TOKEN       = 64
+_SEG_CACHE_MAX   = 64
+_SNIPPET_RADIUS  = 80
+_MAX_LIMIT       = 200
+
+_WORD_RE = re.compile(r'[0-9a-z_]{2,}|[^\W\x00-\x7f]+')
+
+_docs      = {}               # path → doc record
+_doc_paths = {}               # doc id → path
+_postings  = {}               # token → array('I') of doc ids
+_seg_cache = OrderedDict()    # doc id → {token: [offsets]}
+_seg_cache_stats = {'hits': 0, 'misses': 0}
+_next_doc  = 0
+_index_lock = threading.Lock()
+_ready = False
+
+
+def _tokens(text: str) -> set:
+    """Lowercased ASCII words, plus unigrams and bigrams of non-ASCII (e.g. CJK) runs."""
+    out = set()
+    for w in _WORD_RE.findall(text.lower()):
+        if w.isascii():
+            out.add(w[:_MAX_TOKEN])
+            continue
+        out.update(w)
+        for i in range(len(w) - 1):
+            out.add(w[i:i + 2])
+    return out
+
+
+def _event_text(parsed) -> str:
+    """Searchable text of one parsed transcript event (see jsonl._parse_jsonl_line)."""
+    if not parsed or parsed.get('role') in ('meta', 'raw'):
+        return ''
+    parts = []
+    for b in parsed.get('blocks', []):
+        bt = b.get('type')
+        if bt in ('text', 'tool_result'):
+            c = b.get('content')
+            parts.append(c if isinstance(c, str) else codec.dumps(c))
+        elif bt == 'tool_call':
+            parts.append(b.get('name', ''))
+            parts.append(codec.dumps(b.get('arguments', {})))
+    return '\n'.join(p for p in parts if p)
+
+
+# ── On-disk storage ──────────────────────────────────────
+def _seg_path(path: str) -> str:
+    return os.path.join(_INDEX_DIR, hashlib.sha1(path.encode('utf-8')).hexdigest()[:20] + '.seg')
+
+
+def _load_segment(doc_id: int, path: str) -> dict:
+    """Return token → sorted offsets for one transcript (LRU cached). Caller holds the lock."""
+    seg = _seg_cache.get(doc_id)
+    if seg is not None:
+        _seg_cache_stats['hits'] += 1
+        _seg_cache.move_to_end(doc_id)
+        return seg
+    _seg_cache_stats['misses'] += 1
+    seg = {}
+    raw = codec.read_blob(_seg_path(path)) or {}
+    for tok, deltas in raw.items():
+        offs, acc = [], 0
+        for d in deltas:
+            acc += d
+            offs.append(acc)
+        seg[tok] = offs
+    _cache_segment(doc_id, seg)
+    return seg
+
+
+def _cache_segment(doc_id: int, seg: dict):
+    _seg_cache[doc_id] = seg
+    _seg_cache.move_to_end(doc_id)
+    while len(_seg_cache) > _SEG_CACHE_MAX:
+        _seg_cache.popitem(last=False)
+
+
+def _save_segment(path: str, seg: dict):
+    packed = {}
+    for tok, offs in seg.items():
+        prev, deltas = 0, []
+        for o in offs:
+            deltas.append(o - prev)
+            prev = o
+        packed[tok] = deltas
+    codec.write_blob(_seg_path(path), packed)
+
+
+def _save_manifest():
+    codec.write_blob(_MANIFEST, {
+        p: {k: d[k] for k in ('sid', 'agent', 'offset', 'ino', 'mtime')}
+        for p, d in _docs.items()
+    })
+
+
+# ── Index maintenance ────────────────────────────────────
+def _add_doc(path: str, rec: dict) -> dict:
+    global _next_doc
+    rec['id'] = _next_doc
+    _next_doc += 1
+    _docs[path] = rec
+    _doc_paths[rec['id']] = path
+    return rec
+
+
+def _drop_doc(path: str):
+    """Remove a transcript from the index entirely. Caller holds the lock."""
+    rec = _docs.pop(path, None)
+    if not rec:
+        return
+    doc_id = rec['id']
+    for tok in _load_segment(doc_id, path):
+        ids = _postings.get(tok)
+        if ids is None:
+            continue
+        try:
+            ids.remove(doc_id)
+        except ValueError:
+            pass
+        if not ids:
+            del _postings[tok]
+    _seg_cache.pop(doc_id, None)
+    _doc_paths.pop(doc_id, None)
+    try:
+        os.unlink(_seg_path(path))
+    except OSError:
+        pass
+
+
+def _index_appended(path: str, rec: dict, size: int) -> bool:
+    """Tokenize complete lines between rec['offset'] and size. Returns True if the index changed."""
+    start = rec['offset']
+    new_postings = {}
+    try:
+        with open(path, 'rb') as fh:
+            fh.seek(start)
+            pos = start
+            while pos < size:
+                chunk = fh.read(min(_READ_CHUNK, size - pos))
+                if not chunk:
+                    break
+                end = chunk.rfind(b'\n')
+                if end < 0:
+                    if len(chunk) < _READ_CHUNK:
+                        break
+                    # a single line larger than the chunk: extend until its newline
+                    more = fh.readline()
+                    chunk += more
+                    end = len(chunk) - 1 if more.endswith(b'\n') else -1
+                    if end < 0:
+                        break
+                line_off = pos
+                for raw in chunk[:end + 1].split(b'\n')[:-1]:
+                    text = _event_text(jsonl._parse_jsonl_line(raw.decode('utf-8', errors='replace')))
+                    if text:
+                        for tok in _tokens(text):
+                            new_postings.setdefault(tok, []).append(line_off)
+                    line_off += len(raw) + 1
+                pos += end + 1
+                fh.seek(pos)
+    except OSError:
+        return False
+
+    if pos == start:
+        return False
+    rec['offset'] = pos
+    if new_postings:
+        with _index_lock:
+            seg = _load_segment(rec['id'], path)
+            for tok, offs in new_postings.items():
+                have = seg.get(tok)
+                if have is None:
+                    seg[tok] = offs
+                    _postings.setdefault(tok, array('I')).append(rec['id'])
+                else:
+                    have.extend(offs)
+            _save_segment(path, seg)
+    return True
+
+
+def _index_pass() -> bool:
+    """One incremental pass over every agent's transcripts."""
+    changed = False
+    seen = set()
+    for d in sessions._agent_session_dirs():
+        agent = os.path.basename(os.path.dirname(d))
+        try:
+            entries = list(os.scandir(d))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith('.jsonl'):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            path = entry.path
+            seen.add(path)
+            rec = _docs.get(path)
+            if rec and (rec['ino'] != st.st_ino or st.st_size < rec['offset']):
+                with _index_lock:
+                    _drop_doc(path)
+                rec = None
+                changed = True
+            if rec is None:
+                with _index_lock:
+                    rec = _add_doc(path, {'sid': entry.name[:-len('.jsonl')], 'agent': agent,
+                                          'offset': 0, 'ino': st.st_ino, 'mtime': st.st_mtime})
+                    _cache_segment(rec['id'], {})
+                changed = True
+            rec['mtime'] = st.st_mtime
+            if st.st_size > rec['offset'] and _index_appended(path, rec, st.st_size):
+                changed = True
+
+    for path in [p for p in _docs if p not in seen]:
+        with _index_lock:
+            _drop_doc(path)
+        changed = True
+    return changed
+
+
+def _load_index():
+    """Rebuild in-memory postings from the persisted manifest and segments."""
+    manifest = codec.read_blob(_MANIFEST)
+    if not isinstance(manifest, dict):
+        return
+    with _index_lock:
+        for path, rec in manifest.items():
+            if not isinstance(rec, dict) or not os.path.exists(_seg_path(path)):
+                continue
+            rec = _add_doc(path, dict(rec))
+            for tok in _load_segment(rec['id'], path):
+                _postings.setdefault(tok, array('I')).append(rec['id'])
+        _seg_cache.clear()
+
+
+def _index_worker():
+    global _ready
+    try:
+        os.makedirs(_INDEX_DIR, mode=0o700, exist_ok=True)
+    except OSError:
+        return
+    _load_index()
+    while True:
+        try:
+            if _index_pass():
+                with _index_lock:
+                    _save_manifest()
+        except Exception:
+            pass
+        _ready = True
+        time.sleep(_INDEX_INTERVAL)
+
+
+def start():
+    """Start the background indexing thread."""
+    t = threading.Thread(target=_index_worker, daemon=True)
+    t.start()
+
+
+# ── Query ────────────────────────────────────────────────
+def _snippet(text: str, terms: list) -> str:
+    low = text.lower()
+    pos = min((i for i in (low.find(t) for t in terms) if i >= 0), default=0)
+    lo = max(0, pos - _SNIPPET_RADIUS)
+    hi = min(len(text), pos + _SNIPPET_RADIUS)
+    snip = text[lo:hi].replace('\n', ' ')
+    return ('…' if lo > 0 else '') + snip + ('…' if hi < len(text) else '')
+
+
+def search(query: str, limit: int = 50, agent: str = '') -> dict:
+    """Find transcript events containing every whitespace-separated term of `query`."""
+    t0 = time.perf_counter()
+    terms = [t for t in query.lower().split() if t]
+    toks = set()
+    for t in terms:
+        toks |= _tokens(t)
+    limit = max(1, min(limit, _MAX_LIMIT))
+    results = []
+
+    if toks:
+        with _index_lock:
+            lists = sorted((_postings.get(t) for t in toks), key=lambda a: len(a) if a else 0)
+            docs = set(lists[0]) if lists[0] else set()
+            for ids in lists[1:]:
+                if not docs:
+                    break
+                docs.intersection_update(ids or ())
+            cands = []
+            for doc_id in docs:
+                path = _doc_paths.get(doc_id)
+                rec = _docs.get(path) if path else None
+                if rec and (not agent or rec['agent'] == agent):
+                    cands.append((rec['mtime'], path, rec))
+            cands.sort(reverse=True)
+
+            hits = []
+            for _, path, rec in cands:
+                seg = _load_segment(rec['id'], path)
+                offs = None
+                for t in toks:
+                    o = seg.get(t, ())
+                    offs = set(o) if offs is None else offs.intersection(o)
+                    if not offs:
+                        break
+                if offs:
+                    hits.append((path, rec, sorted(offs)))
+
+        for path, rec, offs in hits:
+            try:
+                fh = open(path, 'rb')
+            except OSError:
+                continue
+            with fh:
+                for off in offs:
+                    fh.seek(off)
+                    parsed = jsonl._parse_jsonl_line(fh.readline().decode('utf-8', errors='replace'))
+                    text = _event_text(parsed)
+                    if not all(t in text.lower() for t in terms):
+                        continue
+                    results.append({
+                        'sessionId': rec['sid'],
+                        'agent':     rec['agent'],
+                        'offset':    off,
+                        'role':      parsed.get('role', ''),
+                        'snippet':   _snippet(text, terms),
+                    })
+                    if len(results) >= limit:
+                        break
+            if len(results) >= limit:
+                break
+
+    return {
+        'query':   query,
+        'results': results,
+        'ready':   _ready,
+        'docs':    len(_docs),
+        'tookMs':  round((time.perf_counter() - t0) * 1000, 2),
+    }
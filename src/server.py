@@ -11,16 +11,17 @@ Usage:
 import http.server
 import os
 import signal
+import socket
 import socketserver
 import sys
+import threading
+import time
 
 # Ensure src/ is on the import path so modules can find each other
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config  # noqa: E402  — handles --version exit, arg parsing
 import tailscale  # noqa: E402
-import cli_cache  # noqa: E402
-from handler import Handler  # noqa: E402
 
 
 # ── Tailscale binding ────────────────────────────────────────
@@ -35,16 +36,74 @@ if config.ARGS.tailscale:
         sys.exit(1)
 
 
+# ── Early bind ───────────────────────────────────────────────
+# The port is claimed before the rest of the app is imported: after a
+# restart, clients queue in the backlog instead of being refused while
+# the handler, agents and search modules load.
+def _listen(host, port):
+    try:
+        return socket.create_server((host, port), backlog=64)
+    except OSError as e:
+        print(f'\n  ERROR: cannot listen on {host}:{port}: {e}\n')
+        sys.exit(1)
+
+
+_SOCK = _listen(BIND_HOST, config.PORT) if __name__ == '__main__' else None
+
+import agents  # noqa: E402
+import cli_cache  # noqa: E402
+import context_history  # noqa: E402
+import gateway  # noqa: E402
+import logs  # noqa: E402
+import runs  # noqa: E402
+import search  # noqa: E402
+import session_state  # noqa: E402
+import tool_stats  # noqa: E402
+from handler import Handler  # noqa: E402
+
+
 # ── Threaded server ──────────────────────────────────────────
 class _Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
     daemon_threads    = True
     allow_reuse_address = True
 
 
+# ── Start-up warm-up ─────────────────────────────────────────
+def _warm_up():
+    """Binary discovery, background workers and first scans, off the
+    accept loop. /api/ready answers 503 until this returns."""
+    config._resolve_openclaw()
+    gateway.start()
+    logs.start_follower()
+    session_state.start()
+    runs.start()
+    cli_cache.start()
+    context_history.start()
+    agents.start()
+    search.start()
+    tool_stats.start()
+    shards = agents.get_shards()
+    config.READY_AT = time.time()
+    config.READY.set()
+    print(f'  agents          : {", ".join(s.agent for s in shards) or "-"}')
+    print(f'  ready in        : {(config.READY_AT - config.STARTED_AT) * 1000:.0f} ms\n', flush=True)
+
+
+def _adopt_socket(server, sock):
+    """Hand the early-bound socket to the HTTP server (skips its bind and
+    the reverse DNS lookup HTTPServer.server_bind does)."""
+    server.socket.close()
+    server.socket = sock
+    server.server_address = sock.getsockname()[:2]
+    server.server_name = BIND_HOST
+    server.server_port = server.server_address[1]
+
+
 # ── Entry point ──────────────────────────────────────────────
 if __name__ == '__main__':
-    cli_cache.start()
-    server = _Server((BIND_HOST, config.PORT), Handler)
+    server = _Server((BIND_HOST, config.PORT), Handler, bind_and_activate=False)
+    _adopt_socket(server, _SOCK)
+
     ver = config._get_version()
     url = f'http://{BIND_HOST}:{config.PORT}' if BIND_HOST != '0.0.0.0' else f'http://localhost:{config.PORT}'
     print(f'\n  openclaw Monitor  →  {url}')
@@ -59,6 +118,7 @@ if __name__ == '__main__':
     if config.ARGS.tailscale:
         print(f'  tailscale       : {BIND_HOST}')
     print(f'  session dir     : {config.SESSION_DIR}')
-    print(f'  today log       : {config.TODAY_LOG}\n')
+    print(f'  today log       : {config.TODAY_LOG}', flush=True)
+    threading.Thread(target=_warm_up, daemon=True).start()
     signal.signal(signal.SIGINT, lambda *_: (server.shutdown(), sys.exit(0)))
     server.serve_forever()
@@ -0,0 +1,333 @@
+"""
+Per-session status state machine.
+
+Each session is in one of four states:
+  idle      the last turn finished
+  queued    a message waits in the session's lane
+  running   a run is in progress (model turn)
+  tool      the run waits for tool results
+
+Two sources drive it incrementally: bytes appended to the transcript
+(user / assistant / toolResult messages) and the log follower's
+enqueue / dequeue / run_start / run_done / tool_start / tool_end /
+session_state lines. Transcripts of sessions that are busy or were touched
+recently are polled for appended bytes every _HOT_POLL seconds; the agent
+shard watchers hand over every other change. Transitions are timestamped,
+kept in a short per-session history and passed to listeners.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+import codec
+import logs
+
+_HOT_POLL    = 0.25          # seconds between size checks of hot transcripts
+_HOT_WINDOW  = 60            # seconds a transcript stays hot after its last change
+_SEED_BYTES  = 256 << 10     # transcript tail read to seed a session's state
+_READ_MAX    = 4 << 20       # appended bytes read per pass
+_HISTORY_MAX = 32            # transitions kept per session
+_RUNS_MAX    = 1024          # runId → sessionId entries kept for tool lines
+
+_lock      = threading.Lock()
+_sessions  = {}              # sessionId → _Machine
+_runs      = OrderedDict()   # runId → sessionId
+_listeners = []
+_running   = False
+
+_SID_RE   = re.compile(r'sessionId=([\w:.-]+)')
+_LANE_RE  = re.compile(r'lane=session:([\w:.-]+)')
+_RUN_RE   = re.compile(r'runId=([\w:.-]+)')
+_NEW_RE   = re.compile(r'\bnew=(\w+)')
+
+
+class _Machine:
+    """State of one session plus the read position in its transcript."""
+
+    def __init__(self, sid):
+        self.sid     = sid
+        self.path    = None
+        self.ino     = None
+        self.offset  = None          # None until the transcript was seeded
+        self.state   = 'idle'
+        self.since   = time.time()
+        self.reason  = ''
+        self.pending = set()         # toolCallIds without a result yet
+        self.touched = 0.0           # monotonic time of the last transcript change
+        self.history = deque(maxlen=_HISTORY_MAX)
+
+    def info(self) -> dict:
+        now = time.time()
+        return {
+            'id':        self.sid,
+            'state':     self.state,
+            'status':    'idle' if self.state == 'idle' else 'processing',
+            'since':     self.since,
+            'inStateMs': round((now - self.since) * 1000),
+            'reason':    self.reason,
+            'pendingTools': len(self.pending),
+        }
+
+
+def _machine(sid) -> '_Machine':
+    """Get or create the machine for sid. Caller holds _lock."""
+    m = _sessions.get(sid)
+    if m is None:
+        m = _sessions[sid] = _Machine(sid)
+    return m
+
+
+def _set(m, state, reason, ts=None, emit=True):
+    """Move m to state. Caller holds _lock. Returns the transition or None."""
+    if state == m.state:
+        return None
+    ts = ts or time.time()
+    t = {'ts': ts, 'from': m.state, 'to': state, 'reason': reason}
+    m.state, m.since, m.reason = state, ts, reason
+    m.history.append(t)
+    return dict(t, id=m.sid) if emit else None
+
+
+def _notify(transitions):
+    if not transitions:
+        return
+    with _lock:
+        listeners = list(_listeners)
+    for t in transitions:
+        for fn in listeners:
+            try:
+                fn(t)
+            except Exception:
+                pass
+
+
+# ── Transcript events ────────────────────────────────────
+def _on_transcript(m, obj, ts=None, emit=True):
+    """Apply one transcript entry. Caller holds _lock."""
+    kind = obj.get('type')
+    if kind == 'run_start':
+        return _set(m, 'running', 'run_start', ts, emit)
+    if kind == 'tool_start':
+        return _set(m, 'tool', 'tool_start', ts, emit)
+    if kind != 'message':
+        return None
+    msg = obj.get('message') or {}
+    role = msg.get('role')
+    if role == 'user':
+        m.pending.clear()
+        return _set(m, 'running', 'user_message', ts, emit)
+    if role == 'assistant':
+        content = msg.get('content')
+        calls = [b.get('toolCallId') or b.get('id') for b in content
+                 if isinstance(b, dict) and b.get('type') == 'toolCall'] if isinstance(content, list) else []
+        if calls:
+            m.pending.update(c for c in calls if c)
+            return _set(m, 'tool', 'tool_call', ts, emit)
+        if m.pending:
+            return None
+        return _set(m, 'idle', 'assistant_reply', ts, emit)
+    if role == 'toolResult':
+        m.pending.discard(msg.get('toolCallId'))
+        if m.pending:
+            return None
+        return _set(m, 'running', 'tool_result', ts, emit)
+    return None
+
+
+def _read_appended(path, offset, ino):
+    """Stat and read what was appended to a transcript since offset (the
+    tail, when offset is None or the file was replaced). Runs without _lock.
+    Returns None when there is nothing new."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    seed = offset is None or st.st_ino != ino or st.st_size < offset
+    if not seed and st.st_size == offset:
+        return None
+    start = max(0, st.st_size - _SEED_BYTES) if seed else offset
+    end = st.st_size if seed else min(st.st_size, offset + _READ_MAX)
+    try:
+        with open(path, 'rb') as fh:
+            fh.seek(start)
+            chunk = fh.read(end - start)
+    except OSError:
+        return None
+    cut = chunk.rfind(b'\n')
+    lines = chunk[:cut].split(b'\n') if cut >= 0 else []
+    if seed and start > 0 and lines:
+        lines = lines[1:]                     # partial first line
+    objs = []
+    for raw in lines:
+        try:
+            objs.append(codec.loads(raw))
+        except ValueError:
+            continue
+    return {'seed': seed, 'ino': st.st_ino, 'mtime': st.st_mtime,
+            'offset': start + cut + 1 if cut >= 0 else (None if seed else offset),
+            'objs': objs}
+
+
+def _apply(m, r) -> list:
+    """Apply one _read_appended result to m. Caller holds _lock."""
+    m.ino, m.offset = r['ino'], r['offset']
+    m.touched = time.monotonic()
+    if r['seed']:
+        # replay the tail silently; the state dates from the last write
+        m.pending.clear()
+        for obj in r['objs']:
+            try:
+                _on_transcript(m, obj, r['mtime'], emit=False)
+            except AttributeError:
+                continue
+        m.history.clear()
+        m.since = r['mtime']
+        return []
+    out = []
+    for obj in r['objs']:
+        try:
+            t = _on_transcript(m, obj)
+        except AttributeError:
+            continue
+        if t:
+            out.append(t)
+    return out
+
+
+def _feed(m) -> list:
+    """Read what was appended to m's transcript and apply it. _lock is held
+    only to snapshot the read position and to apply the result, never
+    during file I/O."""
+    with _lock:
+        if not m.path:
+            return []
+        snap = (m.path, m.offset, m.ino)
+    r = _read_appended(*snap)
+    if r is None:
+        return []
+    with _lock:
+        if _sessions.get(m.sid) is not m or (m.path, m.offset, m.ino) != snap:
+            return []                         # fed or replaced meanwhile; next pass retries
+        return _apply(m, r)
+
+
+def track(sid, path):
+    """Register or refresh a session transcript (agent shard watcher)."""
+    with _lock:
+        m = _machine(sid)
+        if m.path != path:
+            m.path, m.offset = path, None
+    _notify(_feed(m))
+
+
+def forget(sid):
+    """Drop a session whose transcript is gone."""
+    with _lock:
+        _sessions.pop(sid, None)
+
+
+# ── Log events ───────────────────────────────────────────
+def _on_log(data):
+    kind = data.get('type')
+    if kind not in ('enqueue', 'dequeue', 'run_start', 'run_done',
+                    'tool_start', 'tool_end', 'session_state'):
+        return
+    raw = data.get('raw') or ''
+    sid = _SID_RE.search(raw) or _LANE_RE.search(raw)
+    run = _RUN_RE.search(raw)
+    sid = sid.group(1) if sid else None
+    run = run.group(1) if run else None
+    with _lock:
+        if run and sid:
+            _runs[run] = sid
+            _runs.move_to_end(run)
+            while len(_runs) > _RUNS_MAX:
+                _runs.popitem(last=False)
+        elif run:
+            sid = _runs.get(run)
+        # only sessions with a transcript: log lines also name lanes and
+        # sessions this monitor does not list
+        m = _sessions.get(sid)
+        if m is None:
+            return
+        t = None
+        if kind == 'enqueue':
+            if m.state == 'idle':
+                t = _set(m, 'queued', kind)
+        elif kind in ('dequeue', 'run_start', 'tool_end'):
+            t = _set(m, 'running', kind)
+        elif kind == 'tool_start':
+            t = _set(m, 'tool', kind)
+        elif kind == 'run_done':
+            if not m.pending:
+                t = _set(m, 'idle', kind)
+        else:
+            new = _NEW_RE.search(raw)
+            if new:
+                t = _set(m, 'idle' if new.group(1) == 'idle' else 'running', kind)
+    _notify([t] if t else ())
+
+
+# ── Queries ──────────────────────────────────────────────
+def get(sid, history=False):
+    """Current state of one session (O(1)), optionally with its transitions."""
+    with _lock:
+        m = _sessions.get(sid)
+        if m is None:
+            return None
+        out = m.info()
+        if history:
+            out['history'] = list(m.history)
+    return out
+
+
+def overlay(info: dict) -> dict:
+    """Session summary with status/idle_since taken from the machine, if known."""
+    with _lock:
+        m = _sessions.get(info.get('id'))
+        if m is None or m.offset is None:
+            return info
+        state, since = m.state, m.since
+    info = dict(info, status='idle' if state == 'idle' else 'processing', state=state)
+    if state == 'idle':
+        info['idle_since'] = since
+    else:
+        info.pop('idle_since', None)
+    return info
+
+
+def add_listener(fn):
+    """Call fn(transition) for every transition: {id, ts, from, to, reason}."""
+    with _lock:
+        _listeners.append(fn)
+
+
+# ── Worker ───────────────────────────────────────────────
+def _hot_worker():
+    while True:
+        out = []
+        try:
+            now = time.monotonic()
+            with _lock:
+                hot = [m for m in _sessions.values()
+                       if m.path and (m.state != 'idle' or now - m.touched < _HOT_WINDOW)]
+            for m in hot:
+                out.extend(_feed(m))
+        except Exception:
+            pass
+        _notify(out)
+        time.sleep(_HOT_POLL)
+
+
+def start():
+    """Subscribe to the log follower and start the hot-transcript poller (idempotent)."""
+    global _running
+    with _lock:
+        if _running:
+            return
+        _running = True
+    logs.add_listener(_on_log)
+    threading.Thread(target=_hot_worker, daemon=True).start()
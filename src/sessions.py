@@ -2,22 +2,31 @@
 Session file scanning, parsing, and info extraction.
 """
 
-import json
 import os
+import subprocess
 import threading
+import time
 from datetime import datetime
 
+import cli_cache
+import codec
 import config
+import perf
 from sse import _read_json_file
 
-# ── Session info cache (by file mtime) ───────────────────
-_session_info_cache = {}   # path → (mtime, info_dict)
-_session_cache_lock = threading.Lock()
+# ── Session file index (sessionId → path, all agents) ────
+_session_index      = {}   # sessionId → path
+_session_index_dirs = {}   # sessions dir → (dir mtime, set of sessionIds)
+_session_index_miss = {}   # sessionId → negative-cache expiry (monotonic)
+_session_index_lock = threading.Lock()
+_SESSION_INDEX_MISS_TTL = 5.0   # seconds
+_SESSION_INDEX_MISS_MAX = 1024
+_session_index_stats = {'hits': 0, 'misses': 0}
 
 
-def _load_session_meta() -> dict:
+def _load_session_meta(sessions_json: str = None) -> dict:
     """Load sessions.json and build sessionId → metadata reverse lookup."""
-    data = _read_json_file(config.SESSIONS_JSON)
+    data = _read_json_file(sessions_json or config.SESSIONS_JSON)
     if not data or not isinstance(data, dict):
         return {}
     lookup = {}
@@ -33,6 +42,9 @@ def _load_session_meta() -> dict:
             'originProvider': origin.get('provider', ''),
             'displayName': val.get('displayName', ''),
             'lastChannel': val.get('lastChannel', ''),
+            'contextTokens': val.get('contextTokens'),
+            'totalTokens': val.get('totalTokens'),
+            'compactionCount': val.get('compactionCount'),
         }
     return lookup
 
@@ -66,9 +78,10 @@ def _derive_label(meta: dict) -> tuple:
     return ('', '')
 
 
-def _enrich_with_meta(sessions: list) -> list:
+def _enrich_with_meta(sessions: list, meta_lookup: dict = None) -> list:
     """Merge metadata labels into session list, dedupe by session id."""
-    meta_lookup = _load_session_meta()
+    if meta_lookup is None:
+        meta_lookup = _load_session_meta()
     seen_ids = set()
     result = []
     for s in sessions:
@@ -92,23 +105,93 @@ def _enrich_with_meta(sessions: list) -> list:
     return result
 
 
+def _agent_session_dirs() -> list:
+    """Return every ~/.openclaw/agents/*/sessions directory, main agent first."""
+    dirs = []
+    if os.path.isdir(config.SESSION_DIR):
+        dirs.append(config.SESSION_DIR)
+    try:
+        agents = sorted(os.listdir(config.AGENTS_DIR))
+    except OSError:
+        return dirs
+    for agent in agents:
+        d = os.path.join(config.AGENTS_DIR, agent, 'sessions')
+        if d != config.SESSION_DIR and os.path.isdir(d):
+            dirs.append(d)
+    return dirs
+
+
+def _refresh_session_index():
+    """Re-list only the session directories whose mtime changed. Caller holds the lock."""
+    live = set()
+    for d in _agent_session_dirs():
+        live.add(d)
+        try:
+            mtime = os.stat(d).st_mtime
+        except OSError:
+            continue
+        known = _session_index_dirs.get(d)
+        if known and known[0] == mtime:
+            continue
+        try:
+            names = os.listdir(d)
+        except OSError:
+            continue
+        sids = set()
+        for name in names:
+            if name.endswith('.jsonl'):
+                sid = name[:-len('.jsonl')]
+                sids.add(sid)
+                _session_index[sid] = os.path.join(d, name)
+                _session_index_miss.pop(sid, None)
+        if known:
+            for sid in known[1] - sids:
+                if _session_index.get(sid, '').startswith(d + os.sep):
+                    del _session_index[sid]
+        _session_index_dirs[d] = (mtime, sids)
+
+    for d in list(_session_index_dirs):
+        if d not in live:
+            for sid in _session_index_dirs.pop(d)[1]:
+                if _session_index.get(sid, '').startswith(d + os.sep):
+                    del _session_index[sid]
+
+
 def _find_session_file(session_id: str):
-    """Locate session JSONL file — check SESSION_DIR first, then search ~/.openclaw."""
-    path = os.path.join(config.SESSION_DIR, f'{session_id}.jsonl')
-    if os.path.isfile(path):
-        return path
-    oc_root = os.path.expanduser('~/.openclaw')
-    fname = f'{session_id}.jsonl'
-    if os.path.isdir(oc_root):
-        for dirpath, _, filenames in os.walk(oc_root):
-            if fname in filenames:
-                return os.path.join(dirpath, fname)
+    """Locate a session JSONL file in any agent's session directory via the index."""
+    if not session_id or '/' in session_id or session_id.startswith('.'):
+        return None
+    now = time.monotonic()
+    with _session_index_lock:
+        path = _session_index.get(session_id)
+        if path and os.path.isfile(path):
+            _session_index_stats['hits'] += 1
+            return path
+        expiry = _session_index_miss.get(session_id)
+        if expiry and expiry > now:
+            _session_index_stats['hits'] += 1
+            return None
+        _session_index_stats['misses'] += 1
+        _refresh_session_index()
+        path = _session_index.get(session_id)
+        if path and os.path.isfile(path):
+            return path
+        # one TTL for all entries: insertion order is expiry order, so drop
+        # from the front: expired entries, then the oldest while over the cap
+        _session_index_miss.pop(session_id, None)
+        while _session_index_miss:
+            oldest = next(iter(_session_index_miss))
+            if (len(_session_index_miss) < _SESSION_INDEX_MISS_MAX
+                    and _session_index_miss[oldest] > now):
+                break
+            del _session_index_miss[oldest]
+        _session_index_miss[session_id] = now + _SESSION_INDEX_MISS_TTL
     return None
 
 
 def _parse_oc_sessions(output: str) -> list:
-    """Parse `openclaw sessions` table output."""
-    sessions = []
+    """Parse `openclaw sessions` table output into [{'id', 'raw_line'}] rows."""
+    rows = []
     for line in output.splitlines():
         line = line.strip()
         if not line or any(c in line for c in '┌┐└┘├┤─│═'):
@@ -116,48 +199,31 @@ def _parse_oc_sessions(output: str) -> list:
         m = config.UUID_RE.search(line)
         if not m:
             continue
-        sid  = m.group(0)
-        path = os.path.join(config.SESSION_DIR, f'{sid}.jsonl')
-        info = {'id': sid, 'file': path, 'raw_line': line}
-        if os.path.isfile(path):
-            mtime = os.path.getmtime(path)
-            info['mtime'] = mtime
-            info.update(_extract_session_info(path, mtime))
-        sessions.append(info)
-    return _enrich_with_meta(sessions)
-
-
-def _scan_session_files() -> list:
-    if not os.path.isdir(config.SESSION_DIR):
-        return []
-    entries = []
-    for name in os.listdir(config.SESSION_DIR):
-        if not name.endswith('.jsonl'):
-            continue
-        path = os.path.join(config.SESSION_DIR, name)
-        sid  = name[:-len('.jsonl')]
-        mtime = os.path.getmtime(path)
-        info = _extract_session_info(path, mtime)
-        info['id']    = sid
-        info['file']  = path
-        info['mtime'] = mtime
-        entries.append(info)
-    entries.sort(key=lambda e: e.get('mtime', 0), reverse=True)
-    return _enrich_with_meta(entries)
-
-
-def _extract_session_info(path: str, mtime: float = None) -> dict:
-    if mtime is None:
-        try:
-            mtime = os.path.getmtime(path)
-        except OSError:
-            return {'provider': '', 'model': '', 'status': 'idle', 'message_count': 0}
+        rows.append({'id': m.group(0), 'raw_line': line})
+    return rows
+
 
-    with _session_cache_lock:
-        cached = _session_info_cache.get(path)
-        if cached and cached[0] == mtime:
-            return cached[1].copy()
+def _cli_session_rows():
+    """Run `openclaw sessions` and return its parsed rows, or None if unavailable."""
+    t0 = time.monotonic()
+    ok = False
+    try:
+        r = subprocess.run([config.OC_BIN, 'sessions'],
+                           capture_output=True, text=True, timeout=5, env=config.OC_ENV)
+        ok = r.returncode == 0
+        if ok and r.stdout.strip():
+            return _parse_oc_sessions(r.stdout) or None
+    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+        pass
+    finally:
+        cli_cache._record_cli('sessions', time.monotonic() - t0, ok)
+    return None
 
+
+@perf.timed('_read_session_info')
+def _read_session_info(path: str, mtime: float) -> dict:
+    """Parse a transcript into its summary dict (uncached; agent shards
+    keep one per session, keyed by mtime)."""
     info = {'provider': '', 'model': '', 'status': 'idle', 'message_count': 0}
     total_input = 0
     total_output = 0
@@ -177,8 +243,8 @@ def _extract_session_info(path: str, mtime: float = None) -> dict:
 
         for line in lines:
             try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
+                obj = codec.loads(line)
+            except codec.JSONDecodeError:
                 continue
 
             for key in ('provider', 'model'):
@@ -265,7 +331,7 @@ def _extract_session_info(path: str, mtime: float = None) -> dict:
                 is_processing = True
             elif is_recent and last_role == 'assistant':
                 try:
-                    last_obj = json.loads(lines[-1])
+                    last_obj = codec.loads(lines[-1])
                     msg = last_obj.get('message', {})
                     content = msg.get('content', [])
                     if isinstance(content, list):
@@ -273,7 +339,7 @@ def _extract_session_info(path: str, mtime: float = None) -> dict:
                             if isinstance(block, dict) and block.get('type') == 'toolCall':
                                 is_processing = True
                                 break
-                except (json.JSONDecodeError, IndexError):
+                except (codec.JSONDecodeError, IndexError):
                     pass
 
         if is_processing:
@@ -312,7 +378,4 @@ def _extract_session_info(path: str, mtime: float = None) -> dict:
 
     if first_msg:
         info['firstMsg'] = first_msg
-
-    with _session_cache_lock:
-        _session_info_cache[path] = (mtime, info)
     return info
@@ -2,31 +2,131 @@
 SSE helpers and JSON response utilities.
 """
 
-import json
+import select
+import time
+
+import codec
+import config
+import perf
 
 
 def _begin_sse(handler):
     handler.send_response(200)
     handler.send_header('Content-Type',  'text/event-stream')
     handler.send_header('Cache-Control', 'no-cache')
-    handler.send_header('Connection',    'keep-alive')
+    # no Content-Length: the stream ends when the connection closes
+    handler.send_header('Connection',    'close')
     handler.send_header('Access-Control-Allow-Origin', '*')
     handler.end_headers()
+    perf.stream_begin(handler)
 
 
-def _send_sse(handler, event, data):
-    """Write one SSE event. Returns False on broken pipe."""
-    payload = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+def _sse_frame(event, data) -> bytes:
+    return b'event: ' + event.encode('utf-8') + b'\ndata: ' + codec.dumpb(data) + b'\n\n'
+
+
+def _write_frames(handler, payload, events) -> bool:
     try:
-        handler.wfile.write(payload.encode('utf-8'))
+        handler.wfile.write(payload)
         handler.wfile.flush()
-        return True
     except (BrokenPipeError, ConnectionResetError, OSError):
         return False
+    st = getattr(handler, '_perf_stream', None)
+    if st is not None:
+        st['events'] += events
+        st['bytes'] += len(payload)
+    return True
+
+
+def _send_sse(handler, event, data):
+    """Write one SSE event. Returns False on broken pipe."""
+    return _write_frames(handler, _sse_frame(event, data), 1)
+
+
+class _SSEWriter:
+    """Coalesces SSE frames into fewer, larger writes.
+
+    send() queues a frame and writes the queue once it holds
+    SSE_FLUSH_BYTES or its oldest frame is SSE_FLUSH_MS old. Callers
+    flush() whenever they are about to wait for input, so a lone live
+    event still goes out at once while a replay or burst goes out in
+    large chunks.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self._parts  = []
+        self._size   = 0
+        self._since  = 0.0
+
+    def send(self, event, data) -> bool:
+        """Queue one event. Returns False on broken pipe."""
+        frame = _sse_frame(event, data)
+        if not self._parts:
+            self._since = time.monotonic()
+        self._parts.append(frame)
+        self._size += len(frame)
+        if (self._size >= config.SSE_FLUSH_BYTES
+                or time.monotonic() - self._since >= config.SSE_FLUSH_MS / 1000):
+            return self.flush()
+        return True
+
+    def flush(self) -> bool:
+        """Write everything queued. Returns False on broken pipe."""
+        if not self._parts:
+            return True
+        payload = b''.join(self._parts)
+        events = len(self._parts)
+        self._parts = []
+        self._size = 0
+        return _write_frames(self.handler, payload, events)
+
+
+def _follow_event_log(handler, writer, cond, events, last_seq, seq, send_snapshot):
+    """Serve one subscriber of a replayable event log until it disconnects.
+
+    Publishers append (seq, event, data) to `events` (a bounded deque) under
+    `cond` and notify it; last_seq() returns the newest seq and is called
+    with `cond` held. The subscriber starts after `seq`. If it falls behind
+    the log, send_snapshot(writer) resyncs it. A heartbeat goes out after
+    15s without writes.
+    """
+    client_fd = handler.connection.fileno()
+    last_write = time.monotonic()
+    while True:
+        with cond:
+            if last_seq() == seq:
+                cond.wait(timeout=1)
+            if events and events[0][0] > seq + 1:
+                pending = None            # fell behind the event log → resync
+            else:
+                pending = [e for e in events if e[0] > seq]
+            seq = last_seq()
+
+        readable, _, _ = select.select([client_fd], [], [], 0)
+        if readable:
+            return                        # client closed the connection
+
+        if pending is None:
+            if not send_snapshot(writer):
+                return
+            last_write = time.monotonic()
+            continue
+        for _, event, data in pending:
+            if not writer.send(event, data):
+                return
+        if pending:
+            if not writer.flush():
+                return
+            last_write = time.monotonic()
+        if time.monotonic() - last_write >= 15:
+            if not _send_sse_heartbeat(handler):
+                return
+            last_write = time.monotonic()
 
 
 def _json_resp(handler, obj):
-    body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    body = codec.dumpb(obj)
     handler.send_response(200)
     handler.send_header('Content-Type', 'application/json')
     handler.send_header('Content-Length', str(len(body)))
@@ -39,15 +139,19 @@ def _send_sse_heartbeat(handler):
     try:
         handler.wfile.write(b': heartbeat\n\n')
         handler.wfile.flush()
-        return True
     except (BrokenPipeError, ConnectionResetError, OSError):
         return False
+    st = getattr(handler, '_perf_stream', None)
+    if st is not None:
+        st['bytes'] += len(b': heartbeat\n\n')
+    return True
 
 
+@perf.timed('_read_json_file')
 def _read_json_file(path):
     """Safely read and parse a JSON file, return None on error."""
     try:
-        with open(path) as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError, ValueError):
+        with open(path, 'rb') as f:
+            return codec.loads(f.read())
+    except (OSError, ValueError):
         return None
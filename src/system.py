@@ -0,0 +1,141 @@
+"""
+System overview payload: background CLI cache data plus file-based state
+under ~/.openclaw (diagnostics, sessions.json, devices, cron, approvals).
+"""
+
+import os
+import time
+
+import config
+import cli_cache
+import diagnostics
+import gateway
+import sessions
+from sse import _read_json_file
+
+# Files whose changes alter the file-based part of the payload
+_WATCHED_PATHS = (
+    config.OC_ROOT,
+    config.OPENCLAW_CONFIG,
+    os.path.join(config.OC_ROOT, 'credentials'),
+    config.SESSION_DIR,
+    config.SESSIONS_JSON,
+    config.DEVICES_PAIRED,
+    config.DEVICES_PENDING,
+    config.CRON_JOBS,
+    config.UPDATE_CHECK,
+    config.EXEC_APPROVALS,
+)
+
+
+def _health_payload() -> dict:
+    """Gateway state (from the shared prober) and presence of the session dirs and today's log."""
+    return {
+        'openclaw_available': gateway.is_online(),
+        'gateway_since':      gateway.since(),
+        'session_dir_exists': bool(sessions._agent_session_dirs()),
+        'today_log_exists':   os.path.isfile(config.TODAY_LOG),
+    }
+
+
+def _cli_payload() -> dict:
+    """CLI data from the background cache."""
+    cache = cli_cache.get_cache()
+    last = cache['lastUpdated']
+    return {
+        'channel_health':  cache['channel_health'] or {'error': 'loading'},
+        'presence':        cache['presence'] or {'error': 'loading'},
+        'cli_lastUpdated': last,
+        'cli_age':         round(time.time() - last, 1) if last else None,
+    }
+
+
+def _files_signature() -> tuple:
+    """Cheap change detector for _files_payload(): (mtime, mode) of every watched path."""
+    sig = []
+    for p in _WATCHED_PATHS:
+        try:
+            st = os.stat(p)
+            sig.append((st.st_mtime_ns, st.st_mode))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def _files_payload() -> dict:
+    result = {}
+
+    # File-based diagnostics
+    result['diagnostics'] = diagnostics._file_diagnostics()
+
+    # File-based data
+    sessions_data = _read_json_file(config.SESSIONS_JSON)
+
+    # Context Window
+    ctx = []
+    if isinstance(sessions_data, dict):
+        for key, s in sessions_data.items():
+            if not isinstance(s, dict):
+                continue
+            sid = s.get('sessionId', key)
+            ct = s.get('contextTokens')
+            tt = s.get('totalTokens')
+            if ct is not None or tt is not None:
+                pct = round(tt / ct * 100, 1) if ct and tt and ct > 0 else None
+                ctx.append({'sessionId': sid, 'contextTokens': ct, 'totalTokens': tt, 'percent': pct})
+    result['context_window'] = ctx
+
+    # System Prompt Report
+    spr = []
+    if isinstance(sessions_data, dict):
+        for key, s in sessions_data.items():
+            if not isinstance(s, dict):
+                continue
+            report = s.get('systemPromptReport')
+            if report:
+                spr.append({'sessionId': s.get('sessionId', key), 'report': report})
+    result['system_prompt_report'] = spr
+
+    # Skills Snapshot
+    skills = []
+    if isinstance(sessions_data, dict):
+        for key, s in sessions_data.items():
+            if not isinstance(s, dict):
+                continue
+            snap = s.get('skillsSnapshot')
+            if snap:
+                skills.append({'sessionId': s.get('sessionId', key), 'snapshot': snap})
+    result['skills_snapshot'] = skills
+
+    # Compaction History
+    compaction = []
+    if isinstance(sessions_data, dict):
+        for key, s in sessions_data.items():
+            if not isinstance(s, dict):
+                continue
+            cc = s.get('compactionCount')
+            if cc is not None:
+                compaction.append({'sessionId': s.get('sessionId', key), 'compactionCount': cc})
+    result['compaction_history'] = compaction
+
+    # Devices
+    paired = _read_json_file(config.DEVICES_PAIRED)
+    pending = _read_json_file(config.DEVICES_PENDING)
+    result['devices'] = {'paired': paired, 'pending': pending}
+
+    # Cron Jobs
+    result['cron_jobs'] = _read_json_file(config.CRON_JOBS)
+
+    # Update Check
+    result['update_check'] = _read_json_file(config.UPDATE_CHECK)
+
+    # Exec Approvals
+    result['exec_approvals'] = _read_json_file(config.EXEC_APPROVALS)
+
+    return result
+
+
+def _system_payload() -> dict:
+    result = _cli_payload()
+    result.update(_files_payload())
+    return result
@@ -0,0 +1,26 @@
+"""
+Timestamp parsing shared by the log, transcript and query code.
+"""
+
+from datetime import datetime
+
+
+def ts_epoch(ts):
+    """Convert an ISO-8601 string or epoch number (s or ms) to epoch seconds."""
+    if isinstance(ts, bool):
+        return None
+    if isinstance(ts, (int, float)):
+        return ts / 1000.0 if ts > 1e11 else float(ts)
+    if not isinstance(ts, str) or not ts:
+        return None
+    try:
+        return ts_epoch(float(ts))
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return dt.timestamp()
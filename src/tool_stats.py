@@ -0,0 +1,332 @@
+"""
+Tool call analytics over session transcripts.
+
+A background worker reads the bytes appended to every agent's transcripts
+(like search.py) and pairs assistant `toolCall` blocks with the matching
+`toolResult` messages by toolCallId. Per tool name it keeps call, result
+and error counts, result latency (from the two events' timestamps) as a
+log-scale histogram, and result sizes — all-time and in hourly buckets.
+Each transcript also keeps its own share of the aggregates, so when one is
+rewritten its old counts are backed out before it is read again. The
+aggregates and read offsets persist in CACHE_DIR/tool_stats.z, so a
+restart only reads what was appended meanwhile.
+"""
+
+import os
+import threading
+import time
+
+import codec
+import config
+import sessions
+import timeutil
+
+_STATS_FILE     = os.path.join(config.CACHE_DIR, 'tool_stats.z')
+_INDEX_INTERVAL = 5           # seconds between incremental passes
+_READ_CHUNK     = 4 << 20
+_BUCKET_SEC     = 3600
+_BUCKET_KEEP    = 14 * 24     # hourly buckets kept (two weeks)
+_PENDING_MAX    = 256         # unanswered calls remembered per transcript
+
+# upper bounds (ms) of the latency histogram bins; the last bin is open
+_LAT_BOUNDS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+_lock    = threading.Lock()
+_files   = {}                 # path → {'offset', 'ino', 'pending': {toolCallId: [name, ts]},
+                              #         'contrib': {'totals': {...}, 'buckets': {str(start): {...}}}}
+_totals  = {}                 # tool name → aggregate
+_buckets = {}                 # bucket start (epoch) → {tool name → aggregate}
+_updated = None
+
+
+def _agg() -> dict:
+    return {'calls': 0, 'results': 0, 'errors': 0, 'latCount': 0, 'latSum': 0.0, 'latMax': 0.0,
+            'hist': [0] * (len(_LAT_BOUNDS) + 1), 'chars': 0, 'charsMax': 0}
+
+
+def _new_file(ino) -> dict:
+    return {'offset': 0, 'ino': ino, 'pending': {}, 'contrib': {'totals': {}, 'buckets': {}}}
+
+
+def _slot(rec, name, ts) -> list:
+    """Aggregates to update for one event: all-time and its hour bucket,
+    globally and in the transcript's own share. Caller holds _lock."""
+    own = rec['contrib']
+    out = [_totals.setdefault(name, _agg()), own['totals'].setdefault(name, _agg())]
+    if ts is not None:
+        b = int(ts // _BUCKET_SEC * _BUCKET_SEC)
+        out.append(_buckets.setdefault(b, {}).setdefault(name, _agg()))
+        out.append(own['buckets'].setdefault(str(b), {}).setdefault(name, _agg()))
+    return out
+
+
+def _unmerge(into, a):
+    """Subtract a's counters from into. Maxima stay: they cannot be undone."""
+    for k in ('calls', 'results', 'errors', 'latCount', 'latSum', 'chars'):
+        into[k] -= a[k]
+    into['hist'] = [x - y for x, y in zip(into['hist'], a['hist'])]
+
+
+def _back_out(rec):
+    """Remove a transcript's share from the aggregates. Caller holds _lock."""
+    own = rec['contrib']
+    for name, a in own['totals'].items():
+        if name in _totals:
+            _unmerge(_totals[name], a)
+    for b, tools in own['buckets'].items():
+        bucket = _buckets.get(int(b))
+        if bucket is None:
+            continue
+        for name, a in tools.items():
+            if name in bucket:
+                _unmerge(bucket[name], a)
+
+
+def _result_chars(content) -> int:
+    if isinstance(content, str):
+        return len(content)
+    n = 0
+    if isinstance(content, list):
+        for b in content:
+            if isinstance(b, dict):
+                t = b.get('text')
+                n += len(t) if isinstance(t, str) else 0
+    return n
+
+
+# ── Indexing ─────────────────────────────────────────────
+def _on_event(rec, obj):
+    """Fold one transcript entry into the aggregates. Caller holds _lock."""
+    if obj.get('type') != 'message':
+        return
+    msg = obj.get('message') or {}
+    role = msg.get('role')
+    ts = timeutil.ts_epoch(obj.get('timestamp') or msg.get('timestamp'))
+    pending = rec['pending']
+    if role == 'assistant':
+        content = msg.get('content')
+        if not isinstance(content, list):
+            return
+        for b in content:
+            if not isinstance(b, dict) or b.get('type') != 'toolCall':
+                continue
+            name = b.get('name') or '?'
+            for a in _slot(rec, name, ts):
+                a['calls'] += 1
+            cid = b.get('toolCallId') or b.get('id')
+            if cid:
+                pending[cid] = [name, ts]
+        while len(pending) > _PENDING_MAX:
+            pending.pop(next(iter(pending)))
+    elif role == 'toolResult':
+        call = pending.pop(msg.get('toolCallId'), None)
+        name = call[0] if call else msg.get('toolName') or '?'
+        lat = (ts - call[1]) * 1000 if call and ts is not None and call[1] is not None else None
+        chars = _result_chars(msg.get('content'))
+        for a in _slot(rec, name, ts):
+            a['results'] += 1
+            if msg.get('isError'):
+                a['errors'] += 1
+            a['chars'] += chars
+            a['charsMax'] = max(a['charsMax'], chars)
+            if lat is not None and lat >= 0:
+                a['latCount'] += 1
+                a['latSum'] += lat
+                a['latMax'] = max(a['latMax'], lat)
+                i = 0
+                while i < len(_LAT_BOUNDS) and lat > _LAT_BOUNDS[i]:
+                    i += 1
+                a['hist'][i] += 1
+
+
+def _read_appended(path, rec, size) -> bool:
+    pos = start = rec['offset']
+    try:
+        with open(path, 'rb') as fh:
+            fh.seek(pos)
+            while pos < size:
+                chunk = fh.read(min(_READ_CHUNK, size - pos))
+                end = chunk.rfind(b'\n')
+                if end < 0:
+                    if len(chunk) < _READ_CHUNK:
+                        break
+                    more = fh.readline()
+                    chunk += more
+                    end = len(chunk) - 1 if more.endswith(b'\n') else -1
+                    if end < 0:
+                        break
+                with _lock:
+                    for raw in chunk[:end + 1].split(b'\n')[:-1]:
+                        # cheap prefilter: only assistant/toolResult lines with tool calls matter
+                        if b'toolCall' not in raw and b'toolResult' not in raw:
+                            continue
+                        try:
+                            _on_event(rec, codec.loads(raw))
+                        except (ValueError, AttributeError):
+                            continue
+                    pos += end + 1
+                    rec['offset'] = pos
+                fh.seek(pos)
+    except OSError:
+        return False
+    return pos != start
+
+
+def _index_pass() -> bool:
+    global _updated
+    changed = False
+    seen = set()
+    for d in sessions._agent_session_dirs():
+        try:
+            entries = list(os.scandir(d))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith('.jsonl'):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            seen.add(entry.path)
+            with _lock:
+                rec = _files.get(entry.path)
+                if rec is None or rec['ino'] != st.st_ino or st.st_size < rec['offset']:
+                    # new or rewritten transcript: back out its old share, read it from the top
+                    if rec is not None:
+                        _back_out(rec)
+                    rec = _files[entry.path] = _new_file(st.st_ino)
+                    changed = True
+            if st.st_size > rec['offset'] and _read_appended(entry.path, rec, st.st_size):
+                changed = True
+    with _lock:
+        for path in [p for p in _files if p not in seen]:
+            del _files[path]      # deleted transcripts keep their counts
+            changed = True
+        if changed:
+            cutoff = time.time() - _BUCKET_KEEP * _BUCKET_SEC
+            for b in [b for b in _buckets if b < cutoff]:
+                del _buckets[b]
+            for rec in _files.values():
+                own = rec['contrib']['buckets']
+                for b in [b for b in own if int(b) < cutoff]:
+                    del own[b]
+            _updated = time.time()
+    return changed
+
+
+def _save():
+    with _lock:
+        blob = {'files': _files, 'totals': _totals,
+                'buckets': {str(b): v for b, v in _buckets.items()}, 'updated': _updated}
+        codec.write_blob(_STATS_FILE, blob)
+
+
+def _load():
+    global _updated
+    blob = codec.read_blob(_STATS_FILE)
+    if not isinstance(blob, dict):
+        return
+    with _lock:
+        for path, rec in (blob.get('files') or {}).items():
+            rec.setdefault('contrib', {'totals': {}, 'buckets': {}})
+            _files[path] = rec
+        _totals.update(blob.get('totals') or {})
+        for b, v in (blob.get('buckets') or {}).items():
+            _buckets[int(b)] = v
+        _updated = blob.get('updated')
+
+
+def _worker():
+    try:
+        os.makedirs(config.CACHE_DIR, mode=0o700, exist_ok=True)
+    except OSError:
+        return
+    _load()
+    while True:
+        try:
+            if _index_pass():
+                _save()
+        except Exception:
+            pass
+        time.sleep(_INDEX_INTERVAL)
+
+
+def start():
+    """Start the background indexing thread."""
+    threading.Thread(target=_worker, daemon=True).start()
+
+
+# ── Query ────────────────────────────────────────────────
+def _percentile(hist, count, q, top):
+    """Upper bound (ms) of the histogram bin holding quantile q, capped at
+    the largest latency seen (top)."""
+    if not count:
+        return None
+    want, acc = q * count, 0
+    for i, n in enumerate(hist):
+        acc += n
+        if acc >= want:
+            break
+    bound = _LAT_BOUNDS[i] if i < len(_LAT_BOUNDS) else top
+    return round(min(bound, top), 1)
+
+
+def _merge(into, a):
+    for k in ('calls', 'results', 'errors', 'latCount', 'latSum', 'chars'):
+        into[k] += a[k]
+    into['latMax'] = max(into['latMax'], a['latMax'])
+    into['charsMax'] = max(into['charsMax'], a['charsMax'])
+    into['hist'] = [x + y for x, y in zip(into['hist'], a['hist'])]
+
+
+def _summary(name, a, pending=0) -> dict:
+    n = a['latCount']
+    return {
+        'name':      name,
+        'calls':     a['calls'],
+        'results':   a['results'],
+        'errors':    a['errors'],
+        'errorRate': round(a['errors'] / a['results'], 4) if a['results'] else 0.0,
+        'pending':   pending,
+        'latency':   {'count': n,
+                      'avgMs': round(a['latSum'] / n, 1) if n else None,
+                      'p50Ms': _percentile(a['hist'], n, 0.5, a['latMax']),
+                      'p95Ms': _percentile(a['hist'], n, 0.95, a['latMax']),
+                      'maxMs': round(a['latMax'], 1) if n else None,
+                      'hist':  a['hist']},
+        'resultChars': {'avg': round(a['chars'] / a['results']) if a['results'] else 0,
+                        'max': a['charsMax']},
+    }
+
+
+def stats(since=None, until=None) -> dict:
+    """Per-tool summaries, all-time or over the hourly buckets in [since, until),
+    plus the hourly series in that window."""
+    with _lock:
+        pending = {}
+        for rec in _files.values():
+            for name, _ in rec['pending'].values():
+                pending[name] = pending.get(name, 0) + 1
+        window = since is not None or until is not None
+        lo = since if since is not None else float('-inf')
+        hi = until if until is not None else float('inf')
+        series = []
+        merged = {}
+        for b in sorted(_buckets):
+            if not lo - _BUCKET_SEC < b < hi:
+                continue
+            tools = _buckets[b]
+            series.append({'start': b, 'tools': {
+                n: {'calls': a['calls'], 'errors': a['errors'],
+                    'avgMs': round(a['latSum'] / a['latCount'], 1) if a['latCount'] else None}
+                for n, a in tools.items()}})
+            if window:
+                for n, a in tools.items():
+                    _merge(merged.setdefault(n, _agg()), a)
+        source = merged if window else _totals
+        tools = [_summary(n, a, pending.get(n, 0)) for n, a in source.items()]
+        files, updated = len(_files), _updated
+    tools.sort(key=lambda t: (-t['calls'], t['name']))
+    return {'tools': tools, 'buckets': series, 'bucketSec': _BUCKET_SEC,
+            'latencyBoundsMs': list(_LAT_BOUNDS), 'transcripts': files, 'updatedAt': updated}